@@ -28,10 +28,6 @@ from stash_vroom.heresphere import HereSphere
 log = logging.getLogger(__name__)
 
 app = HereSphere('Stash-VRoom')
-app.state = {}
-
-app.state['scenes_by_id'] = {} # scene_id -> scene
-app.state['library'] = []
 
 # @app.saved_scene_filters.events.inserted.connect
 # def on_saved_filter_inserted(i, saved_filter):
@@ -44,38 +40,13 @@ app.state['library'] = []
 #     pass
 
 @app.saved_filter.connect
-def on_scene_filter(name, find_filter, scene_filter, scenes):
-    log.debug(f'Saved filter named {name!r} with {len(scenes)} initial scenes: {find_filter!r} and {scene_filter!r}')
-
-    library_names = [ X['name'] for X in app.state['library'] ]
-    if name in library_names:
-        log.debug(f'Skip known saved filter: {name!r}')
-        return
-
-    new_lib = {'name':name, 'list':[]}
-    app.state['library'].append(new_lib)
-    app.state['library'].sort(key=lambda x: x['name'])
-
-    # scenes_list = app._vroom_scenes_by_filter[name]
-    @scenes.events.inserted.connect
-    def on_scene_in_filter(i, scene):
-        log.debug(f'Scene {scene["id"]} inserted at {i} in filter {name!r}: {scene!r}')
-        app.state['scenes_by_id'][scene['id']] = scene
-        new_lib['list'].insert(i, scene)
-
-# @app.saved_filter_scene.connect
-def on_scene_in_filter(filter_name, scene):
-    log.debug(f'Scene in filter {filter_name!r}: {find_filter!r}')
-
-    # This call seems faster for a bulk pull of unknown scenes in one round-trip.
-    # It could be optimized with a query fragment only for scene ID, then querying for only the unknown scenes in a followup call.
-    res = app.stash_client.scenes(find_filter=find_filter, scene_filter=scene_filter)
-    res = res.model_dump()
-
-    log.debug(f'Scenes in filter {filter_name!r}: {res["findScenes"]["count"]}')
-    scenes = res['findScenes']['scenes']
-    for scene in scenes:
-        log.debug(f'Found scene {scene["id"]}: {scene["title"]}')
+def on_scene_filter(name, find_filter, scene_filter, scene_ids):
+    # The app keeps the scenes and libraries itself. Filters only hold scene IDs into its shared scene store.
+    log.debug(f'Saved filter named {name!r} with {len(scene_ids)} initial scenes: {find_filter!r} and {scene_filter!r}')
+
+    @scene_ids.events.inserted.connect
+    def on_scene_in_filter(i, scene_id):
+        log.debug(f'Scene {scene_id} inserted at {i} in filter {name!r}')
 
 # @app.on_eoubleclick()
 # def on_doubleclick(scene_id, start_ts):
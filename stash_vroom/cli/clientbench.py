@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""vroom-clientbench - Stash client decoding benchmark
+
+Time how long the Stash client takes to turn a large Scenes reply into dicts, and
+the most memory it needs meanwhile, for each way it can decode:
+
+  model   through its pydantic models (model_validate, then model_dump)
+  raw     the decoded JSON after a spot check
+  stream  scene by scene from the byte stream, each dropped once counted
+
+The reply comes from a stubbed Stash with a synthetic library. It is built once and
+then served from memory, so only the client's own work is measured. Reports JSON.
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+import httpx
+
+from stash_vroom import fake_stash, stash_client, util
+
+def get_scenes_reply(scenes=10000, seed=0) -> bytes:
+    """Return the body of a ``Scenes`` reply with every scene of a synthetic library."""
+    fake = fake_stash.FakeStash(scenes=scenes, seed=seed, filters=0)
+    data = fake.get_client(raw=True).scenes(find_filter={'per_page': -1}, scene_filter={})
+    return json.dumps({'data': data}).encode()
+
+MODES = ('model', 'raw', 'stream')
+
+def time_decoding(body, mode, rounds=5, chunk_size=65536):
+    """
+    Time fetching a canned reply, and return the seconds of each round and the peak bytes of another.
+
+    :param body: The reply body, from :func:`get_scenes_reply`
+    :param mode: One of ``MODES``
+    :param chunk_size: Bytes per chunk of the reply stream
+    """
+    def handle(request):
+        chunks = ( body[i:i+chunk_size] for i in range(0, len(body), chunk_size) )
+        return httpx.Response(200, content=chunks, headers={'Content-Type': 'application/json'})
+
+    client = stash_client.Stash('http://stash.bench/graphql', http_client=httpx.Client(transport=httpx.MockTransport(handle)),
+                                raw=mode != 'model')
+    counted = []
+    kwargs = {'stream_path': 'findScenes.scenes', 'on_item': lambda X: counted.append(1)} if mode == 'stream' else {}
+
+    def fetch():
+        util.to_dict(client.scenes(find_filter={'per_page': -1}, scene_filter={}, **kwargs))
+
+    seconds = []
+    for _ in range(rounds):
+        started_at = time.perf_counter()
+        fetch()
+        seconds.append(time.perf_counter() - started_at)
+
+    # Tracing slows everything down, so measure memory in a round of its own.
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        fetch()
+        peak = tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+def run_bench(scenes=10000, rounds=5, seed=0):
+    """Compare the decoding paths on one reply, and return the summary."""
+    body = get_scenes_reply(scenes, seed)
+    result = {'scenes': scenes, 'rounds': rounds, 'reply_bytes': len(body)}
+    for mode in MODES:
+        seconds, peak = time_decoding(body, mode, rounds)
+        seconds.sort()
+        result[mode] = {
+            'best_ms': round(1000 * seconds[0], 3),
+            'median_ms': round(1000 * seconds[len(seconds) // 2], 3),
+            'peak_bytes': peak,
+        }
+    result['speedup'] = round(result['model']['median_ms'] / result['raw']['median_ms'], 2)
+    return result
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='vroom-clientbench',
+        description=__doc__, # This file's docstring
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--scenes', type=int, default=10000, help='Scenes in the reply; default: 10000')
+    parser.add_argument('-r', '--rounds', type=int, default=5, help='Timed rounds per path; default: 5')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic library; default: 0')
+    parser.add_argument('-o', '--output', help='Write the JSON report to this file instead of stdout')
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    result = run_bench(scenes=args.scenes, rounds=args.rounds, seed=args.seed)
+
+    report = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""vroom-codecbench - JSON codec benchmark
+
+Time encoding and decoding VRoom's biggest JSON payloads with every installed codec
+(see stash_vroom.jsoncodec), and report JSON:
+
+  scenes    a Stash Scenes reply with every scene, as the Stash client decodes
+  library   the HereSphere library, listing every scene of every saved filter
+  details   HereSphere scene details, as served one by one to the headset
+
+The payloads come from an in-process VRoom app over a stubbed Stash with a synthetic library.
+"""
+
+import argparse
+import gc
+import json
+import logging
+import sys
+import time
+
+from stash_vroom import fake_stash, heresphere, jsoncodec, stash
+
+def get_payloads(scenes=10000, filters=4, seed=0):
+    """Return the payloads to encode, by name."""
+    if stash.STASH_IP is None:
+        stash.STASH_HOST, stash.STASH_IP = 'stash.fake', '127.0.0.1' # Only for the rendered URLs
+    fake = fake_stash.FakeStash(scenes=scenes, filters=filters, seed=seed)
+    app = heresphere.HereSphere('Stash VRoom codec benchmark')
+    app.stash_client = fake.get_client(raw=True)
+    app.load_saved_filters()
+
+    url_root = 'http://127.0.0.1:5000/'
+    with app.test_request_context('/heresphere', base_url=url_root):
+        details = [ app._render_hs_scene(X) for X in list(app._vroom_scenes_by_id.values()) ]
+    return {
+        'scenes': {'data': fake.get_client(raw=True).scenes(find_filter={'per_page': -1}, scene_filter={})},
+        'library': json.loads(app._get_library_json(url_root)),
+        'details': details,
+    }
+
+def time_codec(codec, payload, rounds=5):
+    """
+    Time one codec on one payload.
+
+    :return: The encoded ``bytes``, and the median ``encode_ms`` and ``decode_ms``
+    """
+    def median_ms(func, arg):
+        # Like timeit, without garbage collection, whose pauses grow with everything else in memory.
+        seconds = []
+        for _ in range(rounds):
+            gc.collect()
+            gc.disable()
+            try:
+                started_at = time.perf_counter()
+                func(arg)
+                seconds.append(time.perf_counter() - started_at)
+            finally:
+                gc.enable()
+        return round(1000 * sorted(seconds)[len(seconds) // 2], 3)
+
+    if isinstance(payload, list):
+        # Details are encoded one response at a time.
+        encoded = [ codec.dumps(X) for X in payload ]
+        return {
+            'bytes': sum(len(X) for X in encoded),
+            'encode_ms': median_ms(lambda items: [ codec.dumps(X) for X in items ], payload),
+            'decode_ms': median_ms(lambda items: [ codec.loads(X) for X in items ], encoded),
+        }
+
+    encoded = codec.dumps(payload)
+    return {
+        'bytes': len(encoded),
+        'encode_ms': median_ms(codec.dumps, payload),
+        'decode_ms': median_ms(codec.loads, encoded),
+    }
+
+def run_bench(scenes=10000, filters=4, rounds=5, seed=0, codecs=None):
+    """Compare the codecs on every payload, and return the summary."""
+    codecs = codecs or jsoncodec.get_available()
+    payloads = get_payloads(scenes, filters, seed)
+    result = {'scenes': scenes, 'filters': filters, 'rounds': rounds, 'default': jsoncodec.codec.name, 'payloads': {}}
+    for name, payload in payloads.items():
+        result['payloads'][name] = { X: time_codec(jsoncodec.get_codec(X), payload, rounds) for X in codecs }
+    return result
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='vroom-codecbench',
+        description=__doc__, # This file's docstring
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--scenes', type=int, default=10000, help='Scenes in the synthetic library; default: 10000')
+    parser.add_argument('--filters', type=int, default=4, help='Saved filters in the synthetic library; default: 4')
+    parser.add_argument('-r', '--rounds', type=int, default=5, help='Timed rounds per codec and payload; default: 5')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic library; default: 0')
+    parser.add_argument('--codec', action='append', choices=list(jsoncodec.CODECS), help='Codec to time, repeatable; default: all installed')
+    parser.add_argument('-o', '--output', help='Write the JSON report to this file instead of stdout')
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    result = run_bench(scenes=args.scenes, filters=args.filters, rounds=args.rounds, seed=args.seed, codecs=args.codec)
+
+    report = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""vroom-loadgen - HereSphere load generator
+
+Simulate several HereSphere headsets browsing a VRoom server at once, and report
+throughput, latency percentiles and error rates as JSON, to compare runs across commits.
+
+Each simulated headset opens the library, loads the legend banner, then opens random
+scenes and their thumbnails, pausing between requests like a person would.
+Use --local to start an in-process VRoom app backed by a stubbed Stash.
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+import httpx
+
+HS_HEADERS = {'HereSphere-JSON-Version': '1'}
+
+def get_percentile(sorted_values, percent):
+    """
+    Return a percentile of sorted values by the nearest-rank method, or ``None`` if empty.
+
+    >>> get_percentile([1, 2, 3, 4], 50)
+    2
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * percent // 100)) # Ceiling without floats
+    return sorted_values[int(rank) - 1]
+
+def summarize(samples, elapsed):
+    """
+    Summarize request samples as a JSON-friendly dict.
+
+    :param samples: ``(kind, seconds, ok)`` tuples, one per request
+    :param elapsed: Seconds the run lasted
+    """
+    def stats(rows):
+        latencies = sorted(X[1] for X in rows)
+        errors = sum(1 for X in rows if not X[2])
+        return {
+            'requests': len(rows),
+            'errors': errors,
+            'error_rate': round(errors / len(rows), 4) if rows else 0.0,
+            'mean_ms': round(1000 * sum(latencies) / len(latencies), 3) if latencies else None,
+            'p50_ms': _ms(get_percentile(latencies, 50)),
+            'p95_ms': _ms(get_percentile(latencies, 95)),
+            'p99_ms': _ms(get_percentile(latencies, 99)),
+        }
+
+    by_kind = {}
+    for sample in samples:
+        by_kind.setdefault(sample[0], []).append(sample)
+
+    result = stats(samples)
+    result['seconds'] = round(elapsed, 3)
+    result['throughput_rps'] = round(len(samples) / elapsed, 2) if elapsed else 0.0
+    result['endpoints'] = { K: stats(V) for K, V in sorted(by_kind.items()) }
+    return result
+
+def _ms(seconds):
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+class Headset:
+    """One simulated HereSphere client, run in its own thread."""
+
+    def __init__(self, base_url, deadline, think=1.0, scenes_per_visit=5, seed=None):
+        self.base_url = base_url.rstrip('/')
+        self.deadline = deadline
+        self.think = think
+        self.scenes_per_visit = scenes_per_visit
+        self.random = random.Random(seed)
+        self.samples = []
+
+    def run(self):
+        with httpx.Client(timeout=30) as client:
+            while time.monotonic() < self.deadline:
+                library = self._request(client, 'library', 'POST', '/heresphere', json_body=True)
+                if not library:
+                    self._pause()
+                    continue
+
+                banner = (library.get('banner') or {}).get('image')
+                if banner:
+                    self._request(client, 'legend', 'GET', banner)
+
+                urls = [ X for L in library.get('library') or [] for X in L['list'] ]
+                for url in self.random.sample(urls, min(self.scenes_per_visit, len(urls))):
+                    if not self._pause():
+                        return
+                    scene = self._request(client, 'scene', 'POST', url, json_body=True)
+                    if scene and scene.get('thumbnailImage'):
+                        self._request(client, 'thumbnail', 'GET', scene['thumbnailImage'])
+                self._pause()
+
+    def _pause(self):
+        # Think time, exponentially distributed around the mean. Return whether time remains.
+        if self.think > 0:
+            time.sleep(min(self.random.expovariate(1 / self.think), max(0, self.deadline - time.monotonic())))
+        return time.monotonic() < self.deadline
+
+    def _request(self, client, kind, method, url, json_body=False):
+        # The server may advertise URLs on another host or port; the headset under test only talks to base_url.
+        parts = urllib.parse.urlsplit(url)
+        url = self.base_url + (parts.path or url) + (f'?{parts.query}' if parts.query else '')
+
+        started_at = time.perf_counter()
+        try:
+            response = client.request(method, url, headers=HS_HEADERS)
+            body = response.json() if json_body and response.is_success else None
+            ok = response.is_success
+        except (httpx.HTTPError, ValueError):
+            body, ok = None, False
+        self.samples.append((kind, time.perf_counter() - started_at, ok))
+        return body
+
+def run_load(base_url, clients=4, duration=10.0, think=1.0, scenes_per_visit=5, seed=None):
+    """
+    Run simulated headsets against a server and return the summary.
+
+    :param base_url: The VRoom server, e.g. ``http://127.0.0.1:5000``
+    :param clients: How many headsets browse at once
+    :param duration: Seconds to run
+    :param think: Mean seconds between requests of one headset
+    :param scenes_per_visit: Scenes opened after each library load
+    :param seed: Optional random seed, for repeatable runs
+    """
+    deadline = time.monotonic() + duration
+    headsets = [ Headset(base_url, deadline, think, scenes_per_visit, seed=None if seed is None else seed + i) for i in range(clients) ]
+    threads = [ threading.Thread(target=X.run, name=f'headset-{i}', daemon=True) for i, X in enumerate(headsets) ]
+
+    started_at = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started_at
+
+    result = summarize([ S for H in headsets for S in H.samples ], elapsed)
+    result['clients'] = clients
+    return result
+
+def start_local_server(filters=3, scenes=500, seed=0):
+    """
+    Start an in-process VRoom HereSphere app with a stubbed Stash, on a free local port.
+
+    The stub is a :class:`~stash_vroom.fake_stash.FakeStash` with a seeded synthetic library.
+
+    :return: A tuple of the base URL and the server, whose ``shutdown()`` stops it and removes its media cache
+    """
+    from werkzeug.serving import make_server
+
+    from stash_vroom import fake_stash, heresphere, media_cache, stash
+
+    if stash.STASH_IP is None:
+        stash.STASH_HOST, stash.STASH_IP = 'stash.fake', '127.0.0.1' # Only for the advertised URLs
+    app = heresphere.HereSphere('Stash VRoom load test')
+    app.stash_client = fake_stash.FakeStash(scenes=scenes, filters=filters, seed=seed).get_client()
+    media_dir = tempfile.TemporaryDirectory(prefix='vroom-loadgen-')
+    app._vroom_media = media_cache.MediaCache(media_dir.name)
+    app.load_saved_filters()
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING) # One log line per request would skew the results
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    shutdown = server.shutdown
+    def shutdown_and_clean_up():
+        shutdown()
+        media_dir.cleanup()
+    server.shutdown = shutdown_and_clean_up
+    threading.Thread(target=server.serve_forever, name='vroom-loadgen-server', daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}', server
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='vroom-loadgen',
+        description=__doc__, # This file's docstring
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--url', help='VRoom server to load, e.g. http://127.0.0.1:5000')
+    target.add_argument('--local', action='store_true', help='Start an in-process app with a stubbed Stash')
+
+    parser.add_argument('-c', '--clients', type=int, default=4, help='Simulated headsets; default: 4')
+    parser.add_argument('-d', '--duration', type=float, default=10.0, help='Seconds to run; default: 10')
+    parser.add_argument('--think', type=float, default=1.0, help='Mean seconds between requests of one headset; default: 1')
+    parser.add_argument('--scenes-per-visit', type=int, default=5, help='Scenes opened after each library load; default: 5')
+    parser.add_argument('--seed', type=int, help='Random seed, for repeatable runs')
+    parser.add_argument('--stub-filters', type=int, default=3, help='Saved filters in the stubbed Stash; default: 3')
+    parser.add_argument('--stub-scenes', type=int, default=500, help='Scenes in the stubbed Stash; default: 500')
+    parser.add_argument('-o', '--output', help='Write the JSON report to this file instead of stdout')
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    server = None
+    base_url = args.url
+    if args.local:
+        base_url, server = start_local_server(filters=args.stub_filters, scenes=args.stub_scenes, seed=args.seed or 0)
+
+    try:
+        result = run_load(base_url, clients=args.clients, duration=args.duration, think=args.think,
+                          scenes_per_visit=args.scenes_per_visit, seed=args.seed)
+    finally:
+        if server:
+            server.shutdown()
+
+    result['url'] = 'local' if args.local else base_url
+    report = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+    return 0 if result['requests'] else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
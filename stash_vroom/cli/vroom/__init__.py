@@ -15,6 +15,7 @@ import sys
 import httpx
 
 
+import stash_vroom.jsoncodec
 import stash_vroom.stash
 
 DEFAULT_STASH_SERVER = f'http://localhost:9999'
@@ -259,7 +260,7 @@ def json_out(data, compact=False):
     """Print JSON, optionally compact (no nulls)."""
     if compact:
         data = strip_nulls(data)
-    print(json.dumps(data, indent=2))
+    print(stash_vroom.jsoncodec.dumps(data, indent=True).decode('utf-8'))
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,76 @@
+# Copyright 2025 Zyquo Onrel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+This package customizes the Stash client that ariadne-codegen generates into ``stash_client``.
+
+``pyproject.toml`` points ariadne-codegen at :class:`RawModePlugin`, and at ``base_client.py`` and
+``async_base_client.py`` here, which it copies into ``stash_client``. Edit these, not the generated
+files, then regenerate.
+"""
+
+import ast
+
+from ariadne_codegen.plugins.base import Plugin
+
+TYPING_NAMES = ('Any', 'Dict', 'Optional', 'Union')
+
+class RawModePlugin(Plugin):
+    """
+    Give every client method a ``raw`` parameter, and return through ``BaseClient.get_result()``.
+
+    A generated method ends with ``return Model.model_validate(data)``, which becomes
+    ``return self.get_result(Model, data, response, raw)``, returning either the model or the
+    data dict.
+    """
+
+    def generate_client_module(self, module: ast.Module) -> ast.Module:
+        for node in module.body:
+            if isinstance(node, ast.ImportFrom) and node.module == 'typing':
+                names = { X.name for X in node.names }
+                node.names += [ ast.alias(name=X) for X in TYPING_NAMES if X not in names ]
+                node.names.sort(key=lambda X: X.name)
+                return module
+        module.body.insert(0, ast.ImportFrom(module='typing', names=[ ast.alias(name=X) for X in TYPING_NAMES ], level=0))
+        return module
+
+    def generate_client_method(self, method_def, operation_definition):
+        last = method_def.body[-1] if method_def.body else None
+        if not (isinstance(last, ast.Return) and isinstance(last.value, ast.Call)
+                and isinstance(last.value.func, ast.Attribute) and last.value.func.attr == 'model_validate'):
+            return method_def # e.g. subscriptions, which yield
+
+        model = last.value.func.value
+        response = ast.Name(id='response')
+        for node in method_def.body:
+            # response = self.execute(...) is renamed if an argument takes the name, so follow get_data().
+            if (isinstance(node, ast.Assign) and isinstance(node.value, ast.Call) and isinstance(node.value.func, ast.Attribute)
+                    and node.value.func.attr == 'get_data' and node.value.args):
+                response = node.value.args[0]
+        method_def.args.args.append(ast.arg(arg='raw', annotation=_parse('Optional[bool]')))
+        method_def.args.defaults.append(ast.Constant(value=None))
+        method_def.returns = ast.Subscript(
+            value=ast.Name(id='Union'),
+            slice=ast.Tuple(elts=[model, _parse('Dict[str, Any]')]),
+        )
+        last.value = ast.Call(
+            func=ast.Attribute(value=ast.Name(id='self'), attr='get_result'),
+            args=[model, *last.value.args, response, ast.Name(id='raw')],
+            keywords=[],
+        )
+        return method_def
+
+def _parse(annotation):
+    return ast.parse(annotation, mode='eval').body
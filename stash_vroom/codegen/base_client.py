@@ -0,0 +1,357 @@
+# Copied into stash_vroom/stash_client by ariadne-codegen (see base_client_file_path in pyproject.toml).
+# Edit this file, not the copy.
+
+import typing
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
+
+import httpx
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+from .. import jsoncodec, jsonstream
+from .base_model import UNSET, Upload
+from .exceptions import (
+    GraphQLClientGraphQLMultiError,
+    GraphQLClientHttpError,
+    GraphQLClientInvalidResponseError,
+)
+
+Self = TypeVar("Self", bound="BaseClient")
+Model = TypeVar("Model", bound=BaseModel)
+
+
+class BaseClient:
+    def __init__(
+        self,
+        url: str = "",
+        headers: Optional[Dict[str, str]] = None,
+        http_client: Optional[httpx.Client] = None,
+        raw: bool = False,
+    ) -> None:
+        self.url = url
+        self.headers = headers
+        self.raw = raw
+
+        self.http_client = http_client if http_client else httpx.Client(headers=headers)
+
+    def __enter__(self: Self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: object,
+        exc_val: object,
+        exc_tb: object,
+    ) -> None:
+        self.http_client.close()
+
+    def execute(
+        self,
+        query: str,
+        operation_name: Optional[str] = None,
+        variables: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        Send a query, and return the response.
+
+        To stream a large list instead of holding it all, pass ``on_item``, a function
+        called with each item as it is decoded, and ``stream_path``, the dotted path of
+        the list within the data, e.g. ``"findScenes.scenes"``. The items are always
+        plain dicts. The returned response then has that list empty.
+        """
+        on_item = kwargs.pop("on_item", None)
+        stream_path = kwargs.pop("stream_path", None)
+        processed_variables, files, files_map = self._process_variables(variables)
+
+        if on_item is not None and stream_path:
+            return self._execute_stream(
+                query=query,
+                operation_name=operation_name,
+                variables=processed_variables,
+                path=["data", *stream_path.split(".")],
+                on_item=on_item,
+                **kwargs,
+            )
+
+        if files and files_map:
+            return self._execute_multipart(
+                query=query,
+                operation_name=operation_name,
+                variables=processed_variables,
+                files=files,
+                files_map=files_map,
+                **kwargs,
+            )
+
+        return self._execute_json(
+            query=query,
+            operation_name=operation_name,
+            variables=processed_variables,
+            **kwargs,
+        )
+
+    def get_data(self, response: httpx.Response) -> Dict[str, Any]:
+        if not response.is_success:
+            raise GraphQLClientHttpError(
+                status_code=response.status_code, response=response
+            )
+
+        try:
+            response_json = jsoncodec.loads(response.content)
+        except ValueError as exc:
+            raise GraphQLClientInvalidResponseError(response=response) from exc
+
+        if (not isinstance(response_json, dict)) or (
+            "data" not in response_json and "errors" not in response_json
+        ):
+            raise GraphQLClientInvalidResponseError(response=response)
+
+        data = response_json.get("data")
+        errors = response_json.get("errors")
+
+        if errors:
+            raise GraphQLClientGraphQLMultiError.from_errors_dicts(
+                errors_dicts=errors, data=data
+            )
+
+        return cast(Dict[str, Any], data)
+
+    def get_result(
+        self,
+        model: Type[Model],
+        data: Dict[str, Any],
+        response: httpx.Response,
+        raw: Optional[bool] = None,
+    ) -> Union[Model, Dict[str, Any]]:
+        """
+        Validate response data into its model, or in raw mode, return the data as is.
+
+        Raw mode skips parsing into nested models, most of the cost of large responses.
+        It only checks that required fields are present, following the first list items.
+
+        :param raw: Raw mode for this call; ``None`` uses the client's
+        """
+        if not (self.raw if raw is None else raw):
+            return model.model_validate(data)
+        if not _is_shaped_like(model, data):
+            raise GraphQLClientInvalidResponseError(response=response)
+        return data
+
+    def _process_variables(
+        self, variables: Optional[Dict[str, Any]]
+    ) -> Tuple[
+        Dict[str, Any], Dict[str, Tuple[str, IO[bytes], str]], Dict[str, List[str]]
+    ]:
+        if not variables:
+            return {}, {}, {}
+
+        serializable_variables = self._convert_dict_to_json_serializable(variables)
+        return self._get_files_from_variables(serializable_variables)
+
+    def _convert_dict_to_json_serializable(
+        self, dict_: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        return {
+            key: self._convert_value(value)
+            for key, value in dict_.items()
+            if value is not UNSET
+        }
+
+    def _convert_value(self, value: Any) -> Any:
+        if isinstance(value, BaseModel):
+            return value.model_dump(by_alias=True, exclude_unset=True)
+        if isinstance(value, list):
+            return [self._convert_value(item) for item in value]
+        return value
+
+    def _get_files_from_variables(
+        self, variables: Dict[str, Any]
+    ) -> Tuple[
+        Dict[str, Any], Dict[str, Tuple[str, IO[bytes], str]], Dict[str, List[str]]
+    ]:
+        files_map: Dict[str, List[str]] = {}
+        files_list: List[Upload] = []
+
+        def separate_files(path: str, obj: Any) -> Any:
+            if isinstance(obj, list):
+                nulled_list = []
+                for index, value in enumerate(obj):
+                    value = separate_files(f"{path}.{index}", value)
+                    nulled_list.append(value)
+                return nulled_list
+
+            if isinstance(obj, dict):
+                nulled_dict = {}
+                for key, value in obj.items():
+                    value = separate_files(f"{path}.{key}", value)
+                    nulled_dict[key] = value
+                return nulled_dict
+
+            if isinstance(obj, Upload):
+                if obj in files_list:
+                    file_index = files_list.index(obj)
+                    files_map[str(file_index)].append(path)
+                else:
+                    file_index = len(files_list)
+                    files_list.append(obj)
+                    files_map[str(file_index)] = [path]
+                return None
+
+            return obj
+
+        nulled_variables = separate_files("variables", variables)
+        files: Dict[str, Tuple[str, IO[bytes], str]] = {
+            str(i): (file_.filename, cast(IO[bytes], file_.content), file_.content_type)
+            for i, file_ in enumerate(files_list)
+        }
+        return nulled_variables, files, files_map
+
+    def _execute_multipart(
+        self,
+        query: str,
+        operation_name: Optional[str],
+        variables: Dict[str, Any],
+        files: Dict[str, Tuple[str, IO[bytes], str]],
+        files_map: Dict[str, List[str]],
+        **kwargs: Any,
+    ) -> httpx.Response:
+        data = {
+            "operations": jsoncodec.dumps(
+                {
+                    "query": query,
+                    "operationName": operation_name,
+                    "variables": variables,
+                },
+                default=to_jsonable_python,
+            ),
+            "map": jsoncodec.dumps(files_map, default=to_jsonable_python),
+        }
+
+        return self.http_client.post(url=self.url, data=data, files=files, **kwargs)
+
+    def _execute_json(
+        self,
+        query: str,
+        operation_name: Optional[str],
+        variables: Dict[str, Any],
+        **kwargs: Any,
+    ) -> httpx.Response:
+        headers: Dict[str, str] = {"Content-Type": "application/json"}
+        headers.update(kwargs.get("headers", {}))
+
+        merged_kwargs: Dict[str, Any] = kwargs.copy()
+        merged_kwargs["headers"] = headers
+
+        return self.http_client.post(
+            url=self.url,
+            content=jsoncodec.dumps(
+                {
+                    "query": query,
+                    "operationName": operation_name,
+                    "variables": variables,
+                },
+                default=to_jsonable_python,
+            ),
+            **merged_kwargs,
+        )
+
+
+    def _execute_stream(
+        self,
+        query: str,
+        operation_name: Optional[str],
+        variables: Dict[str, Any],
+        path: List[str],
+        on_item: Callable[[Any], Any],
+        **kwargs: Any,
+    ) -> httpx.Response:
+        headers: Dict[str, str] = {"Content-Type": "application/json"}
+        headers.update(kwargs.get("headers", {}))
+
+        merged_kwargs: Dict[str, Any] = kwargs.copy()
+        merged_kwargs["headers"] = headers
+
+        content = jsoncodec.dumps(
+            {
+                "query": query,
+                "operationName": operation_name,
+                "variables": variables,
+            },
+            default=to_jsonable_python,
+        )
+        with self.http_client.stream(
+            "POST", url=self.url, content=content, **merged_kwargs
+        ) as response:
+            if not response.is_success:
+                response.read()
+                return response
+
+            envelope: Dict[str, Any] = {}
+            streamed_bytes = 0
+
+            def chunks() -> Iterator[bytes]:
+                nonlocal streamed_bytes
+                for chunk in response.iter_bytes():
+                    streamed_bytes += len(chunk)
+                    yield chunk
+
+            try:
+                items = jsonstream.iter_items(chunks(), path, envelope)
+                for item in items:
+                    on_item(item)
+            except ValueError as exc:
+                raise GraphQLClientInvalidResponseError(response=response) from exc
+
+        # The body is gone, so keep its size for anyone measuring replies.
+        return httpx.Response(
+            response.status_code,
+            json=envelope,
+            request=response.request,
+            extensions={"streamed_bytes": streamed_bytes},
+        )
+
+def _is_shaped_like(model: Type[BaseModel], data: Any) -> bool:
+    if not isinstance(data, dict):
+        return False
+    for name, field in model.model_fields.items():
+        key = field.alias or name
+        if key not in data:
+            if field.is_required():
+                return False
+            continue
+        value = data[key]
+        while isinstance(value, list):
+            if not value:
+                break
+            value = value[0]
+        else:
+            sub_model = _get_model(field.annotation)
+            if sub_model and value is not None:
+                if not _is_shaped_like(sub_model, value):
+                    return False
+    return True
+
+
+def _get_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    # The model within an annotation such as Optional[List["Model"]], if any.
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in typing.get_args(annotation):
+        sub_model = _get_model(arg)
+        if sub_model:
+            return sub_model
+    return None
@@ -0,0 +1,200 @@
+# Copyright 2025 Zyquo Onrel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module computes minimal edits between two ordered lists of Stash objects,
+such as the scenes in a saved filter before and after a refresh.
+
+Items are matched by ID. Items kept in place are the longest increasing subsequence
+of their new positions, so a refresh only moves the items which really moved.
+"""
+
+import bisect
+import logging
+
+log = logging.getLogger(__name__)
+
+def get_list_diff(old_items, new_items, key='id', is_changed=None):
+    """
+    Return the edits which turn one ordered list into another.
+
+    The edits are tuples, to be applied in order:
+
+    - ``('remove', index)``
+    - ``('insert', index, item)``
+    - ``('move', from_index, to_index)`` where ``to_index`` is the final position after removal
+    - ``('update', index, item)``
+
+    :param old_items: The current list of objects
+    :param new_items: The desired list of objects; their keys must be unique
+    :param key: The field identifying an object, default ``'id'``, or ``None`` if the items are themselves IDs
+    :param is_changed: Optional function ``(old, new) -> bool``; default is :func:`is_scene_changed`
+    :return: A list of edits
+    :rtype: list
+
+    >>> from stash_vroom.diff import get_list_diff
+    >>> get_list_diff([{'id':'1'}, {'id':'2'}, {'id':'3'}], [{'id':'2'}, {'id':'3'}, {'id':'1'}])
+    [('move', 0, 2)]
+    """
+    is_changed = is_changed or is_scene_changed
+    if key is None:
+        # Plain IDs never change content.
+        old_items = [ {'id':X} for X in old_items ]
+        new_items = [ {'id':X} for X in new_items ]
+        edits = get_list_diff(old_items, new_items, key='id', is_changed=lambda old, new: False)
+        return [ X[:2] + (X[2]['id'],) if X[0] == 'insert' else X for X in edits ]
+
+    edits = []
+
+    new_pos = {}
+    for i, item in enumerate(new_items):
+        new_pos[item[key]] = i
+
+    # Removals, from the end so earlier indexes remain valid.
+    survivors = [] # Old items still wanted, in their old order
+    for i in range(len(old_items) - 1, -1, -1):
+        if old_items[i][key] not in new_pos:
+            edits.append(('remove', i))
+    for item in old_items:
+        if item[key] in new_pos:
+            survivors.append(item)
+
+    # Survivors in the longest increasing run of new positions never move.
+    old_pos = {}
+    for i, item in enumerate(survivors):
+        old_pos[item[key]] = i
+    stable = _get_lis_keys([ new_pos[X[key]] for X in survivors ], survivors, key)
+
+    # Every other item is placed just after its predecessor in the new order, in ascending new order.
+    # Fenwick trees over old positions track where items currently are without simulating the list.
+    n = len(survivors)
+    unplaced = _Fenwick(n + 1) # Floating survivors not moved yet, at 1 + old position
+    placed = _Fenwick(n + 1)   # Settled items, at 1 + old position of their stable anchor (0 is the list start)
+    for item in survivors:
+        if item[key] in stable:
+            placed.add(1 + old_pos[item[key]], 1)
+        else:
+            unplaced.add(1 + old_pos[item[key]], 1)
+
+    anchor = 0 # 1 + old position of the last stable item so far in the new order
+    for target, item in enumerate(new_items):
+        item_key = item[key]
+        if item_key in stable:
+            anchor = 1 + old_pos[item_key]
+            continue
+
+        if item_key in old_pos:
+            slot = 1 + old_pos[item_key]
+            from_i = placed.sum(slot - 1) + unplaced.sum(slot - 1)
+            unplaced.add(slot, -1)
+            to_i = target + unplaced.sum(anchor - 1) if anchor else target
+            if from_i != to_i:
+                edits.append(('move', from_i, to_i))
+        else:
+            to_i = target + unplaced.sum(anchor - 1) if anchor else target
+            edits.append(('insert', to_i, item))
+        placed.add(anchor, 1)
+
+    # Finally, refresh the content of known items which changed.
+    old_by_key = {}
+    for item in survivors:
+        old_by_key[item[key]] = item
+    for target, item in enumerate(new_items):
+        old_item = old_by_key.get(item[key])
+        if old_item is not None and is_changed(old_item, item):
+            edits.append(('update', target, item))
+
+    return edits
+
+def apply_list_diff(items, edits):
+    """
+    Apply edits from :func:`get_list_diff` to a list.
+
+    This works for plain lists and psygnal ``EventedList`` objects, which emit
+    one signal per edit and none for unchanged items.
+
+    :param items: The list to modify in place
+    :param edits: The edits from :func:`get_list_diff`
+    """
+    for edit in edits:
+        op = edit[0]
+        if op == 'remove':
+            del items[edit[1]]
+        elif op == 'insert':
+            items.insert(edit[1], edit[2])
+        elif op == 'move':
+            from_i, to_i = edit[1], edit[2]
+            if hasattr(items, 'move'):
+                # EventedList.move() inserts before the destination index as it was before removal.
+                items.move(from_i, to_i + 1 if to_i > from_i else to_i)
+            else:
+                items.insert(to_i, items.pop(from_i))
+        elif op == 'update':
+            items[edit[1]] = edit[2]
+        else:
+            raise ValueError(f'Unknown list edit: {edit!r}')
+
+def is_scene_changed(old, new):
+    """
+    Return whether a Stash object has new content.
+
+    Objects with an ``updated_at`` value compare by that alone, otherwise by their full content.
+    """
+    old_updated_at = old.get('updated_at')
+    new_updated_at = new.get('updated_at')
+    if old_updated_at is not None and new_updated_at is not None:
+        return old_updated_at != new_updated_at
+    return old != new
+
+def _get_lis_keys(values, items, key):
+    # Patience sorting: return the keys of items forming a longest strictly increasing subsequence of values.
+    tails = [] # tails[k] = smallest ending value of an increasing run of length k+1
+    tail_i = [] # Index in values of that ending value
+    prev_i = [None] * len(values)
+    for i, value in enumerate(values):
+        k = bisect.bisect_left(tails, value)
+        if k == len(tails):
+            tails.append(value)
+            tail_i.append(i)
+        else:
+            tails[k] = value
+            tail_i[k] = i
+        prev_i[i] = tail_i[k-1] if k > 0 else None
+
+    result = set()
+    i = tail_i[-1] if tail_i else None
+    while i is not None:
+        result.add(items[i][key])
+        i = prev_i[i]
+    return result
+
+class _Fenwick:
+    # A binary indexed tree of counts over slots 0 .. size-1.
+    def __init__(self, size):
+        self.tree = [0] * (size + 1)
+
+    def add(self, slot, delta):
+        i = slot + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def sum(self, slot):
+        # Total count of slots 0 .. slot, inclusive.
+        total = 0
+        i = slot + 1
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
@@ -0,0 +1,149 @@
+# Copyright 2025 Zyquo Onrel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module runs user event handlers in a bounded pool of worker threads,
+so a slow handler never delays the response to HereSphere.
+"""
+
+import time
+import logging
+import threading
+import concurrent.futures
+
+from typing import Any, Callable, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+class HandlerPool:
+    """
+    Dispatch events to registered handlers in worker threads.
+
+    Each handler is registered either fire-and-forget, or to be awaited for up to some seconds
+    so its result can go in the response. Per-handler counters track calls, errors, timeouts,
+    events dropped because the queue was full, and run time.
+    """
+
+    def __init__(self, max_workers=4, max_queue=256):
+        """
+        :param max_workers: Maximum handlers running at once
+        :param max_queue: Maximum handler calls waiting or running; further events are dropped
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+
+        self._lock = threading.Lock()
+        self._handlers: Dict[str, List[dict]] = {} # event_name -> [ {'func', 'wait', 'stats'}, ... ]
+        self._pending = threading.BoundedSemaphore(max_queue)
+        self._executor = None # Created on the first event
+
+    def register(self, event_name, func: Callable[..., Any], wait: Optional[float] = None):
+        """
+        Register a handler for an event.
+
+        :param event_name: The event, e.g. ``"play"``
+        :param func: The handler, called with the arguments passed to :meth:`dispatch`
+        :param wait: Seconds to wait for the result, or ``None`` to not wait at all
+        """
+        stats = {'calls': 0, 'errors': 0, 'timeouts': 0, 'dropped': 0, 'seconds': 0.0, 'max_seconds': 0.0}
+        with self._lock:
+            self._handlers.setdefault(event_name, []).append({'func': func, 'wait': wait, 'stats': stats})
+        log.debug(f'Registered handler for event {event_name}: {func.__name__}' + (f', wait {wait}s' if wait is not None else ''))
+
+    def has_handlers(self, event_name) -> bool:
+        with self._lock:
+            return bool(self._handlers.get(event_name))
+
+    def dispatch(self, event_name, *args, **kwargs) -> List[dict]:
+        """
+        Run every handler for an event, waiting only for those registered with ``wait``.
+
+        :return: One dict per handler with its ``handler`` name and a ``status`` of ``queued``,
+                 ``dropped``, ``ok`` (with a ``result``), ``error`` (with an ``error``), or ``timeout``
+        """
+        with self._lock:
+            handlers = list(self._handlers.get(event_name, []))
+            if self._executor is None and handlers:
+                self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='vroom-handler')
+            executor = self._executor
+
+        dispatched_at = time.monotonic()
+        started = []
+        for handler in handlers:
+            if not self._pending.acquire(blocking=False):
+                with self._lock:
+                    handler['stats']['dropped'] += 1
+                log.warning(f'Drop event {event_name} for {handler["func"].__name__}: {self.max_queue} handler calls pending')
+                started.append((handler, None))
+                continue
+            started.append((handler, executor.submit(self._call, handler, args, kwargs)))
+
+        results = []
+        for handler, future in started:
+            result = {'handler': handler['func'].__name__}
+            if future is None:
+                result['status'] = 'dropped'
+            elif handler['wait'] is None:
+                result['status'] = 'queued'
+            else:
+                try:
+                    # Every handler started at dispatch, so each waits at most its own seconds from then.
+                    value = future.result(timeout=max(0, dispatched_at + handler['wait'] - time.monotonic()))
+                    result['status'] = 'ok'
+                    result['result'] = str(value) if value is not None else None
+                except concurrent.futures.TimeoutError:
+                    with self._lock:
+                        handler['stats']['timeouts'] += 1
+                    result['status'] = 'timeout'
+                except Exception as e:
+                    result['status'] = 'error'
+                    result['error'] = str(e)
+            results.append(result)
+        return results
+
+    def get_stats(self) -> Dict[str, List[dict]]:
+        """
+        Return the counters of every handler.
+
+        :return: event_name -> list of dicts with ``handler``, ``calls``, ``errors``, ``timeouts``,
+                 ``dropped``, ``seconds`` (total run time), and ``max_seconds``
+        """
+        with self._lock:
+            return { K: [ dict(X['stats'], handler=X['func'].__name__) for X in V ] for K, V in self._handlers.items() }
+
+    def shutdown(self, wait=True):
+        """Stop the worker threads, after the queued handler calls if ``wait``."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=wait)
+
+    def _call(self, handler, args, kwargs):
+        started_at = time.monotonic()
+        error = None
+        try:
+            return handler['func'](*args, **kwargs)
+        except Exception as e:
+            error = e
+            log.error(f'Error in handler {handler["func"].__name__}: {e}')
+            raise
+        finally:
+            seconds = time.monotonic() - started_at
+            self._pending.release()
+            with self._lock:
+                stats = handler['stats']
+                stats['calls'] += 1
+                stats['errors'] += 1 if error else 0
+                stats['seconds'] += seconds
+                stats['max_seconds'] = max(stats['max_seconds'], seconds)
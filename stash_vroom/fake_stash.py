@@ -0,0 +1,542 @@
+# Copyright 2025 Zyquo Onrel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module is a stand-in for the Stash GraphQL server, for tests and benchmarks.
+
+:class:`FakeStash` is a WSGI app answering the operations of ``queries.graphql`` from a
+synthetic dataset, generated from a seed so every run sees the same scenes, tags, performers
+and markers. It can add latency and errors, and the dataset can change between queries,
+so refresh, diff and cache behaviour can be measured offline.
+
+>>> from stash_vroom.fake_stash import FakeStash
+>>> fake = FakeStash(scenes=100, seed=1)
+>>> client = fake.get_client() # In-process, no network
+>>> client.scene_ids(find_filter={'per_page': 5}, scene_filter={}).findScenes.count
+100
+"""
+
+import re
+import json
+import time
+import random
+import logging
+import datetime
+import threading
+import collections
+
+from typing import Dict, List, Optional
+
+import httpx
+
+from werkzeug.wrappers import Request, Response
+
+from . import stash_client
+
+log = logging.getLogger(__name__)
+
+# Every timestamp in the dataset counts from here.
+EPOCH = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+# A tiny JPEG-looking body for every screenshot, preview and image.
+MEDIA_BODY = b'\xff\xd8\xff\xe0' + bytes(4 * 1024) + b'\xff\xd9'
+
+class _Scene:
+    __slots__ = ('id', 'title', 'studio', 'tags', 'performers', 'markers', 'rating100', 'o_counter',
+                 'play_count', 'created', 'updated', 'duration', 'height', 'size')
+
+class FakeStash:
+    """
+    A fake Stash GraphQL server with a seeded synthetic dataset.
+
+    Use it in-process with :meth:`get_client`, or on localhost with :meth:`serve`.
+    """
+
+    def __init__(self, scenes=1000, seed=0, tags=None, performers=None, studios=None, images=100,
+                 filters=4, latency=0.0, jitter=0.0, error_rate=0.0):
+        """
+        :param scenes: How many scenes to generate
+        :param seed: The dataset seed; the same seed always generates the same dataset
+        :param tags: How many tags; default scales with ``scenes``
+        :param performers: How many performers; default scales with ``scenes``
+        :param studios: How many studios; default scales with ``scenes``
+        :param images: How many images to generate
+        :param filters: How many saved scene filters to generate
+        :param latency: Seconds added to every GraphQL request
+        :param jitter: Maximum random seconds added on top of ``latency``
+        :param error_rate: Fraction of GraphQL requests failing with HTTP 500
+        """
+        self.seed = seed
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+
+        self.calls = collections.Counter() # operation_name -> requests answered
+        self._lock = threading.Lock()
+        self._noise = random.Random(f'{seed}:noise') # Latency and errors, apart from the dataset
+        self._failures = collections.deque() # Queued HTTP statuses from fail()
+        self._server = None
+
+        self.tags = [ f'Tag {i}' for i in range(tags or max(20, min(2000, scenes // 20))) ]
+        self._tag_updated = [0] * len(self.tags) # Seconds from EPOCH
+        self.performers = [ self._get_performer(i) for i in range(performers or max(10, min(20000, scenes // 5))) ]
+        self.studios = [ f'Studio {i}' for i in range(studios or max(5, min(500, scenes // 100))) ]
+
+        # Popular tags and performers appear far more often, as in a real library.
+        self._tag_weights = list(_get_cum_weights(len(self.tags)))
+        self._performer_weights = list(_get_cum_weights(len(self.performers)))
+
+        self._tag_parent_overrides: Dict[int, int] = {}
+        self._scenes: Dict[int, _Scene] = {}
+        self._next_id = 1
+        self.add_scenes(scenes)
+        self.images = [ self._get_image(i) for i in range(1, images + 1) ]
+        self.saved_filters = [ self._get_saved_filter(i) for i in range(1, filters + 1) ]
+
+    def get_client(self, url='http://stash.fake:9999/graphql', raw=False) -> stash_client.Stash:
+        """
+        Return a Stash client answered in-process by this fake, including media requests.
+
+        :param raw: Whether the client returns plain dicts instead of models
+        """
+        http_client = httpx.Client(transport=httpx.WSGITransport(app=self))
+        return stash_client.Stash(url, http_client=http_client, raw=raw)
+
+    def serve(self, host='127.0.0.1', port=0) -> str:
+        """
+        Serve on a local port in a background thread, until :meth:`shutdown`.
+
+        :return: The GraphQL URL
+        """
+        from werkzeug.serving import make_server
+
+        self._server = make_server(host, port, self, threaded=True)
+        threading.Thread(target=self._server.serve_forever, name='vroom-fake-stash', daemon=True).start()
+        return f'http://{host}:{self._server.server_port}/graphql'
+
+    def shutdown(self):
+        if self._server:
+            self._server.shutdown()
+            self._server = None
+
+    def fail(self, times=1, status=500):
+        """Fail the next GraphQL requests with an HTTP status."""
+        with self._lock:
+            self._failures.extend([status] * times)
+
+    def add_scenes(self, count) -> List[str]:
+        """Generate more scenes, and return their IDs."""
+        with self._lock:
+            ids = list(range(self._next_id, self._next_id + count))
+            self._next_id += count
+            for scene_id in ids:
+                self._scenes[scene_id] = self._get_scene(scene_id)
+        return [ str(X) for X in ids ]
+
+    def remove_scenes(self, ids):
+        with self._lock:
+            for scene_id in ids:
+                self._scenes.pop(int(scene_id), None)
+
+    def update_scene(self, scene_id, **fields):
+        """
+        Change a scene, as a Stash user would, and bump its ``updated_at``.
+
+        :param fields: ``title``, ``rating100``, ``o_counter``, ``play_count`` or ``tag_ids``
+        """
+        with self._lock:
+            self._update_scene(self._scenes[int(scene_id)], fields)
+
+    def rename_tag(self, tag_id, name):
+        """Rename a tag, as a Stash user would, and bump its ``updated_at``."""
+        with self._lock:
+            i = int(tag_id) - 1
+            self.tags[i] = name
+            self._tag_updated[i] = _get_now()
+
+    def add_tag(self, name, parent_id=None) -> str:
+        """Add a tag and return its ID. Its parent is ``parent_id``, or else the usual one for its position."""
+        with self._lock:
+            self.tags.append(name)
+            self._tag_updated.append(_get_now())
+            self._tag_weights = list(_get_cum_weights(len(self.tags)))
+            if parent_id is not None:
+                self._tag_parent_overrides[len(self.tags) - 1] = int(parent_id) - 1
+            return str(len(self.tags))
+
+    def get_scene_count(self) -> int:
+        with self._lock:
+            return len(self._scenes)
+
+    def __call__(self, environ, start_response):
+        request = Request(environ)
+        if request.path.rstrip('/') == '/graphql':
+            response = self._handle_graphql(request)
+        else:
+            response = self._handle_media(request)
+        return response(environ, start_response)
+
+    # Dataset generation
+
+    def _get_rng(self, kind, i):
+        return random.Random(f'{self.seed}:{kind}:{i}')
+
+    def _get_performer(self, i):
+        rng = self._get_rng('performer', i)
+        return {
+            'id': str(i + 1),
+            'name': f'Performer {i + 1}',
+            'gender': rng.choices(['FEMALE', 'MALE', 'TRANSGENDER_FEMALE', 'NON_BINARY'], weights=[80, 15, 3, 2])[0],
+            'country': rng.choice(['US', 'CZ', 'JP', 'GB', 'HU', 'RU', None]),
+            'favorite': rng.random() < 0.1,
+            'ethnicity': rng.choice(['Caucasian', 'Asian', 'Latin', 'Black', None]),
+            'fake_tits': rng.choice(['Natural', 'Augmented', None]),
+            'tags': [],
+        }
+
+    def _get_scene(self, scene_id):
+        rng = self._get_rng('scene', scene_id)
+        scene = _Scene()
+        scene.id = scene_id
+        scene.title = f'Scene {scene_id}'
+        scene.studio = rng.randrange(len(self.studios)) if rng.random() < 0.9 else None
+        scene.tags = tuple(sorted(set(rng.choices(range(len(self.tags)), cum_weights=self._tag_weights, k=2 + int(rng.expovariate(1 / 6))))))
+        scene.performers = tuple(sorted(set(rng.choices(range(len(self.performers)), cum_weights=self._performer_weights, k=rng.choice([1, 1, 1, 2, 2, 3])))))
+        scene.markers = min(int(rng.expovariate(1 / 3)), 30)
+        scene.rating100 = rng.choice([None, None, 20, 40, 60, 80, 100])
+        scene.o_counter = int(rng.expovariate(1)) if rng.random() < 0.3 else 0
+        scene.play_count = int(rng.expovariate(1 / 2))
+        scene.created = scene_id * 600 + rng.randrange(600)
+        scene.updated = scene.created + rng.randrange(86400 * 30)
+        scene.duration = round(rng.uniform(300, 5400), 3)
+        scene.height = rng.choice([1920, 2880, 2880, 3840, 4096])
+        scene.size = int(scene.duration * scene.height * 3000)
+        return scene
+
+    def _get_image(self, i):
+        rng = self._get_rng('image', i)
+        tag_ids = sorted(set(rng.choices(range(len(self.tags)), cum_weights=self._tag_weights, k=rng.randint(1, 5))))
+        return {
+            'id': str(i),
+            'urls': [],
+            'title': f'Image {i}',
+            'paths': {'image': f'/image/{i}/image', 'thumbnail': f'/image/{i}/thumbnail', 'preview': None},
+            'tags': [ self._get_tag(X) for X in tag_ids ],
+            'visual_files': [{'__typename': 'ImageFile', 'id': str(i), 'path': f'/fake/images/{i}.jpg', 'size': 200_000 + i,
+                              'width': 1920, 'height': 1080, 'fingerprints': [{'type': 'md5', 'value': f'{i:032x}'}]}],
+        }
+
+    def _get_saved_filter(self, i):
+        find_filter = {'q': '', 'page': 1, 'per_page': 40, 'sort': ['date', 'updated_at', 'rating', 'title'][i % 4], 'direction': 'DESC'}
+        object_filter = {}
+        name = 'VR | Everything' if i == 1 else f'VR | Fake {i}'
+        if i % 3 == 2:
+            tag_id = (i - 1) % len(self.tags)
+            object_filter['tags'] = {'modifier': 'INCLUDES', 'value': {'items': [{'id': str(tag_id + 1), 'label': self.tags[tag_id]}], 'excluded': [], 'depth': 0}}
+        elif i % 3 == 0:
+            object_filter['rating100'] = {'modifier': 'GREATER_THAN', 'value': {'value': 50}}
+        return {'id': str(i), 'mode': 'SCENES', 'name': name, 'find_filter': find_filter, 'object_filter': object_filter, 'ui_options': {}}
+
+    def _get_tag(self, tag_index):
+        return {'id': str(tag_index + 1), 'name': self.tags[tag_index]}
+
+    def _get_tag_parent(self, tag_index):
+        # Tags nest ten to a parent, like a typical tag hierarchy: 10-19 under 0, 20-29 under 1, and so on.
+        return self._tag_parent_overrides.get(tag_index, tag_index // 10 - 1)
+
+    def _get_graph_tag(self, tag_index):
+        parent = self._get_tag_parent(tag_index)
+        return {'id': str(tag_index + 1), 'name': self.tags[tag_index], 'updated_at': self._get_timestamp(self._tag_updated[tag_index]),
+                'parents': [{'id': str(parent + 1)}] if parent >= 0 else []}
+
+    def _get_graph_studio(self, studio_index):
+        # Every studio after the fifth belongs to one of the first five networks.
+        parent = studio_index % 5 if studio_index >= 5 else None
+        return {'id': str(studio_index + 1), 'name': self.studios[studio_index], 'updated_at': self._get_timestamp(0),
+                'parent_studio': {'id': str(parent + 1)} if parent is not None else None, 'tags': []}
+
+    def _get_timestamp(self, seconds):
+        return (EPOCH + datetime.timedelta(seconds=seconds)).isoformat()
+
+    def _render_scene(self, scene: _Scene, host_url):
+        rng = self._get_rng('marker', scene.id)
+        markers = []
+        for i in range(scene.markers):
+            tag = rng.choice(scene.tags)
+            markers.append({
+                'id': f'{scene.id}-{i}',
+                'seconds': round(rng.uniform(0, scene.duration), 3),
+                'primary_tag': {'id': str(tag + 1)},
+                'tags': [ {'id': str(tag + 1)} ],
+            })
+        markers.sort(key=lambda X: X['seconds'])
+
+        url = f'{host_url}scene/{scene.id}'
+        studio = {'id': str(scene.studio + 1)} if scene.studio is not None else None
+        return {
+            'id': str(scene.id),
+            'urls': [],
+            'title': scene.title,
+            'details': None,
+            'rating100': scene.rating100,
+            'date': (EPOCH + datetime.timedelta(seconds=scene.created)).date().isoformat(),
+            'created_at': self._get_timestamp(scene.created),
+            'updated_at': self._get_timestamp(scene.updated),
+            'o_counter': scene.o_counter,
+            'play_count': scene.play_count,
+            'studio': studio,
+            'paths': {'stream': f'{url}/stream', 'screenshot': f'{url}/screenshot', 'preview': f'{url}/preview'},
+            'files': [{
+                'format': 'mp4',
+                'basename': f'Fake_Scene_{scene.id}_{scene.height}p_LR_180.mp4',
+                'path': f'/fake/scenes/Fake_Scene_{scene.id}_{scene.height}p_LR_180.mp4',
+                'size': scene.size,
+                'width': scene.height * 2,
+                'height': scene.height,
+                'duration': scene.duration,
+                'fingerprints': [{'type': 'oshash', 'value': f'{scene.id:016x}'}],
+            }],
+            'performers': [ dict(self.performers[X], image_path=f'{host_url}performer/{X + 1}/image', updated_at=self._get_timestamp(0))
+                            for X in scene.performers ],
+            'scene_markers': markers,
+            'tags': [ {'id': str(X + 1)} for X in scene.tags ],
+        }
+
+    def _update_scene(self, scene: _Scene, fields):
+        # Call with the lock held.
+        for key, value in fields.items():
+            if key == 'tag_ids':
+                scene.tags = tuple(sorted(int(X) - 1 for X in value))
+            elif key in ('title', 'rating100', 'o_counter', 'play_count'):
+                setattr(scene, key, value)
+        scene.updated = max(scene.updated + 1, _get_now())
+
+    # Queries
+
+    def _find_scenes(self, find_filter, scene_filter, ids=None):
+        find_filter = find_filter or {}
+        with self._lock:
+            if ids is not None:
+                scenes = [ self._scenes[int(X)] for X in ids if int(X) in self._scenes ]
+            else:
+                scenes = [ X for X in self._scenes.values() if _is_match(X, scene_filter or {}) ]
+
+        q = (find_filter.get('q') or '').lower()
+        if q:
+            scenes = [ X for X in scenes if q in X.title.lower() ]
+
+        sort = find_filter.get('sort') or 'id'
+        if sort.startswith('random'):
+            random.Random(sort).shuffle(scenes)
+        else:
+            key = {'date': 'created', 'created_at': 'created', 'updated_at': 'updated', 'rating': 'rating100'}.get(sort, sort)
+            if key not in _Scene.__slots__:
+                key = 'id'
+            scenes.sort(key=lambda X: (getattr(X, key) is None, getattr(X, key) or 0, X.id), reverse=find_filter.get('direction') == 'DESC')
+
+        total = len(scenes)
+        per_page = find_filter.get('per_page')
+        per_page = 25 if per_page is None else per_page
+        if per_page >= 0:
+            page = max(1, find_filter.get('page') or 1)
+            scenes = scenes[(page - 1) * per_page:page * per_page]
+        return total, scenes
+
+    def _handle_graphql(self, request):
+        try:
+            body = json.loads(request.get_data())
+        except ValueError:
+            return self._get_json_response({'errors': [{'message': 'Invalid JSON body'}]}, status=400)
+
+        operation = body.get('operationName') or ''
+        variables = body.get('variables') or {}
+        with self._lock:
+            self.calls[operation] += 1
+            status = self._failures.popleft() if self._failures else None
+            if status is None and self.error_rate and self._noise.random() < self.error_rate:
+                status = 500
+            delay = self.latency + (self._noise.uniform(0, self.jitter) if self.jitter else 0)
+
+        if delay > 0:
+            time.sleep(delay)
+        if status:
+            return Response(f'Injected failure for {operation}', status=status)
+
+        handler = getattr(self, f'_op_{operation}', None)
+        if handler is None:
+            return self._get_json_response({'data': None, 'errors': [{'message': f'Unknown operation: {operation}'}]})
+        try:
+            data = handler(variables, request.host_url)
+        except (KeyError, ValueError, TypeError) as e:
+            return self._get_json_response({'data': None, 'errors': [{'message': f'{operation}: {e!r}'}]})
+        return self._get_json_response({'data': data})
+
+    def _handle_media(self, request):
+        match = re.fullmatch(r'/(scene|image)/(\d+)/(stream|screenshot|preview|image|thumbnail)', request.path)
+        if not match:
+            return Response('Not found', status=404)
+        if match[1] == 'scene':
+            with self._lock:
+                scene = self._scenes.get(int(match[2]))
+            if scene is None:
+                return Response('Not found', status=404)
+        content_type = 'video/mp4' if match[3] in ('stream', 'preview') else 'image/jpeg'
+        return Response(MEDIA_BODY, content_type=content_type)
+
+    def _get_json_response(self, body, status=200):
+        return Response(json.dumps(body), status=status, content_type='application/json')
+
+    def _op_Version(self, variables, host_url):
+        return {'version': {'hash': 'fake', 'version': 'v0.28.1', 'build_time': EPOCH.isoformat()}}
+
+    def _op_Configuration(self, variables, host_url):
+        return {'configuration': {
+            'general': {'ffmpegPath': '/usr/bin/ffmpeg', 'ffprobePath': '/usr/bin/ffprobe', 'parallelTasks': 1, 'stashBoxes': []},
+            'plugins': {},
+        }}
+
+    def _op_SaveConfig(self, variables, host_url):
+        return {'configurePlugin': variables['input']}
+
+    def _op_SavedFilters(self, variables, host_url):
+        return {'findSavedFilters': [ X for X in self.saved_filters if X['mode'] == variables['mode'] ]}
+
+    def _op_Scenes(self, variables, host_url):
+        total, scenes = self._find_scenes(variables['find_filter'], variables['scene_filter'])
+        return {'findScenes': {
+            'count': total,
+            'duration': sum(X.duration for X in scenes),
+            'filesize': float(sum(X.size for X in scenes)),
+            'scenes': [ self._render_scene(X, host_url) for X in scenes ],
+        }}
+
+    def _op_SceneIds(self, variables, host_url):
+        total, scenes = self._find_scenes(variables['find_filter'], variables['scene_filter'])
+        return {'findScenes': {
+            'count': total,
+            'duration': sum(X.duration for X in scenes),
+            'filesize': float(sum(X.size for X in scenes)),
+            'scenes': [ {'id': str(X.id), 'updated_at': self._get_timestamp(X.updated)} for X in scenes ],
+        }}
+
+    def _op_ScenesByIds(self, variables, host_url):
+        total, scenes = self._find_scenes({'per_page': -1}, None, ids=variables.get('ids') or [])
+        return {'findScenes': {'count': total, 'scenes': [ self._render_scene(X, host_url) for X in scenes ]}}
+
+    def _op_ImagesByIds(self, variables, host_url):
+        ids = set(variables.get('ids') or [])
+        return {'findImages': {'images': [ X for X in self.images if X['id'] in ids ]}}
+
+    def _op_ImagesBySearch(self, variables, host_url):
+        q = variables['q'].lower()
+        return {'findImages': {'images': [ X for X in self.images if q in X['title'].lower() ]}}
+
+    def _op_ImagesByTagIds(self, variables, host_url):
+        ids = set(variables.get('ids') or [])
+        return {'findImages': {'images': [ X for X in self.images if ids & { T['id'] for T in X['tags'] } ]}}
+
+    def _op_TagsByRegex(self, variables, host_url):
+        regex = re.compile(variables['regex'])
+        return {'findTags': {'tags': [ {'id': str(i + 1), 'name': X} for i, X in enumerate(self.tags) if regex.search(X) ]}}
+
+    def _op_TagsAndStudios(self, variables, host_url):
+        with self._lock:
+            tags = [ self._get_graph_tag(X) for X in range(len(self.tags)) ]
+        studios = [ self._get_graph_studio(X) for X in range(len(self.studios)) ]
+        return {'findTags': {'count': len(tags), 'tags': tags}, 'findStudios': {'count': len(studios), 'studios': studios}}
+
+    def _op_TagsAndStudiosSince(self, variables, host_url):
+        since = datetime.datetime.fromisoformat(variables['since'].replace('Z', '+00:00'))
+        since = (since - EPOCH).total_seconds()
+        with self._lock:
+            tags = [ self._get_graph_tag(i) for i, X in enumerate(self._tag_updated) if X > since ]
+            tag_count = len(self.tags)
+        studios = [ self._get_graph_studio(X) for X in range(len(self.studios)) if since < 0 ]
+        return {
+            'findTags': {'count': len(tags), 'tags': tags},
+            'tagCount': {'count': tag_count},
+            'findStudios': {'count': len(studios), 'studios': studios},
+            'studioCount': {'count': len(self.studios)},
+        }
+
+    def _op_VroomWrites(self, variables, host_url):
+        # The batched edits from WriteQueue: aliases u<N> for sceneUpdate, and o<N> with t<N> for sceneAddO.
+        data = {}
+        with self._lock:
+            for alias, value in variables.items():
+                if alias.startswith('u'):
+                    fields = dict(value)
+                    scene = self._scenes[int(fields.pop('id'))]
+                    self._update_scene(scene, fields)
+                    data[alias] = {'id': str(scene.id)}
+                elif alias.startswith('o'):
+                    scene = self._scenes[int(value)]
+                    added = len(variables.get(f't{alias[1:]}') or [None])
+                    self._update_scene(scene, {'o_counter': scene.o_counter + added})
+                    data[alias] = {'count': scene.o_counter}
+        return data
+
+def _get_now():
+    # Whole seconds from EPOCH, like Stash timestamps.
+    return int((datetime.datetime.now(datetime.timezone.utc) - EPOCH).total_seconds())
+
+def _get_cum_weights(count):
+    # Zipf-like popularity: the weight of the n-th item is 1/n.
+    total = 0.0
+    for i in range(count):
+        total += 1 / (i + 1)
+        yield total
+
+def _is_match(scene: _Scene, scene_filter) -> bool:
+    # A useful subset of SceneFilterType: tags, performers, integer criteria, AND and NOT. Other criteria match every scene.
+    for key, criterion in scene_filter.items():
+        if key in ('tags', 'performers'):
+            values = { int(X) - 1 for X in criterion.get('value') or [] }
+            excludes = { int(X) - 1 for X in criterion.get('excludes') or [] }
+            have = set(getattr(scene, key))
+            modifier = criterion.get('modifier')
+            if have & excludes:
+                return False
+            if modifier == 'INCLUDES' and values and not have & values:
+                return False
+            if modifier == 'INCLUDES_ALL' and not values <= have:
+                return False
+            if modifier == 'EXCLUDES' and have & values:
+                return False
+        elif key in ('rating100', 'o_counter', 'play_count'):
+            if not _is_int_match(getattr(scene, key), criterion):
+                return False
+        elif key == 'AND' and not _is_match(scene, criterion):
+            return False
+        elif key == 'NOT' and _is_match(scene, criterion):
+            return False
+    return True
+
+def _is_int_match(value: Optional[int], criterion) -> bool:
+    modifier = criterion.get('modifier')
+    if modifier == 'IS_NULL':
+        return value is None
+    if modifier == 'NOT_NULL':
+        return value is not None
+    if value is None:
+        return False
+    target = criterion.get('value') or 0
+    return {
+        'EQUALS': value == target,
+        'NOT_EQUALS': value != target,
+        'GREATER_THAN': value > target,
+        'LESS_THAN': value < target,
+        'BETWEEN': target <= value <= (criterion.get('value2') or 0),
+        'NOT_BETWEEN': not target <= value <= (criterion.get('value2') or 0),
+    }.get(modifier, True)
@@ -0,0 +1,285 @@
+# Copyright 2025 Zyquo Onrel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module serves local video files directly, for when VRoom runs on the same machine as Stash.
+
+Whole files and single byte ranges are passed to the WSGI server's ``wsgi.file_wrapper``, so
+servers which support it (e.g. gunicorn) send the bytes with ``os.sendfile`` and Python never
+copies them. Multiple byte ranges are served as ``multipart/byteranges`` per RFC 7233.
+"""
+
+import os
+import secrets
+import logging
+import mimetypes
+import threading
+import collections
+
+from typing import Dict, List, Optional, Tuple
+from werkzeug.http import http_date
+from werkzeug.wsgi import wrap_file
+from werkzeug.wrappers import Request, Response
+
+log = logging.getLogger(__name__)
+
+# Requests with more ranges than this, after merging overlaps, get the whole file instead.
+MAX_RANGES = 16
+
+class PathMap:
+    """
+    Map file paths as Stash sees them to paths on this machine.
+
+    >>> from stash_vroom.file_server import PathMap
+    >>> PathMap({'/data': '/mnt/nas'}).get_local_path('/data/vr/scene.mp4')
+    '/mnt/nas/vr/scene.mp4'
+    """
+
+    def __init__(self, mappings: Dict[str, str]):
+        """
+        :param mappings: Stash path prefix -> local path prefix; the longest matching prefix wins
+        """
+        pairs = [ (X.rstrip('/'), os.path.normpath(Y)) for X, Y in mappings.items() ]
+        self.mappings = sorted(pairs, key=lambda X: len(X[0]), reverse=True)
+
+    def get_local_path(self, path) -> Optional[str]:
+        """Return the local path for a Stash path, or ``None`` if no prefix matches or it escapes the prefix."""
+        for stash_prefix, local_prefix in self.mappings:
+            if not path.startswith(stash_prefix + '/'):
+                continue
+            local_path = os.path.normpath(os.path.join(local_prefix, path[len(stash_prefix)+1:]))
+            if local_path.startswith(local_prefix + os.sep):
+                return local_path
+            return None
+        return None
+
+class FilePool:
+    """
+    Keep recently used files open, so each range request from a seeking player skips ``open()``.
+
+    A file is checked out by one response at a time, since its position is not shared.
+    Files replaced on disk are never reused, as the pool matches their size and modification time.
+    """
+
+    def __init__(self, max_open=32):
+        """
+        :param max_open: Maximum idle open files
+        """
+        self.max_open = max_open
+        self._lock = threading.Lock()
+        self._idle = collections.OrderedDict() # (path, mtime_ns, size) -> [ file, ... ], least recently used first
+        self._count = 0
+
+    def checkout(self, path) -> Tuple[tuple, object, os.stat_result]:
+        """
+        Return an open file for a path.
+
+        :return: A tuple of the pool key, the file object, and its stat result
+        :raises OSError: If the file cannot be opened
+        """
+        st = os.stat(path)
+        key = (path, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            files = self._idle.get(key)
+            if files:
+                file = files.pop()
+                if not files:
+                    del self._idle[key]
+                self._count -= 1
+                return key, file, st
+        # Unbuffered, so seek() always moves the descriptor too, which sendfile reads from.
+        return key, open(path, 'rb', buffering=0), st
+
+    def checkin(self, key, file):
+        """Return a file to the pool, closing the least recently used files beyond ``max_open``."""
+        with self._lock:
+            self._idle.setdefault(key, []).append(file)
+            self._idle.move_to_end(key)
+            self._count += 1
+            while self._count > self.max_open:
+                old_key, files = next(iter(self._idle.items()))
+                files.pop(0).close()
+                if not files:
+                    del self._idle[old_key]
+                self._count -= 1
+
+    def close(self):
+        """Close every idle file."""
+        with self._lock:
+            for files in self._idle.values():
+                for file in files:
+                    file.close()
+            self._idle.clear()
+            self._count = 0
+
+def get_ranges(header, size) -> Optional[List[Tuple[int, int]]]:
+    """
+    Parse an HTTP ``Range`` header.
+
+    :param header: The header value, e.g. ``"bytes=0-99,-100"``
+    :param size: The file size
+    :return: Ascending ``(start, stop)`` ranges with overlaps merged; an empty list if none
+             is satisfiable; or ``None`` if the header is absent, invalid, or should be ignored
+
+    >>> from stash_vroom.file_server import get_ranges
+    >>> get_ranges('bytes=0-99,50-149,-100', 1000)
+    [(0, 150), (900, 1000)]
+    """
+    if not header:
+        return None
+    units, _, spec = header.partition('=')
+    if units.strip().lower() != 'bytes':
+        return None
+
+    ranges = []
+    for part in spec.split(','):
+        first, dash, last = part.strip().partition('-')
+        if not dash:
+            return None
+        try:
+            if first == '':
+                length = int(last)
+                start, stop = max(0, size - length), size if length > 0 else 0
+            else:
+                start = int(first)
+                stop = min(int(last) + 1, size) if last else size
+                if last and int(last) < start:
+                    return None
+        except ValueError:
+            return None
+        if start < stop:
+            ranges.append((start, stop))
+
+    merged = []
+    for start, stop in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+        else:
+            merged.append((start, stop))
+    if len(merged) > MAX_RANGES:
+        return None
+    return merged
+
+def serve_file(request: Request, path, pool: FilePool, buffer_size=1024**2) -> Response:
+    """
+    Return a response serving a local file, with conditional and range request support.
+
+    :param request: The current request
+    :param path: The local file path
+    :param pool: The pool of open files
+    :param buffer_size: Bytes per read when the WSGI server cannot use ``sendfile``
+    :raises OSError: If the file cannot be opened
+    """
+    key, file, st = pool.checkout(path)
+    size = st.st_size
+    etag = f'{st.st_mtime_ns:x}-{size:x}'
+    mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    headers = {'Accept-Ranges': 'bytes', 'Last-Modified': http_date(st.st_mtime)}
+
+    if request.if_none_match.contains(etag):
+        pool.checkin(key, file)
+        response = Response(status=304, headers=headers)
+        response.set_etag(etag)
+        return response
+
+    ranges = get_ranges(request.headers.get('Range'), size)
+    if ranges is not None and 'If-Range' in request.headers:
+        if_range = request.if_range
+        if if_range.etag != etag and not (if_range.date and if_range.date.timestamp() >= int(st.st_mtime)):
+            ranges = None
+
+    if ranges == []:
+        pool.checkin(key, file)
+        headers['Content-Range'] = f'bytes */{size}'
+        return Response(status=416, headers=headers)
+
+    if ranges is None or len(ranges) == 1:
+        start, stop = ranges[0] if ranges else (0, size)
+        body = _FileSlice(pool, key, file, start, stop - start)
+        if ranges:
+            headers['Content-Range'] = f'bytes {start}-{stop-1}/{size}'
+        response = Response(wrap_file(request.environ, body, buffer_size), status=206 if ranges else 200,
+                            headers=headers, mimetype=mimetype, direct_passthrough=True)
+        response.content_length = stop - start
+    else:
+        body = _MultiRangeBody(pool, key, file, ranges, size, mimetype, buffer_size)
+        response = Response(body, status=206, headers=headers, direct_passthrough=True)
+        response.content_type = f'multipart/byteranges; boundary={body.boundary}'
+        response.content_length = body.length
+
+    response.set_etag(etag)
+    if request.method == 'HEAD':
+        body.close()
+    return response
+
+class _FileSlice:
+    # A file-like view of one byte range, returned to the pool when closed.
+    # fileno() lets sendfile servers skip read(); they send Content-Length bytes from the current position.
+    def __init__(self, pool, key, file, start, length):
+        self.pool = pool
+        self.key = key
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if self.file is None:
+            return b''
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        file, self.file = self.file, None
+        if file is not None:
+            self.pool.checkin(self.key, file)
+
+class _MultiRangeBody:
+    # An iterable multipart/byteranges body, returning the file to the pool when closed.
+    def __init__(self, pool, key, file, ranges, size, mimetype, buffer_size):
+        self.pool = pool
+        self.key = key
+        self.file = file
+        self.boundary = secrets.token_hex(16)
+        self.buffer_size = buffer_size
+
+        self.parts = []
+        for start, stop in ranges:
+            head = (f'--{self.boundary}\r\nContent-Type: {mimetype}\r\n'
+                    f'Content-Range: bytes {start}-{stop-1}/{size}\r\n\r\n').encode('latin-1')
+            self.parts.append((head, start, stop))
+        self.tail = f'--{self.boundary}--\r\n'.encode('latin-1')
+        self.length = sum(len(H) + (B - A) + 2 for H, A, B in self.parts) + len(self.tail)
+
+    def __iter__(self):
+        for head, start, stop in self.parts:
+            yield head
+            self.file.seek(start)
+            while start < stop:
+                data = self.file.read(min(self.buffer_size, stop - start))
+                if not data:
+                    raise IOError(f'File shrank while serving: {self.key[0]}')
+                start += len(data)
+                yield data
+            yield b'\r\n'
+        yield self.tail
+
+    def close(self):
+        file, self.file = self.file, None
+        if file is not None:
+            self.pool.checkin(self.key, file)
@@ -0,0 +1,303 @@
+# Copyright 2025 Zyquo Onrel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module keeps a local, normalized copy of the Stash tag and studio hierarchies.
+
+Scene queries request only tag and studio IDs. :class:`StashGraph` resolves them to names,
+with one shared dict per tag or studio however many scenes refer to it, and answers
+ancestry questions at any depth from memoized transitive closures.
+"""
+
+import time
+import logging
+import datetime
+import threading
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from . import util
+
+log = logging.getLogger(__name__)
+
+class StashGraph:
+    """
+    Tags and studios from Stash, loaded once and then refreshed incrementally.
+
+    >>> from stash_vroom.graph import StashGraph
+    >>> graph = StashGraph()
+    >>> graph.apply({'findTags': {'count': 2, 'tags': [
+    ...     {'id': '1', 'name': 'Position', 'updated_at': '2025-01-01T00:00:00Z', 'parents': []},
+    ...     {'id': '2', 'name': 'Standing', 'updated_at': '2025-01-01T00:00:00Z', 'parents': [{'id': '1'}]},
+    ... ]}, 'findStudios': {'count': 0, 'studios': []}}, full=True)
+    True
+    >>> [ X['name'] for X in graph.get_tag_ancestors('2') ]
+    ['Position']
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock() # One refresh at a time
+        self._tags: Dict[str, dict] = {} # tag_id -> {'id', 'name'}, shared by every scene
+        self._tag_parents: Dict[str, Tuple[str, ...]] = {}
+        self._studios: Dict[str, dict] = {} # studio_id -> {'id', 'name', 'tags'}, shared by every scene
+        self._studio_parent: Dict[str, Optional[str]] = {}
+        self._studio_tags: Dict[str, Tuple[str, ...]] = {}
+        self._ancestors: Dict[Tuple[str, str], Tuple[str, ...]] = {} # Memoized closures: (kind, id) -> ancestor IDs, nearest first
+        self._updated_at = None # The latest updated_at seen, as a datetime
+        self.version = 0 # Incremented whenever any name or relation changes
+        self.refreshed_at = None # time.monotonic() of the last refresh
+
+    def refresh(self, client, max_age=None) -> bool:
+        """
+        Bring the graph up to date with Stash, fetching only what changed since the last refresh.
+
+        Everything is fetched on the first refresh, or when tags or studios were deleted,
+        which the counts reveal.
+
+        :param client: The Stash GraphQL client
+        :param max_age: Skip the refresh if the last one is younger than this many seconds
+        :return: ``True`` if anything changed
+        """
+        with self._refresh_lock:
+            if max_age is not None and self.refreshed_at is not None and time.monotonic() - self.refreshed_at < max_age:
+                return False
+
+            started_at = time.monotonic()
+            since = self._get_since()
+            if since is None:
+                changed = self.apply(util.to_dict(client.tags_and_studios()), full=True)
+            else:
+                res = util.to_dict(client.tags_and_studios_since(since=since))
+                changed = self.apply(res)
+                with self._lock:
+                    counts = (len(self._tags), len(self._studios))
+                if counts != (res['tagCount']['count'], res['studioCount']['count']):
+                    log.debug(f'Graph counts {counts} differ from Stash, so reload it all')
+                    changed = self.apply(util.to_dict(client.tags_and_studios()), full=True) or changed
+            self.refreshed_at = started_at
+        return changed
+
+    def apply(self, res: dict, full=False) -> bool:
+        """
+        Apply a ``TagsAndStudios`` or ``TagsAndStudiosSince`` response.
+
+        Known tags and studios are updated in place, so scenes referring to them see the change.
+
+        :param res: The response data
+        :param full: Whether the response has every tag and studio, so others were deleted
+        :return: ``True`` if anything changed
+        """
+        tags = res['findTags']['tags']
+        studios = res['findStudios']['studios']
+        changed = False
+        with self._lock:
+            for tag in tags:
+                parents = tuple(X['id'] for X in tag.get('parents') or [])
+                changed = self._set_node(self._tags, tag, {'id': tag['id'], 'name': tag['name']}) or changed
+                if self._tag_parents.get(tag['id']) != parents:
+                    self._tag_parents[tag['id']] = parents
+                    changed = True
+
+            for studio in studios:
+                parent = (studio.get('parent_studio') or {}).get('id')
+                tag_ids = tuple(X['id'] for X in studio.get('tags') or [])
+                changed = self._set_node(self._studios, studio, {'id': studio['id'], 'name': studio['name'], 'tags': []}) or changed
+                if self._studio_parent.get(studio['id'], '') != parent or self._studio_tags.get(studio['id']) != tag_ids:
+                    self._studio_parent[studio['id']] = parent
+                    self._studio_tags[studio['id']] = tag_ids
+                    changed = True
+
+            if full:
+                for nodes, relations, items in ((self._tags, (self._tag_parents,), tags), (self._studios, (self._studio_parent, self._studio_tags), studios)):
+                    for node_id in set(nodes) - { X['id'] for X in items }:
+                        del nodes[node_id]
+                        for relation in relations:
+                            relation.pop(node_id, None)
+                        changed = True
+
+            for item in tags + studios:
+                updated_at = _parse_timestamp(item.get('updated_at'))
+                if updated_at and (self._updated_at is None or updated_at > self._updated_at):
+                    self._updated_at = updated_at
+
+            if changed:
+                self._ancestors.clear()
+                for studio_id, studio in self._studios.items():
+                    studio['tags'] = [ self._tags[X] for X in self._studio_tags.get(studio_id, ()) if X in self._tags ]
+                self.version += 1
+        if changed:
+            log.debug(f'Graph version {self.version}: {len(self._tags)} tags, {len(self._studios)} studios')
+        return changed
+
+    def get_tag(self, tag_id) -> Optional[dict]:
+        """Return the shared ``{'id', 'name'}`` dict of a tag, or ``None``. Do not modify it."""
+        with self._lock:
+            return self._tags.get(str(tag_id))
+
+    def get_studio(self, studio_id) -> Optional[dict]:
+        """Return the shared ``{'id', 'name', 'tags'}`` dict of a studio, or ``None``. Do not modify it."""
+        with self._lock:
+            return self._studios.get(str(studio_id))
+
+    def get_tag_ancestors(self, tag_id) -> List[dict]:
+        """
+        Return every ancestor of a tag at any depth, nearest first, each once.
+
+        :param tag_id: The Stash tag ID
+        """
+        with self._lock:
+            return [ self._tags[X] for X in self._get_ancestors('tag', str(tag_id)) if X in self._tags ]
+
+    def get_studio_ancestors(self, studio_id) -> List[dict]:
+        """
+        Return the parent studio, its parent, and so on.
+
+        :param studio_id: The Stash studio ID
+        """
+        with self._lock:
+            return [ self._studios[X] for X in self._get_ancestors('studio', str(studio_id)) if X in self._studios ]
+
+    def has_tag(self, tag_id, ancestor_id) -> bool:
+        """Return whether a tag is another tag, or any of its descendants."""
+        tag_id, ancestor_id = str(tag_id), str(ancestor_id)
+        with self._lock:
+            return tag_id == ancestor_id or ancestor_id in self._get_ancestors('tag', tag_id)
+
+    def get_missing(self, scenes) -> Tuple[Set[str], Set[str]]:
+        """
+        Return the tag and studio IDs referenced by scenes but unknown to the graph.
+
+        Referenced tags without a name are from scene queries; tags with one need nothing from here.
+        """
+        tag_ids, studio_ids = set(), set()
+        with self._lock:
+            for scene in scenes:
+                for tag in _iter_scene_tags(scene):
+                    if 'name' not in tag and tag.get('id') not in self._tags:
+                        tag_ids.add(tag.get('id'))
+                studio = scene.get('studio')
+                if studio and 'name' not in studio and studio.get('id') not in self._studios:
+                    studio_ids.add(studio.get('id'))
+        return tag_ids, studio_ids
+
+    def hydrate_scene(self, scene: dict) -> dict:
+        """
+        Return a copy of a scene, whose tags, marker tags and studio are the shared graph dicts.
+
+        Unknown tags and studios stay as they are.
+
+        :param scene: A scene from the Stash API
+        """
+        scene = dict(scene)
+        with self._lock:
+            if 'tags' in scene:
+                scene['tags'] = [ self._tags.get(X.get('id')) or X for X in scene['tags'] or [] ]
+            if scene.get('scene_markers'):
+                markers = []
+                for marker in scene['scene_markers']:
+                    marker = dict(marker)
+                    if marker.get('primary_tag'):
+                        marker['primary_tag'] = self._tags.get(marker['primary_tag'].get('id')) or marker['primary_tag']
+                    if 'tags' in marker:
+                        marker['tags'] = [ self._tags.get(X.get('id')) or X for X in marker['tags'] or [] ]
+                    markers.append(marker)
+                scene['scene_markers'] = markers
+            if scene.get('studio'):
+                scene['studio'] = self._studios.get(scene['studio'].get('id')) or scene['studio']
+        return scene
+
+    def is_hydrated(self, scene: dict) -> bool:
+        """Return whether every tag and the studio of a scene has a name, so nothing is left for :meth:`hydrate_scene`."""
+        if any('name' not in X for X in _iter_scene_tags(scene)):
+            return False
+        studio = scene.get('studio')
+        return not studio or 'name' in studio
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the graph as a ``TagsAndStudios`` response, e.g. to save in a snapshot."""
+        with self._lock:
+            tags = [ {'id': K, 'name': V['name'], 'updated_at': None, 'parents': [ {'id': X} for X in self._tag_parents.get(K, ()) ]}
+                     for K, V in self._tags.items() ]
+            studios = [ {'id': K, 'name': V['name'], 'updated_at': None,
+                         'parent_studio': {'id': self._studio_parent[K]} if self._studio_parent.get(K) else None,
+                         'tags': [ {'id': X} for X in self._studio_tags.get(K, ()) ]}
+                        for K, V in self._studios.items() ]
+            updated_at = self._updated_at.isoformat() if self._updated_at else None
+        return {'findTags': {'count': len(tags), 'tags': tags}, 'findStudios': {'count': len(studios), 'studios': studios}, 'updated_at': updated_at}
+
+    def load_dict(self, data: Dict[str, Any]):
+        """Load a graph saved by :meth:`to_dict`. The next :meth:`refresh` then fetches only changes."""
+        self.apply(data, full=True)
+        with self._lock:
+            self._updated_at = _parse_timestamp(data.get('updated_at'))
+
+    def _set_node(self, nodes, item, value) -> bool:
+        # Call with the lock held. Update a shared dict in place, or add it.
+        node = nodes.get(item['id'])
+        if node is None:
+            nodes[item['id']] = value
+            return True
+        if node['name'] != item['name']:
+            node['name'] = item['name']
+            return True
+        return False
+
+    def _get_ancestors(self, kind, node_id) -> Tuple[str, ...]:
+        # Call with the lock held. Breadth first, so nearer ancestors come first; cycles are ignored.
+        key = (kind, node_id)
+        result = self._ancestors.get(key)
+        if result is not None:
+            return result
+
+        if kind == 'tag':
+            get_parents = lambda X: self._tag_parents.get(X, ())
+        else:
+            get_parents = lambda X: (self._studio_parent[X],) if self._studio_parent.get(X) else ()
+        seen = {node_id}
+        result = []
+        queue = list(get_parents(node_id))
+        while queue:
+            parent = queue.pop(0)
+            if parent in seen:
+                continue
+            seen.add(parent)
+            result.append(parent)
+            queue.extend(get_parents(parent))
+        result = tuple(result)
+        self._ancestors[key] = result
+        return result
+
+    def _get_since(self) -> Optional[str]:
+        # One second of overlap, since Stash timestamps have whole seconds.
+        with self._lock:
+            if self._updated_at is None:
+                return None
+            return (self._updated_at - datetime.timedelta(seconds=1)).isoformat()
+
+def _iter_scene_tags(scene):
+    yield from scene.get('tags') or []
+    for marker in scene.get('scene_markers') or []:
+        if marker.get('primary_tag'):
+            yield marker['primary_tag']
+        yield from marker.get('tags') or []
+
+def _parse_timestamp(value) -> Optional[datetime.datetime]:
+    if not value:
+        return None
+    try:
+        result = datetime.datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return result if result.tzinfo else result.replace(tzinfo=datetime.timezone.utc)
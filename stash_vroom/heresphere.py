@@ -18,22 +18,44 @@ and easily handle user events and interactions without writing an entire web ser
 """
 
 import io
+import os
 import re
 import copy as Copy
-import json
 import math
+import time
+import bisect
+import hashlib
+import collections
+import concurrent.futures
+import functools
 import inspect
 import logging
+import httpx
 import psygnal
 import threading
 import PIL.Image
 import PIL.ImageDraw
 import PIL.ImageFont
 
-from typing import Dict, List, Callable, Any, Optional
-from flask import ( Flask, g, request, Response, jsonify, make_response )
+from typing import Dict, List, Callable, Any, Optional, Tuple
+from flask import ( Flask, g, request, Response, jsonify, make_response, send_file )
 import psygnal.containers
+from flask.json.provider import DefaultJSONProvider
 
+from . import slr
+from . import diff
+from . import scheduler
+from . import jobs
+from . import media_cache
+from . import file_server
+from . import dispatch
+from . import writes
+from . import snapshot
+from . import metrics
+from . import memory
+from . import graph
+from . import paging
+from . import jsoncodec
 from . import util
 from . import stash
 # from . import changes
@@ -44,10 +66,142 @@ new_scene_filter_signature = inspect.Signature([
     inspect.Parameter('name', inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=str),
     inspect.Parameter('search_filter', inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=dict),
     inspect.Parameter('scene_filter', inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=dict),
-    inspect.Parameter('scenes', inspect.Parameter.POSITIONAL_OR_KEYWORD, default=None, annotation=Optional[List[Dict[str, Any]]]),
+    inspect.Parameter('scene_ids', inspect.Parameter.POSITIONAL_OR_KEYWORD, default=None, annotation=Optional[List[str]]),
     inspect.Parameter('filter_id', inspect.Parameter.POSITIONAL_OR_KEYWORD, default=None, annotation=Optional[str]),
 ])
 
+# Maximum concurrent Stash queries while loading saved filters, counting every page and chunk of every filter.
+FILTER_QUERY_WORKERS = 4
+
+# Default seconds between background refreshes of each saved filter.
+FILTER_REFRESH_INTERVAL = 600
+
+# Seconds between background refreshes while Stash job updates arrive over a websocket; only a safety net.
+FILTER_REFRESH_INTERVAL_LIVE = 3600
+
+# Seconds to wait after a Stash job finishes before refreshing, so a burst of jobs refreshes once.
+JOB_REFRESH_DELAY = 2
+
+# Number of recently requested scenes remembered, to refresh the filters being browsed first.
+RECENT_SCENES = 1000
+
+# Maximum scenes per query when fetching full data for new or changed scenes; smaller while Stash is slow.
+SCENE_FETCH_CHUNK = 500
+
+# Seconds each query for full scene data should take, which sets the chunk size.
+SCENE_FETCH_SECONDS = 2.0
+
+# Scene IDs per page when listing the scenes of a filter.
+SCENE_ID_PAGE = 5000
+
+# Maximum pages or chunks of one filter fetched from Stash at once, within FILTER_QUERY_WORKERS for all filters.
+SCENE_FETCH_WORKERS = 4
+
+# Whether to decode full scene data scene by scene as it arrives, never holding a whole reply.
+SCENE_FETCH_STREAM = True
+
+# Directory and maximum total size of the on-disk cache of scene screenshots, previews, and performer images.
+MEDIA_CACHE_DIR = os.environ.get('VROOM_MEDIA_CACHE', os.path.expanduser('~/.cache/stash-vroom/media'))
+MEDIA_CACHE_BYTES = 2 * 1024**3
+
+# Scene paths served through the media cache. Performer images are too, as kind ``performer-<id>``.
+MEDIA_KINDS = ('screenshot', 'preview')
+
+# Attempts to serve a media file which the cache evicts before it is opened.
+MEDIA_ATTEMPTS = 3
+
+# Maximum idle open video files kept for direct local file serving.
+LOCAL_FILE_POOL = 32
+
+# Maximum event handlers running at once, and calls waiting or running before events are dropped.
+HANDLER_WORKERS = 4
+HANDLER_QUEUE = 256
+
+# HereSphere event server codes.
+HS_EVENTS = {0: 'open', 1: 'play', 2: 'pause', 3: 'close'}
+
+# Seconds to coalesce edits to a scene from HereSphere before writing them to Stash, and the file keeping unwritten edits.
+WRITE_DELAY = 2
+WRITE_JOURNAL = os.environ.get('VROOM_WRITE_JOURNAL', os.path.expanduser('~/.cache/stash-vroom/writes.json'))
+
+# Approximate bytes per chunk of the streamed scan response.
+SCAN_CHUNK_BYTES = 64 * 1024
+
+# Compressed snapshot of the saved filters and scenes, to serve HereSphere at once after a restart.
+SNAPSHOT_PATH = os.environ.get('VROOM_SNAPSHOT', os.path.expanduser('~/.cache/stash-vroom/snapshot.json.gz'))
+
+# Minimum seconds between incremental refreshes of the tag and studio graph, unless a scene refers to an unknown one.
+GRAPH_REFRESH_INTERVAL = 60
+
+# Stack frames to trace per memory allocation, reported at /admin/memory. Zero disables memory profiling.
+MEMORY_PROFILE_FRAMES = int(os.environ.get('VROOM_TRACEMALLOC') or 0)
+
+# Saved filters with one of these prefixes become HereSphere libraries, e.g. "VR | Favorites".
+FILTER_NAME_RE = r'^(AA|VR|HS|XP)\s*\|\s*(.+)$'
+
+# EventedList signals which change the content of a HereSphere library.
+LIBRARY_EVENTS = ('inserted', 'removed', 'changed', 'moved', 'reordered')
+
+# Filename projection markers -> HereSphere projection fields. The first match wins.
+PROJECTIONS = (
+    (r'MKX200'           , {'projection':'fisheye'           , 'stereo':'sbs', 'fov':200.0, 'lens':'MKX200'}),
+    (r'MKX220'           , {'projection':'fisheye'           , 'stereo':'sbs', 'fov':220.0, 'lens':'MKX220'}),
+    (r'VRCA220'          , {'projection':'fisheye'           , 'stereo':'sbs', 'fov':220.0, 'lens':'VRCA220'}),
+    (r'FISHEYE190'       , {'projection':'fisheye'           , 'stereo':'sbs', 'fov':190.0, 'lens':'Linear'}),
+    (r'FISHEYE'          , {'projection':'fisheye'           , 'stereo':'sbs', 'fov':180.0, 'lens':'Linear'}),
+    (r'TB_360|360_TB|360', {'projection':'equirectangular360', 'stereo':'tb' , 'fov':360.0, 'lens':'Linear'}),
+    (r'LR_180|180_LR|180', {'projection':'equirectangular'   , 'stereo':'sbs', 'fov':180.0, 'lens':'Linear'}),
+)
+DEFAULT_PROJECTION = {'projection':'equirectangular', 'stereo':'sbs', 'fov':180.0, 'lens':'Linear'}
+
+def get_projection(filename):
+    """
+    Return the HereSphere projection fields for a VR video filename.
+
+    :param filename: A filename or file path
+    :type filename: str
+    :return: A dict with ``projection``, ``stereo``, ``fov``, and ``lens`` keys.
+    :rtype: dict
+
+    >>> from stash_vroom.heresphere import get_projection
+    >>> get_projection('SLR_StudioName_Title_Original_1080p_12345_TB_360.mp4')['projection']
+    'equirectangular360'
+    """
+    slr_info = slr.get_slr_info(filename or '')
+    if slr_info:
+        filename = slr_info[5]
+
+    for pattern, projection in PROJECTIONS:
+        if re.search(r'(^|[\W_])(' + pattern + r')([\W_]|$)', filename or '', flags=re.IGNORECASE):
+            return dict(projection)
+    return dict(DEFAULT_PROJECTION)
+
+@functools.lru_cache(maxsize=None)
+def get_font(filename, size):
+    """
+    Return a bundled font, loading it only once per file and size.
+
+    :param filename: A font filename in the bundled fonts directory, e.g. ``VeraMono.ttf``
+    :param size: The font size in points
+    :return: A PIL font object
+    """
+    font_path = util.get_font_dirpath() + '/' + filename
+    log.debug(f'Load font: {font_path} at size {size}')
+    return PIL.ImageFont.truetype(font_path, size)
+
+class JSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON, as for ``jsonify`` and ``request.get_json``, through :mod:`~stash_vroom.jsoncodec`.
+
+    Unlike Flask's own, keys stay in their order rather than sorted.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        return jsoncodec.dumps(obj, indent=bool(kwargs.get('indent')), default=self.default).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return jsoncodec.loads(s)
+
 class HereSphere(Flask):
     """
     Main class for the HereSphere application.
@@ -56,8 +210,8 @@ class HereSphere(Flask):
     decorators for registering them.
     """
 
-    saved_scene_filters = psygnal.containers.EventedList()
     saved_filter = psygnal.Signal(new_scene_filter_signature, check_types_on_connect=True)
+    json_provider_class = JSONProvider
     
     def __init__(self, name='Stash VRoom HereSphere Service', **kwargs):
         """
@@ -71,6 +225,7 @@ class HereSphere(Flask):
         self._vroom_lock = threading.Lock()
 
         self.stash_client = None # Will be initialized later with init_stash()
+        self.stash_graph = graph.StashGraph() # Tags and studios, to resolve the IDs in scenes
 
         self._vroom_cache = {}
         # self._vroom_state = {}
@@ -79,10 +234,40 @@ class HereSphere(Flask):
         # self._vroom_state['doubleclick'] = {} # scene_id -> timestamp
         # self._vroom_state['playback'] = {} # scene_id -> timestamp
 
-        self._vroom_scenes_by_filter = {} # filter_name -> [ scene, scene, ... ]
+        self.saved_scene_filters = psygnal.containers.EventedList() # Saved filters in ascending order of ID
+        self._vroom_filter_ids = [] # int(filter['id']) for each of saved_scene_filters, for bisection
+        self._vroom_scenes_by_filter = {} # filter_name -> [ scene_id, scene_id, ... ]
+        self._vroom_library_version = 0 # Incremented whenever any library content changes.
+        self._vroom_scenes_by_id = {} # scene_id -> scene, the one canonical copy of every scene in any filter
+        self._vroom_stash_scenes = {} # scene_id -> scene as Stash last sent it, before unwritten edits
+        self._vroom_graph_version = None # stash_graph.version when stored scenes were last hydrated
+        self._vroom_scene_refs = {} # scene_id -> number of filters containing the scene
+        self._vroom_shortcuts = [] # [ (id, directions, description), ... ] shown in the legend banner
+        self._vroom_library_requested_at = None # time.monotonic() of the last library request
+        self._vroom_requested_scenes = collections.OrderedDict() # scene_id -> time.monotonic() of its last request, oldest first
 
-        # self._vroom_handlers = {}
-        # self._vroom_handlers['_cheats'] = {} # directions tuple -> list of handlers
+        self._vroom_scheduler = scheduler.RefreshScheduler(self._refresh_filter, interval=FILTER_REFRESH_INTERVAL, priority=self._get_filter_requested_at)
+        self._vroom_jobs = None # jobs.JobWatcher once Stash is initialized
+        self._vroom_media = media_cache.MediaCache(MEDIA_CACHE_DIR, MEDIA_CACHE_BYTES)
+        self._vroom_local_paths = None # file_server.PathMap when serving video files directly from disk
+        self._vroom_files = file_server.FilePool(LOCAL_FILE_POOL)
+        self._vroom_handlers = dispatch.HandlerPool(HANDLER_WORKERS, HANDLER_QUEUE)
+        self._vroom_query_slots = threading.BoundedSemaphore(FILTER_QUERY_WORKERS) # Shared by the page and chunk queries of every filter
+        self._vroom_writes = writes.WriteQueue(delay=WRITE_DELAY, journal_path=WRITE_JOURNAL, on_written=self._on_edits_written)
+        self._vroom_stash_url = None
+        self._vroom_snapshot_version = None # Library version of the last snapshot saved or loaded
+
+        self._vroom_metrics = metrics.Registry()
+        self._init_metrics()
+
+        self._vroom_memory = None # memory.MemoryProfiler when memory profiling is enabled
+        if MEMORY_PROFILE_FRAMES:
+            self._vroom_memory = memory.MemoryProfiler(MEMORY_PROFILE_FRAMES)
+            self._vroom_memory.start()
+
+        for event_name in LIBRARY_EVENTS:
+            getattr(self.saved_scene_filters.events, event_name).connect(self._on_library_changed)
+            getattr(self.saved_scene_filters.events, event_name).connect(functools.partial(self._count_mutation, 'filters', event_name))
 
         self._register_routes()
         log.info(f"Initialized VRoom app: {name}")
@@ -93,109 +278,490 @@ class HereSphere(Flask):
     def init_stash(self, stash_url, stash_headers=None, validate=True):
         # Initialize the Stash connection. This runs just before the Flask app runs.
         self.stash_client = stash.init(stash_url=stash_url, stash_headers=stash_headers, validate=validate)
-        self.load_saved_filters()
+        self._vroom_stash_url = stash_url
+        self._instrument_client(self.stash_client)
+        if self._load_snapshot():
+            # Serve the snapshot now, and bring it up to date in the background.
+            threading.Thread(target=self._revalidate, name='vroom-revalidate', daemon=True).start()
+        else:
+            self.load_saved_filters()
+            self._save_snapshot()
+        self._get_legend_png() # Render the banner before HereSphere asks for it.
+        self._vroom_scheduler.start()
+
+        self._vroom_jobs = jobs.JobWatcher(stash_url, headers=self.stash_client.headers,
+                                           on_finished=self._on_job_finished, on_connected=self._on_jobs_connected)
+        self._vroom_jobs.start()
+
+        self._vroom_writes.client = self.stash_client
+        self._vroom_writes.start()
+
+    def _init_metrics(self):
+        m = self._vroom_metrics
+        self._vroom_http_requests = m.counter('vroom_http_requests_total', 'HTTP requests by route and status', ['route', 'status'])
+        self._vroom_http_seconds = m.histogram('vroom_http_request_seconds', 'HTTP request latency by route', ['route'])
+        self._vroom_gql_requests = m.counter('vroom_graphql_requests_total', 'Stash GraphQL requests by operation and status', ['operation', 'status'])
+        self._vroom_gql_seconds = m.histogram('vroom_graphql_request_seconds', 'Stash GraphQL latency by operation', ['operation'])
+        self._vroom_gql_bytes = m.counter('vroom_graphql_response_bytes_total', 'Stash GraphQL response bytes by operation', ['operation'])
+        self._vroom_cache_requests = m.counter('vroom_cache_requests_total', 'Cache lookups by cache and result', ['cache', 'result'])
+        self._vroom_mutations = m.counter('vroom_list_mutations_total', 'Evented list changes by list and event', ['list', 'event'])
+        m.gauge('vroom_filter_scenes', 'Scenes in each saved filter', ['filter'], callback=self._get_filter_scene_counts)
+        m.gauge('vroom_filter_refresh_age_seconds', 'Seconds since each saved filter last refreshed', ['filter'], callback=self._get_filter_refresh_ages)
+
+    def _get_filter_scene_counts(self):
+        return [ ({'filter': K}, len(V)) for K, V in list(self._vroom_scenes_by_filter.items()) ]
+
+    def _get_filter_refresh_ages(self):
+        now = self._vroom_scheduler.clock()
+        result = []
+        for filter in list(self.saved_scene_filters):
+            status = self._vroom_scheduler.get_status(filter['name'])
+            if status and status['refreshed_at'] is not None:
+                result.append(({'filter': filter['name']}, now - status['refreshed_at']))
+        return result
+
+    def _count_mutation(self, list_name, event_name, *args):
+        self._vroom_mutations.inc(list=list_name, event=event_name)
+
+    def _count_cache(self, cache_name, hit):
+        self._vroom_cache_requests.inc(cache=cache_name, result='hit' if hit else 'miss')
+
+    def _instrument_client(self, client):
+        # Time every GraphQL request. The client is generated code, so wrap its execute() method.
+        if getattr(client, '_vroom_instrumented', False):
+            return
+        execute = client.execute
+
+        def timed_execute(*args, **kwargs):
+            operation = kwargs.get('operation_name') or 'unknown'
+            status = 'error'
+            started_at = time.perf_counter()
+            try:
+                response = execute(*args, **kwargs)
+                status = str(response.status_code)
+                size = response.extensions.get('streamed_bytes')
+                self._vroom_gql_bytes.inc(len(response.content) if size is None else size, operation=operation)
+                return response
+            finally:
+                self._vroom_gql_seconds.observe(time.perf_counter() - started_at, operation=operation)
+                self._vroom_gql_requests.inc(operation=operation, status=status)
+
+        client.execute = timed_execute
+        client._vroom_instrumented = True
+
+    def set_refresh_interval(self, filter_name, seconds):
+        """
+        Set how often a saved filter refreshes from Stash in the background.
+
+        :param filter_name: The full saved filter name, e.g. ``"VR | Favorites"``
+        :param seconds: Seconds between refreshes; ``None`` for the default ``FILTER_REFRESH_INTERVAL``, or ``0`` to never refresh
+        """
+        self._vroom_scheduler.set_interval(filter_name, seconds)
+
+    def update_scene(self, scene_id, **fields):
+        """
+        Change scene fields in Stash, e.g. ``rating100=80``.
+
+        The change shows in HereSphere at once. It is written to Stash a moment later,
+        together with any further changes to the same scene.
+
+        :param scene_id: The Stash scene ID
+        :param fields: ``SceneUpdateInput`` fields
+        """
+        self._vroom_writes.update(scene_id, **fields)
+        self._apply_scene_edits(scene_id)
+
+    def add_o(self, scene_id, times=1):
+        """
+        Add to the O-count of a scene in Stash, written a moment later like :meth:`update_scene`.
+
+        :param scene_id: The Stash scene ID
+        :param times: How many to add
+        """
+        self._vroom_writes.add_o(scene_id, times=times)
+        self._apply_scene_edits(scene_id)
+
+    def _apply_scene_edits(self, scene_id):
+        # Derive the edited scene from the one Stash sent, so no edit counts twice.
+        with self._vroom_lock:
+            scene = self._vroom_stash_scenes.get(str(scene_id))
+            if scene is not None:
+                self._vroom_scenes_by_id[scene['id']] = self._get_edited_scene(scene)
+                self._vroom_cache.get('scenes', {}).pop(scene['id'], None)
+
+    def _on_edits_written(self, batch):
+        # Stash has these edits now, so fold them into its scenes until the next refresh brings them.
+        with self._vroom_lock:
+            for scene_id, edits in batch.items():
+                scene = self._vroom_stash_scenes.get(scene_id)
+                if scene is not None:
+                    self._vroom_stash_scenes[scene_id] = self._get_edited_scene(scene, edits)
+        for scene_id in batch:
+            self._apply_scene_edits(scene_id)
+
+    def _get_edited_scene(self, scene, edits=None):
+        # The scene with its unwritten edits, so HereSphere sees them before Stash has them.
+        if edits is None:
+            edits = self._vroom_writes.get_pending(scene['id'])
+        if not edits:
+            return scene
+        scene = dict(scene)
+        for key, value in edits['fields'].items():
+            if not key.endswith(('_id', '_ids')): # Related objects only change on the next refresh.
+                scene[key] = value
+        if edits['o_times']:
+            scene['o_counter'] = (scene.get('o_counter') or 0) + len(edits['o_times'])
+        return scene
+
+    def set_local_paths(self, path_map: Optional[Dict[str, str]]):
+        """
+        Serve video files directly from local disk, instead of streaming them through Stash.
+
+        Use this when VRoom runs on the same machine as Stash, or has the same files mounted.
+        Scenes whose files are not found locally still stream through Stash.
+
+        :param path_map: Stash path prefix -> local path prefix, e.g. ``{'/data': '/mnt/nas'}``; or ``None`` to stream through Stash
+        """
+        with self._vroom_lock:
+            self._vroom_local_paths = file_server.PathMap(path_map) if path_map else None
+            self._vroom_cache.pop('scenes', None) # Stream URLs depend on this.
 
     def load_saved_filters(self):
         """
         Load scene filters from the Stash API and populate the scene_filters evented list.
+
+        Scenes for every filter are queried concurrently, with at most ``FILTER_QUERY_WORKERS``
+        requests to Stash at once across all filters and their pages. Results are applied in
+        filter order as they arrive.
+        Known filters which Stash renamed, redefined or deleted are replaced or removed.
         """
         log.debug("Load saved filters from Stash API")
+        self._refresh_graph(max_age=None)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=FILTER_QUERY_WORKERS, thread_name_prefix='vroom-filter') as pool:
+            modes = ['SCENES', 'IMAGES']
+            replies = pool.map(lambda mode: util.to_dict(self.stash_client.saved_filters(mode=mode)), modes)
+            all_filters = []
+            for res in replies:
+                all_filters += res['findSavedFilters']
 
-        res = self.stash_client.saved_filters(mode='SCENES')
-        res = res.model_dump()
-        scene_filters = res['findSavedFilters']
-
-        res = self.stash_client.saved_filters(mode='IMAGES')
-        res = res.model_dump()
-        image_filters = res['findSavedFilters']
-
-        # Add any saved filters having the proper ("AA" or "VR") prefix to the scene_filters list, ensuring to maintain ascending order of filters by int() of its ['id'] field.
-        for filter in (scene_filters + image_filters):
-            # filter['mode'] # 'SCENES' or 'IMAGES'
-            filter_name = filter['name']
-            match = re.search(r'^(AA|VR|HS|XP)\s*\|\s*(.+)$', filter_name)
-            if not match:
-                log.debug(f'Skip {filter["mode"]} filter with inactive name: {filter_name!r}')
-                continue
-
-            filter_id = int(filter['id'])
-            filter_key = filter['mode'][0].lower() + f':' + str(filter_id)
-            log.debug(f'Filter {filter_name!r}: {filter_id!r} with key {filter_key!r}')
-
-            # Now walk the existing filters in order until this ID is lesser than it (insert before) or the list exhausts (append to end).
-            filter_i = None
-            for i, existing_filter in enumerate(self.saved_scene_filters):
-                existing_filter_id = int(existing_filter['id'])
-                if filter_id == existing_filter_id:
-                    log.debug(f'Skip existing filter: {filter_id} ({filter_name!r})')
-                    break
-
-                if filter_id > existing_filter_id:
-                    # log.debug(f'Filter {filter_id} too large to insert at index {i} ({existing_filter_id})')
+            # Known filters which Stash changed or deleted, e.g. since a snapshot, are dropped and added again as new.
+            by_id = { int(X['id']): X for X in all_filters }
+            for filter in list(self.saved_scene_filters):
+                if by_id.get(int(filter['id'])) != filter:
+                    self._remove_saved_filter(filter)
+
+            # Add any saved filters having the proper ("AA" or "VR") prefix to the scene_filters list, ensuring to maintain ascending order of filters by int() of its ['id'] field.
+            new_filters = []
+            for filter in all_filters:
+                if self._add_saved_filter(filter):
+                    new_filters.append(filter)
+
+            # Fetch concurrently, but apply in a deterministic order.
+            futures = [ pool.submit(self._fetch_scenes_by_filter, X) for X in new_filters ]
+            for filter, future in zip(new_filters, futures):
+                try:
+                    scenes = future.result()
+                except Exception as e:
+                    log.error(f'Failed to query scenes for filter {filter["name"]!r}: {e}')
                     continue
+                self._apply_scenes_by_filter(filter, scenes)
+
+    def _add_saved_filter(self, filter: dict) -> bool:
+        """
+        Add a saved filter in ascending order of ID, with an empty scene list.
+
+        :param filter: The saved filter object
+        :return: ``True`` if the filter was added, ``False`` if it is inactive or already known
+        """
+        # filter['mode'] # 'SCENES' or 'IMAGES'
+        filter_name = filter['name']
+        match = re.search(FILTER_NAME_RE, filter_name)
+        if not match:
+            log.debug(f'Skip {filter["mode"]} filter with inactive name: {filter_name!r}')
+            return False
+
+        filter_id = int(filter['id'])
+        filter_key = filter['mode'][0].lower() + f':' + str(filter_id)
+        log.debug(f'Filter {filter_name!r}: {filter_id!r} with key {filter_key!r}')
+
+        filter_i = bisect.bisect_left(self._vroom_filter_ids, filter_id)
+        if filter_i < len(self._vroom_filter_ids) and self._vroom_filter_ids[filter_i] == filter_id:
+            log.debug(f'Skip existing filter: {filter_id} ({filter_name!r})')
+            return False
+
+        log.debug(f'Insert filter {filter_id} ({filter_name!r}) at {filter_i}')
+        self._vroom_filter_ids.insert(filter_i, filter_id)
+        self.saved_scene_filters.insert(filter_i, filter)
+
+        # Prepare to populate the cache for this filter.
+        scene_ids = self._new_scenes_list()
+        self._vroom_scenes_by_filter[filter_name] = scene_ids
+
+        # Also emit the more convenient search objects.
+        find_filter = util.saved_filter_to_find_filter(filter)
+        scene_filter = util.saved_filter_to_scene_filter(filter)
+        self.saved_filter.emit(filter_name, find_filter, scene_filter, scene_ids, filter['id'])
+
+        self._vroom_scheduler.add(filter_name)
+        return True
+
+    def _remove_saved_filter(self, filter: dict):
+        """
+        Remove a saved filter and its scene list. Scenes no other filter contains leave the scene store.
+
+        :param filter: The saved filter object
+        """
+        filter_id = int(filter['id'])
+        filter_i = bisect.bisect_left(self._vroom_filter_ids, filter_id)
+        if filter_i == len(self._vroom_filter_ids) or self._vroom_filter_ids[filter_i] != filter_id:
+            return
+
+        log.debug(f'Remove filter {filter_id} ({filter["name"]!r}) at {filter_i}')
+        del self._vroom_filter_ids[filter_i]
+        del self.saved_scene_filters[filter_i]
+        self._vroom_scheduler.remove(filter['name'])
+        scene_ids = self._vroom_scenes_by_filter.pop(filter['name'], None)
+        if scene_ids is not None:
+            scene_ids.clear()
+
+    def _get_saved_filter(self, filter_name) -> Optional[dict]:
+        for filter in list(self.saved_scene_filters):
+            if filter['name'] == filter_name:
+                return filter
+        return None
+
+    def _refresh_filter(self, filter_name):
+        # Called by the refresh scheduler in its background thread.
+        filter = self._get_saved_filter(filter_name)
+        if filter is None:
+            log.debug(f'Skip refresh of unknown filter: {filter_name!r}')
+            self._vroom_scheduler.remove(filter_name)
+            return
+        self.query_scenes_by_filter(filter)
+        self._save_snapshot()
+
+    def _revalidate(self):
+        # After loading a snapshot: bring the filters in line with Stash, and refresh the others soon.
+        try:
+            self.load_saved_filters()
+        except Exception as e:
+            log.error(f'Cannot load saved filters from Stash: {e}')
+        for filter in list(self.saved_scene_filters):
+            self._vroom_scheduler.trigger(filter['name'])
+
+    def _save_snapshot(self):
+        """
+        Save the saved filters and scene store to ``SNAPSHOT_PATH``, unless nothing changed since the last save.
+        """
+        with self._vroom_lock:
+            version = self._vroom_library_version
+            if version == self._vroom_snapshot_version:
+                return
+            data = {
+                'stash_url': self._vroom_stash_url,
+                'filters': list(self.saved_scene_filters),
+                'scene_ids': { K: list(V) for K, V in self._vroom_scenes_by_filter.items() },
+                'scenes': list(self._vroom_stash_scenes.values()), # Unwritten edits are in the write journal.
+                'graph': self.stash_graph.to_dict(),
+            }
+            library = self._vroom_cache.get('library')
+            if library and library['version'] == version:
+                data['library'] = { K: V.decode('utf-8') for K, V in library['by_url_root'].items() }
+
+        try:
+            snapshot.save_snapshot(SNAPSHOT_PATH, data)
+        except (OSError, TypeError) as e:
+            log.error(f'Cannot save snapshot {SNAPSHOT_PATH}: {e}')
+            return
+        with self._vroom_lock:
+            self._vroom_snapshot_version = version
+
+    def _load_snapshot(self) -> bool:
+        """
+        Load the saved filters and scene store from ``SNAPSHOT_PATH``.
+
+        :return: ``True`` if a snapshot for this Stash was loaded
+        """
+        data = snapshot.load_snapshot(SNAPSHOT_PATH)
+        if not data or data.get('stash_url') != self._vroom_stash_url:
+            return False
+
+        if data.get('graph'):
+            self.stash_graph.load_dict(data['graph']) # So loaded scenes share its tag and studio dicts again.
+
+        scenes_by_id = { X['id']: X for X in data['scenes'] }
+        for filter in data['filters']:
+            if self._add_saved_filter(filter):
+                scene_ids = data['scene_ids'].get(filter['name'], [])
+                self._apply_scenes_by_filter(filter, [ scenes_by_id[X] for X in scene_ids if X in scenes_by_id ])
+
+        with self._vroom_lock:
+            version = self._vroom_library_version
+            self._vroom_snapshot_version = version
+            if data.get('library'):
+                by_url_root = { K: V.encode('utf-8') for K, V in data['library'].items() }
+                self._vroom_cache['library'] = {'version': version, 'by_url_root': by_url_root}
+        log.info(f'Loaded snapshot {SNAPSHOT_PATH}: {len(data["filters"])} filters, {len(scenes_by_id)} scenes')
+        return True
+
+    def _on_job_finished(self, job):
+        # A scan or similar finished in Stash, so any filter may have new scenes.
+        for filter in list(self.saved_scene_filters):
+            self._vroom_scheduler.trigger(filter['name'], delay=JOB_REFRESH_DELAY)
+
+    def _on_jobs_connected(self, connected):
+        # Job updates make frequent polling unnecessary, but keep polling if they stop.
+        self._vroom_scheduler.interval = FILTER_REFRESH_INTERVAL_LIVE if connected else FILTER_REFRESH_INTERVAL
+        if not connected:
+            for filter in list(self.saved_scene_filters):
+                self._vroom_scheduler.trigger(filter['name'], delay=FILTER_REFRESH_INTERVAL)
+
+    def _get_filter_requested_at(self, filter_name):
+        # The last time HereSphere requested the library or any of this filter's scenes. Not for the request path.
+        with self._vroom_lock:
+            requested_at = self._vroom_library_requested_at or 0
+            recent_scenes = list(self._vroom_requested_scenes.items())
+
+        scene_ids = set(self._vroom_scenes_by_filter.get(filter_name, []))
+        for scene_id, scene_requested_at in recent_scenes:
+            if scene_id in scene_ids:
+                requested_at = max(requested_at, scene_requested_at)
+        return requested_at
+
+    def _note_scene_requested(self, scene_id):
+        with self._vroom_lock:
+            self._vroom_requested_scenes[scene_id] = time.monotonic()
+            self._vroom_requested_scenes.move_to_end(scene_id)
+            if len(self._vroom_requested_scenes) > RECENT_SCENES:
+                self._vroom_requested_scenes.popitem(last=False)
 
-                log.debug(f'Insert filter {filter_id} at {i} before {existing_filter_id}')
-                filter_i = i
-                self.saved_scene_filters.insert(i, filter)
-                break
-        
-            if filter_i is None:
-                # If we did not find a place to insert, append to the end.
-                log.debug(f'Append filter {filter_id} ({filter_name!r}) to end of list')
-                self.saved_scene_filters.append(filter)
-                filter_i = len(self.saved_scene_filters) - 1
-
-            # Prepare to populate the cache for this filter.
-            scenes_list = psygnal.containers.EventedList([])
-            self._vroom_scenes_by_filter[filter_name] = scenes_list
-
-            # Also emit the more convenient search objects.
-            find_filter = util.saved_filter_to_find_filter(filter)
-            scene_filter = util.saved_filter_to_scene_filter(filter)
-            self.saved_filter.emit(filter_name, find_filter, scene_filter, scenes_list, filter['id'])
-
-            self.query_scenes_by_filter(filter)
-    
     def query_scenes_by_filter(self, filter: dict):
         """
         Query scenes from the Stash API based on a saved filter.
 
         :param filter: The saved filter object to query scenes
         """
+        scenes = self._fetch_scenes_by_filter(filter)
+        self._apply_scenes_by_filter(filter, scenes)
+
+    def _fetch_scenes_by_filter(self, filter: dict) -> List[Dict[str, Any]]:
+        """
+        Return the current scenes of a saved filter, in order.
+
+        This first queries only scene IDs and ``updated_at``, in pages of ``SCENE_ID_PAGE``. Full scene data
+        is queried only for scenes which are new or changed, in chunks of at most ``SCENE_FETCH_CHUNK``, and
+        each chunk goes into the scene store as it arrives. Other scenes come from the scene store.
+
+        :param filter: The saved filter object
+        :return: A list of scenes
+        """
         filter_name = filter['name']
-        filter_name = re.sub(r'^(AA|VR|XP)\s*\|\s*', '', filter_name).strip()
         log.debug(f"Query scenes by filter: {filter_name}")
+        self._refresh_graph()
 
         find_filter = util.saved_filter_to_find_filter(filter)
         scene_filter = util.saved_filter_to_scene_filter(filter)
         
         # Query the Stash API for scenes matching the filter.
-        res = self.stash_client.scenes(find_filter=find_filter, scene_filter=scene_filter)
-        res = res.model_dump()
-        log.debug(f'Saved filter {filter_name!r}: {res["findScenes"]["count"]} scenes found')
-        
-        ok_scenes = self._vroom_scenes_by_filter[filter_name]
-
-        for reply_i, scene in enumerate(res['findScenes']['scenes']):
-            known_i = None
-            for j, existing_scene in enumerate(ok_scenes):
-                if existing_scene['id'] == scene['id']:
-                    known_i = j
-                    break
-            
-            if known_i is None:
-                log.debug(f"New scene {scene['id']} in filter '{filter_name}' at index {reply_i}")
-                ok_scenes.insert(reply_i, scene)
-            else:
-                if known_i != reply_i:
-                    log.debug(f"Move known scene {scene['id']} in filter '{filter_name}' from index {known_i} to {reply_i}")
-                    ok_scenes.move(known_i, reply_i)
-                else:
-                    log.debug(f"Known scene {scene['id']} in filter '{filter_name}' already at index {reply_i}")
-                    pass
-                # Also refresh the data just in case there is something new (TODO This should be an event)
-                ok_scenes[reply_i] = scene
-            
+        count, reply = paging.fetch_scene_ids(self.stash_client, find_filter, scene_filter,
+                                              page_size=SCENE_ID_PAGE, workers=SCENE_FETCH_WORKERS, slots=self._vroom_query_slots)
+        log.debug(f'Saved filter {filter_name!r}: {count} scenes found')
+
+        scenes_by_id = {}
+        with self._vroom_lock:
+            for item in reply:
+                known = self._vroom_stash_scenes.get(item['id'])
+                if known is not None and not diff.is_scene_changed(known, item):
+                    scenes_by_id[item['id']] = self._vroom_scenes_by_id[item['id']]
+
+        def on_chunk(scenes):
+            # Scenes refer to tags and studios by ID only, so learn any new ones before they are stored.
+            tag_ids, studio_ids = self.stash_graph.get_missing(scenes)
+            if tag_ids or studio_ids:
+                log.debug(f'Saved filter {filter_name!r}: {len(tag_ids)} new tags, {len(studio_ids)} new studios')
+                self._refresh_graph(max_age=None)
+            self._update_scenes(scenes)
+            with self._vroom_lock:
+                for scene in scenes:
+                    scenes_by_id[scene['id']] = self._vroom_scenes_by_id.get(scene['id'], scene)
+
+        needed_ids = [ X['id'] for X in reply if X['id'] not in scenes_by_id ]
+        log.debug(f'Saved filter {filter_name!r}: query {len(needed_ids)} new or changed scenes')
+        if needed_ids:
+            sizer = paging.ChunkSizer(max_size=SCENE_FETCH_CHUNK, target_seconds=SCENE_FETCH_SECONDS)
+            paging.fetch_scenes_by_ids(self.stash_client, needed_ids, on_chunk, sizer=sizer, workers=SCENE_FETCH_WORKERS,
+                                       stream=SCENE_FETCH_STREAM, slots=self._vroom_query_slots)
+
+        # A scene deleted between the two queries is simply left out.
+        return [ scenes_by_id[X['id']] for X in reply if X['id'] in scenes_by_id ]
+
+    def _apply_scenes_by_filter(self, filter: dict, scenes: List[Dict[str, Any]]):
+        filter_name = filter['name']
+
+        # Refresh the scene store first, so every scene ID in a filter list is always known.
+        self._update_scenes(scenes)
+
+        ok_scene_ids = self._vroom_scenes_by_filter[filter_name]
+        edits = diff.get_list_diff(list(ok_scene_ids), [ X['id'] for X in scenes ], key=None)
+        counts = collections.Counter(X[0] for X in edits)
+        log.debug(f'Saved filter {filter_name!r}: {len(edits)} changes {dict(counts)!r}')
+        diff.apply_list_diff(ok_scene_ids, edits)
+
+    def _update_scenes(self, scenes: List[Dict[str, Any]]):
+        """
+        Add or refresh scenes in the scene store.
+
+        A scene is replaced only if it changed, so filters sharing a scene also share one copy of it.
+
+        :param scenes: Scenes from the Stash API
+        """
+        updated = 0
+        with self._vroom_lock:
+            scene_cache = self._vroom_cache.setdefault('scenes', {})
+            for scene in scenes:
+                if scene is self._vroom_scenes_by_id.get(scene['id']):
+                    continue # Already stored, e.g. from the scene store itself.
+                known = self._vroom_stash_scenes.get(scene['id'])
+                if known is not None and not diff.is_scene_changed(known, scene):
+                    continue
+                scene = self.stash_graph.hydrate_scene(scene)
+                self._vroom_stash_scenes[scene['id']] = scene
+                self._vroom_scenes_by_id[scene['id']] = self._get_edited_scene(scene)
+                scene_cache.pop(scene['id'], None)
+                self._vroom_cache.get('tags', {}).pop(scene['id'], None)
+                updated += 1
+        log.debug(f'Scene store: {updated} of {len(scenes)} scenes new or changed')
+
+    def _refresh_graph(self, max_age=GRAPH_REFRESH_INTERVAL):
+        """
+        Refresh the tag and studio graph from Stash, and drop responses rendered with old names.
+
+        :param max_age: Skip the refresh if the last one is younger than this many seconds; ``None`` to always refresh
+        """
+        try:
+            self.stash_graph.refresh(self.stash_client, max_age=max_age)
+        except Exception as e:
+            log.warning(f'Cannot refresh tags and studios from Stash: {e}')
+            return
+        with self._vroom_lock:
+            if self.stash_graph.version == self._vroom_graph_version:
+                return
+            self._vroom_graph_version = self.stash_graph.version
+            self._vroom_cache.pop('scenes', None)
+            self._vroom_cache.pop('tags', None)
+
+            # Scenes stored while the graph lacked their tags or studios, e.g. after a failed refresh.
+            rehydrated = 0
+            for scene_id, scene in list(self._vroom_stash_scenes.items()):
+                if not self.stash_graph.is_hydrated(scene):
+                    scene = self.stash_graph.hydrate_scene(scene)
+                    self._vroom_stash_scenes[scene_id] = scene
+                    self._vroom_scenes_by_id[scene_id] = self._get_edited_scene(scene)
+                    rehydrated += 1
+        if rehydrated:
+            log.debug(f'Scene store: {rehydrated} scenes resolved with the new tags and studios')
+
     def _cache_set(self, key: str, value: Any):
         with self._vroom_lock:
             self._vroom_cache[key] = value
@@ -208,6 +774,382 @@ class HereSphere(Flask):
             val = Copy.deepcopy(val)
         return val
     
+    def _new_scenes_list(self):
+        # Any change to the scene IDs in a filter invalidates the rendered library.
+        scene_ids = psygnal.containers.EventedList([])
+        for event_name in LIBRARY_EVENTS:
+            getattr(scene_ids.events, event_name).connect(self._on_library_changed)
+            getattr(scene_ids.events, event_name).connect(functools.partial(self._count_mutation, 'scenes', event_name))
+
+        # Also count the filters holding each scene, to drop it from the store when none do.
+        scene_ids.events.inserted.connect(self._on_scene_inserted)
+        scene_ids.events.removed.connect(self._on_scene_removed)
+        scene_ids.events.changed.connect(self._on_scene_changed)
+        return scene_ids
+
+    def _on_scene_inserted(self, i, scene_id):
+        with self._vroom_lock:
+            self._vroom_scene_refs[scene_id] = self._vroom_scene_refs.get(scene_id, 0) + 1
+
+    def _on_scene_removed(self, i, scene_id):
+        with self._vroom_lock:
+            refs = self._vroom_scene_refs.get(scene_id, 0) - 1
+            if refs > 0:
+                self._vroom_scene_refs[scene_id] = refs
+                return
+            self._vroom_scene_refs.pop(scene_id, None)
+            self._vroom_scenes_by_id.pop(scene_id, None)
+            self._vroom_stash_scenes.pop(scene_id, None)
+            self._vroom_cache.get('scenes', {}).pop(scene_id, None)
+            self._vroom_cache.get('tags', {}).pop(scene_id, None)
+
+    def _on_scene_changed(self, i, old_scene_id, new_scene_id):
+        if isinstance(i, slice):
+            # Slice assignment: treat it as a removal and an insertion of every item.
+            for scene_id in new_scene_id:
+                self._on_scene_inserted(None, scene_id)
+            for scene_id in old_scene_id:
+                self._on_scene_removed(None, scene_id)
+            return
+
+        self._on_scene_inserted(i, new_scene_id)
+        self._on_scene_removed(i, old_scene_id)
+
+    def _on_library_changed(self, *args):
+        with self._vroom_lock:
+            self._vroom_library_version += 1
+
+    def _get_library_name(self, filter_name):
+        match = re.search(FILTER_NAME_RE, filter_name)
+        return match[2].strip() if match else filter_name
+
+    def _get_library_json(self, url_root) -> bytes:
+        """
+        Return the serialized HereSphere library response for a given URL root.
+
+        The response is built once per library version and URL root, then served
+        as immutable bytes until any saved filter or scene list changes.
+
+        :param url_root: The root URL of the request, e.g. ``http://192.168.0.5:5000/``
+        :return: The JSON response body
+        """
+        with self._vroom_lock:
+            version = self._vroom_library_version
+            cached = self._vroom_cache.get('library')
+            hit = cached and cached['version'] == version and url_root in cached['by_url_root']
+        self._count_cache('library', hit)
+        if hit:
+            return cached['by_url_root'][url_root]
+
+        body = {'access': 1}
+
+        body['banner'] = {}
+        body['banner']['image'] = self._get_hs_url('/legend')
+        #body['banner']['link'] = 'http://www.example.com'
+
+        body['library'] = []
+        for filter in list(self.saved_scene_filters):
+            scene_ids = self._vroom_scenes_by_filter.get(filter['name'], [])
+            urls = [ f'{url_root}heresphere/{scene_id}' for scene_id in list(scene_ids) ]
+            body['library'].append({'name': self._get_library_name(filter['name']), 'list': urls})
+
+        result = jsoncodec.dumps(body)
+        log.debug(f'Library version {version} for {url_root}: {len(body["library"])} libraries, {len(result)} bytes')
+
+        with self._vroom_lock:
+            cached = self._vroom_cache.get('library')
+            if not cached or cached['version'] != version:
+                # Any older version is stale for every URL root, so drop it all.
+                cached = {'version': version, 'by_url_root': {}}
+                self._vroom_cache['library'] = cached
+            cached['by_url_root'][url_root] = result
+        return result
+
+    def _get_scene_json(self, scene_id) -> Optional[bytes]:
+        """
+        Return the serialized HereSphere video detail response for a scene.
+
+        The response is rendered once per scene ID and ``updated_at`` from the in-memory
+        scene index, so this never makes a Stash request.
+
+        :param scene_id: The Stash scene ID
+        :return: The JSON response body, or ``None`` for a scene in no library
+        """
+        with self._vroom_lock:
+            scene = self._vroom_scenes_by_id.get(scene_id)
+            if scene is None:
+                return None
+            cached = self._vroom_cache.setdefault('scenes', {}).get(scene_id)
+            hit = cached and cached[0] == scene.get('updated_at')
+        self._count_cache('scene', hit)
+        if hit:
+            return cached[1]
+
+        body = self._render_hs_scene(scene)
+        result = jsoncodec.dumps(body)
+
+        with self._vroom_lock:
+            if self._vroom_scenes_by_id.get(scene_id) is scene:
+                self._vroom_cache['scenes'][scene_id] = (scene.get('updated_at'), result)
+        return result
+
+    def _iter_scan_json(self, url_root):
+        """
+        Generate the HereSphere scan response for every scene in any library, in chunks.
+
+        Scenes are rendered one at a time from the scene store as the response is sent,
+        so memory stays flat however large the libraries are.
+
+        :param url_root: The root URL of the request, e.g. ``http://192.168.0.5:5000/``
+        :return: An iterator of JSON bytes
+        """
+        with self._vroom_lock:
+            scene_ids = list(self._vroom_scenes_by_id) # Only references to the existing ID strings.
+
+        chunk = [b'{"scanData":[']
+        size = 0
+        count = 0
+        for scene_id in scene_ids:
+            with self._vroom_lock:
+                scene = self._vroom_scenes_by_id.get(scene_id)
+            if scene is None:
+                continue # Removed since the response started.
+
+            item = jsoncodec.dumps(self._render_hs_scan(scene, url_root))
+            chunk.append(b',' + item if count else item)
+            size += len(item)
+            count += 1
+            if size >= SCAN_CHUNK_BYTES:
+                yield b''.join(chunk)
+                chunk, size = [], 0
+
+        chunk.append(b']}')
+        yield b''.join(chunk)
+        log.debug(f'Scan data sent for {count} scenes')
+
+    def _render_hs_scan(self, scene, url_root) -> dict:
+        # The compact per-scene metadata of the HereSphere scan response.
+        files = scene.get('files') or []
+        primary = files[0] if files else {}
+        return {
+            'link': f'{url_root}heresphere/{scene["id"]}',
+            'title': scene.get('title') or primary.get('basename') or f'Scene {scene["id"]}',
+            'dateReleased': scene.get('date') or '',
+            'dateAdded': str(scene.get('created_at') or '')[:10],
+            'duration': (primary.get('duration') or 0) * 1000,
+            'rating': (scene.get('rating100') or 0) / 20,
+            'isFavorite': False,
+            'tags': self._get_hs_tags(scene),
+        }
+
+    def _render_hs_scene(self, scene) -> dict:
+        """
+        Convert a Stash scene to the HereSphere video detail format.
+
+        :param scene: A scene from the Stash API
+        :return: A HereSphere video data object
+        """
+        files = scene.get('files') or []
+        primary = files[0] if files else {}
+        paths = scene.get('paths') or {}
+
+        body = {'access': 1}
+        body['title'] = scene.get('title') or primary.get('basename') or f'Scene {scene["id"]}'
+        body['description'] = scene.get('details') or ''
+        body['thumbnailImage'] = self._get_media_url(scene, 'screenshot')
+        body['thumbnailVideo'] = self._get_media_url(scene, 'preview')
+        body['dateReleased'] = scene.get('date') or ''
+        body['dateAdded'] = str(scene.get('created_at') or '')[:10]
+        body['duration'] = (primary.get('duration') or 0) * 1000
+        body['rating'] = (scene.get('rating100') or 0) / 20
+        body['isFavorite'] = False
+        body['isEyeSwapped'] = False
+        body.update(get_projection(primary.get('basename')))
+
+        body['tags'] = self._get_hs_tags(scene)
+        body['performers'] = [ {'name': X['name'], 'image': self._get_media_url(scene, f'performer-{X["id"]}')}
+                               for X in scene.get('performers') or [] ]
+
+        body['media'] = []
+        if paths.get('stream'):
+            source = {
+                'resolution': primary.get('height') or 0,
+                'height': primary.get('height') or 0,
+                'width': primary.get('width') or 0,
+                'size': primary.get('size') or 0,
+                'url': self._get_normal_url(paths['stream']),
+            }
+            if self._get_local_path(scene):
+                source['url'] = self._get_hs_url(f'/file/{scene["id"]}')
+            body['media'].append({'name': 'Original', 'sources': [source]})
+
+        body['eventServer'] = self._get_hs_url('/event')
+        body['writeFavorite'] = False
+        body['writeRating'] = True
+        body['writeTags'] = False
+        body['writeHSP'] = False
+        return body
+
+    def _get_local_path(self, scene) -> Optional[str]:
+        # The primary video file on local disk, when serving local files and it exists.
+        path_map = self._vroom_local_paths
+        files = scene.get('files') or []
+        if not path_map or not files or not files[0].get('path'):
+            return None
+        local_path = path_map.get_local_path(files[0]['path'])
+        return local_path if local_path and os.path.isfile(local_path) else None
+
+    def _get_file_response(self, scene_id) -> Response:
+        with self._vroom_lock:
+            scene = self._vroom_scenes_by_id.get(scene_id)
+        local_path = self._get_local_path(scene) if scene else None
+        if not local_path:
+            return Response(f'Unknown local file for scene: {scene_id}', status=404, mimetype='text/plain')
+        try:
+            return file_server.serve_file(request, local_path, self._vroom_files)
+        except OSError as e:
+            log.warning(f'Cannot serve file for scene {scene_id}: {e}')
+            return Response(f'Cannot read file for scene: {scene_id}', status=404, mimetype='text/plain')
+
+    def _get_media_source(self, scene, kind) -> Tuple[Optional[str], Any]:
+        # The Stash URL of a scene's media, and the updated_at of whatever it shows.
+        if kind in MEDIA_KINDS:
+            return (scene.get('paths') or {}).get(kind), scene.get('updated_at')
+        if kind.startswith('performer-'):
+            performer_id = kind[len('performer-'):]
+            for performer in scene.get('performers') or []:
+                if performer.get('id') == performer_id:
+                    return performer.get('image_path'), performer.get('updated_at')
+        return None, None
+
+    def _get_media_tag(self, scene, kind) -> Optional[str]:
+        # Changes whenever the media may change, so URLs containing it are immutable.
+        url, updated_at = self._get_media_source(scene, kind)
+        if not url:
+            return None
+        return hashlib.sha1(f'{url}|{updated_at}'.encode('utf-8')).hexdigest()[:16]
+
+    def _get_media_url(self, scene, kind) -> str:
+        tag = self._get_media_tag(scene, kind)
+        return self._get_hs_url(f'/media/{scene["id"]}/{kind}/{tag}') if tag else ''
+
+    def _fetch_media(self, url):
+        # Stream a file from Stash, for the media cache.
+        client = self.stash_client.http_client
+        response = client.send(client.build_request('GET', url), stream=True)
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError:
+            response.close()
+            raise
+
+        def chunks():
+            try:
+                yield from response.iter_bytes()
+            finally:
+                response.close()
+        return response.headers.get('content-type'), chunks()
+
+    def _get_media_response(self, scene_id, kind, tag) -> Response:
+        """
+        Serve a scene screenshot or preview, or the image of one of its performers, from the
+        media cache, fetching it from Stash once.
+
+        :param scene_id: The Stash scene ID
+        :param kind: One of ``MEDIA_KINDS``, or ``performer-<id>``
+        :param tag: The tag from the media URL; a current tag makes the response immutable
+        """
+        with self._vroom_lock:
+            scene = self._vroom_scenes_by_id.get(scene_id)
+        url, updated_at = self._get_media_source(scene, kind) if scene else (None, None)
+        if not url:
+            return Response(f'Unknown media: {scene_id}/{kind}', status=404, mimetype='text/plain')
+
+        # A performer image is the same in every scene, so it is cached once.
+        key = f'{url}|{updated_at}'
+        fetched = []
+        def fetch():
+            fetched.append(url)
+            return self._fetch_media(url)
+        for attempt in range(MEDIA_ATTEMPTS):
+            try:
+                path, content_type, digest = self._vroom_media.get_or_fetch(key, fetch)
+                response = send_file(path, mimetype=content_type, etag=digest, conditional=True, max_age=None)
+                break
+            except httpx.HTTPStatusError as e:
+                log.warning(f'Cannot fetch {kind} for scene {scene_id}: {e}')
+                status = 404 if e.response.status_code == 404 else 502
+                return Response(f'Stash error: {e.response.status_code}', status=status, mimetype='text/plain')
+            except httpx.HTTPError as e:
+                log.warning(f'Cannot fetch {kind} for scene {scene_id}: {e}')
+                return Response(f'Stash error: {e}', status=502, mimetype='text/plain')
+            except FileNotFoundError:
+                # Evicted by another request before it was opened, so fetch it again.
+                log.debug(f'Media file gone before serving {kind} for scene {scene_id}, attempt {attempt + 1}')
+                self._vroom_media.discard_missing(key)
+        else:
+            return Response(f'Media cache busy: {scene_id}/{kind}', status=503, mimetype='text/plain')
+        self._count_cache('media', not fetched)
+
+        if tag == self._get_media_tag(scene, kind):
+            response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def _get_hs_tags(self, scene) -> List[Dict[str, Any]]:
+        """
+        Return the HereSphere tags of a scene: its tags, performers, studio, and timed markers.
+
+        The tags are translated once per scene ID and ``updated_at``, and shared by the scene
+        and scan responses, so callers must not modify them. Edits from HereSphere never change
+        these fields, and a scene replaced in the store drops its entry.
+
+        :param scene: A scene from the scene store
+        :return: A list of HereSphere tag objects
+        """
+        scene_id = scene['id']
+        with self._vroom_lock:
+            cached = self._vroom_cache.setdefault('tags', {}).get(scene_id)
+            hit = cached and cached[0] == scene.get('updated_at')
+        self._count_cache('tags', hit)
+        if hit:
+            return cached[1]
+
+        tags = self._render_hs_tags(scene)
+        with self._vroom_lock:
+            if self._vroom_scenes_by_id.get(scene_id) is scene:
+                self._vroom_cache['tags'][scene_id] = (scene.get('updated_at'), tags)
+        return tags
+
+    def _render_hs_tags(self, scene) -> List[Dict[str, Any]]:
+        # HereSphere groups tags by the "Category:" prefix of their names.
+        get_tag_name = functools.partial(self._get_graph_name, self.stash_graph.get_tag)
+        tags = []
+        for tag in scene.get('tags') or []:
+            tags.append({'name': f'Tag:{get_tag_name(tag)}'})
+        for performer in scene.get('performers') or []:
+            tags.append({'name': f'Performer:{performer["name"]}'})
+        if scene.get('studio'):
+            tags.append({'name': f'Studio:{self._get_graph_name(self.stash_graph.get_studio, scene["studio"])}'})
+
+        # Each marker lasts until the next one, or the end of the video.
+        files = scene.get('files') or []
+        duration_ms = (files[0].get('duration') or 0) * 1000 if files else 0
+        markers = sorted(scene.get('scene_markers') or [], key=lambda X: X['seconds'])
+        for i, marker in enumerate(markers):
+            start = marker['seconds'] * 1000
+            end = markers[i+1]['seconds'] * 1000 if i + 1 < len(markers) else duration_ms
+            tags.append({'name': f'Marker:{get_tag_name(marker["primary_tag"])}', 'start': start, 'end': max(start, end), 'track': 0})
+        return tags
+
+    def _get_graph_name(self, get_node, node) -> str:
+        # A tag or studio not yet hydrated, e.g. because the graph could not be refreshed, has only its ID.
+        if 'name' in node:
+            return node['name']
+        known = get_node(node.get('id'))
+        return known['name'] if known else str(node.get('id'))
+
     def _insert_view(self, view_name, scene_ids):
         log.debug(f"Insert view: {view_name}")
         log.debug(f'- Scene IDs: {len(scene_ids)}')
@@ -224,6 +1166,38 @@ class HereSphere(Flask):
     def _register_routes(self):
         """Register Flask routes to handle various events."""
         
+        @self.before_request
+        def start_timer():
+            g.vroom_started_at = time.perf_counter()
+
+        @self.after_request
+        def count_request(response):
+            started_at = g.get('vroom_started_at')
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            if started_at is not None:
+                self._vroom_http_seconds.observe(time.perf_counter() - started_at, route=route)
+            self._vroom_http_requests.inc(route=route, status=response.status_code)
+            return response
+
+        @self.route('/metrics', methods=['GET'])
+        def vroom_metrics():
+            return Response(self._vroom_metrics.render(), headers={'Content-Type': metrics.CONTENT_TYPE})
+
+        @self.route('/admin/memory', methods=['GET'])
+        def admin_memory():
+            return self._get_memory_response(lambda: self.get_memory_report(limit=request.args.get('limit', 20, type=int),
+                                                                            group_by=request.args.get('group', 'lineno')))
+
+        @self.route('/admin/memory/snapshots/<name>', methods=['POST'])
+        def admin_memory_snapshot(name):
+            return self._get_memory_response(lambda: self._vroom_memory.take_snapshot(name))
+
+        @self.route('/admin/memory/diff', methods=['GET'])
+        def admin_memory_diff():
+            return self._get_memory_response(lambda: {'diff': self._vroom_memory.compare(
+                request.args['from'], request.args.get('to'),
+                limit=request.args.get('limit', 20, type=int), group_by=request.args.get('group', 'lineno'))})
+
         # Root endpoint for app info
         @self.route('/')
         def index():
@@ -239,119 +1213,205 @@ class HereSphere(Flask):
             if request.method == 'GET' and 'HereSphere-JSON-Version' not in request.headers:
                 return f'<h2>Press this button - - - ^</h2>', {'content-type':'text/html'}
 
-            body = {'access': 1}
-
-            body['banner'] = {}
-            body['banner']['image'] = self._get_hs_url('/legend')
-            #body['banner']['link'] = 'http://www.example.com'
-
             if request.method == 'POST' and request.form and request.form['login']:
                 log.debug(f'Login: {repr(request.form)}')
                 #body['authorized'] = '1'
 
-            body['library'] = self._cache_get('library') or []
-            for lib in body['library']:
-                for i, url in enumerate(lib['list']):
-                    if not url.startswith('http'):
-                        lib['list'][i] = request.url_root + url
-            return jsonify(body), {'HereSphere-JSON-Version': 1}
+            self._vroom_library_requested_at = time.monotonic()
+            body = self._get_library_json(request.url_root)
+            return Response(body, mimetype='application/json', headers={'HereSphere-JSON-Version': '1'})
+
+        @self.route('/heresphere/scan', methods=['GET', 'POST'])
+        def heresphere_scan():
+            return Response(self._iter_scan_json(request.url_root), mimetype='application/json', headers={'HereSphere-JSON-Version': '1'})
+
+        @self.route('/heresphere/<scene_id>', methods=['GET', 'POST'])
+        def heresphere_scene(scene_id):
+            self._note_scene_requested(scene_id)
+            with self._vroom_lock:
+                known = scene_id in self._vroom_scenes_by_id
+            if not known:
+                # Check first, so no edit is queued for a scene Stash would reject.
+                log.warning(f'Unknown scene requested: {scene_id!r}')
+                return jsonify({'access': 1, 'error': f'Unknown scene: {scene_id}'}), 404, {'HereSphere-JSON-Version': '1'}
+
+            edits = request.get_json(silent=True) if request.method == 'POST' else None
+            if edits is not None and not isinstance(edits, dict):
+                return jsonify({'access': 1, 'error': 'Scene edits must be a JSON object'}), 400, {'HereSphere-JSON-Version': '1'}
+            if edits and 'rating' in edits:
+                # HereSphere sends 0 to 5 stars in half-star steps, or 0 to clear.
+                rating = edits['rating']
+                if isinstance(rating, bool) or not isinstance(rating, (int, float)) or not 0 <= rating <= 5:
+                    return jsonify({'access': 1, 'error': f'Invalid rating: {rating!r}'}), 400, {'HereSphere-JSON-Version': '1'}
+                self.update_scene(scene_id, rating100=round(rating * 20) or None)
+
+            body = self._get_scene_json(scene_id)
+            if body is None:
+                return jsonify({'access': 1, 'error': f'Unknown scene: {scene_id}'}), 404, {'HereSphere-JSON-Version': '1'}
+            return Response(body, mimetype='application/json', headers={'HereSphere-JSON-Version': '1'})
 
         @self.route('/heresphere/legend', methods=['GET'])
         def heresphere_legend():
-            img_width, img_height = (1920, 200)
-            shortcuts = self._get_hs_shortcuts()
-
-            #num_cols = 3
-            #num_rows = math.ceil(len(shortcuts) / num_cols) # Buggy
-            num_rows = 7
-            num_cols = math.ceil(len(shortcuts) / num_rows)
-            log.debug(f'Legend content size: {len(shortcuts)} shortcuts as {num_cols} cols x {num_rows} rows')
-
-            img = PIL.Image.new("RGB", (img_width, img_height), color="white")
-            draw = PIL.ImageDraw.Draw(img)
-
-            font_mono = util.get_font_dirpath() + '/VeraMono.ttf'
-            log.debug(f'Font: {font_mono}')
-            font = PIL.ImageFont.truetype(font_mono, 24)
-
-            cell_width = img_width / num_cols
-            cell_height = img_height / num_rows
-
-            padding_x = 10
-            padding_y = 1
-
-            actions = []
-            for _id, dirs, description in shortcuts:
-                dirs = util.split_comma(dirs)
-                dirs = [ X[0] for X in dirs ]
-                while len(dirs) < 6:
-                    dirs.insert(0, ' ')
-                dirs = ' '.join(dirs)
-                actions.append({'dirs':dirs, 'description':description})
-
-            for i, action in enumerate(actions):
-                dirs = action['dirs']
-                description = action['description']
-
-                # Row-oriented
-                #col = i % num_cols
-                #row = i // num_cols
-
-                # Column-oriented
-                row = i % num_rows
-                col = i // num_rows
-
-                # Top-left corner of this "cell"
-                x = col * cell_width + padding_x
-                y = row * cell_height + padding_y
-
-                text = f'{dirs} | {description}'
-                draw.text((x, y), text, font=font, fill="black")
-
-            img_bytes = io.BytesIO()
-            img.save(img_bytes, format="PNG")
-            img_bytes.seek(0)
-            return Response(img_bytes, mimetype="image/png")
+            etag, png = self._get_legend_png()
+            response = Response(png, mimetype="image/png")
+            response.set_etag(etag)
+            return response.make_conditional(request)
+
+        @self.route('/heresphere/event', methods=['POST'])
+        def heresphere_event():
+            event = request.get_json(force=True, silent=True) or {}
+            event_name = HS_EVENTS.get(event.get('event'))
+            scene_id = str(event.get('id') or '').rstrip('/').rsplit('/', 1)[-1]
+            if not event_name or not scene_id:
+                return jsonify({"status": "unknown_event", "event": event.get('event')}), 400
+            return self._handle_event(event_name, scene_id, time=(event.get('time') or 0) / 1000, speed=event.get('speed'))
+
+        @self.route('/heresphere/file/<scene_id>', methods=['GET'])
+        def heresphere_file(scene_id):
+            return self._get_file_response(scene_id)
+
+        @self.route('/heresphere/media/<scene_id>/<kind>/<tag>', methods=['GET'])
+        def heresphere_media(scene_id, kind, tag):
+            return self._get_media_response(scene_id, kind, tag)
     
-    def _handle_event(self, event_name: str, scene_id: str) -> Response:
+    def _handle_event(self, event_name: str, scene_id: str, **details) -> Response:
         """
         Handle an event from HereSphere.
-        
+
+        Handlers run in the worker pool, so the response waits only for handlers
+        registered with a ``wait`` time, and never longer than that.
+
         :param event_name: Name of the event
         :param scene_id: ID of the scene
+        :param details: Keyword arguments for the handlers, e.g. ``time`` in seconds
         :return: Flask response
         """
-        log.info(f"Handling event: {event_name} for scene: {scene_id}")
-        
-        # Check if we have handlers for this event
-        handlers = self._vroom_handlers.get(event_name, [])
-        if not handlers:
-            log.warning(f"No handlers for event: {event_name}")
+        log.debug(f"Handling event: {event_name} for scene: {scene_id}")
+
+        if not self._vroom_handlers.has_handlers(event_name):
+            log.debug(f"No handlers for event: {event_name}")
             return jsonify({"status": "no_handler", "event": event_name}), 200
-        
-        # Call all handlers for this event
-        results = []
-        for handler in handlers:
-            try:
-                result = handler(scene_id)
-                results.append({
-                    "handler": handler.__name__,
-                    "result": str(result) if result is not None else None
-                })
-            except Exception as e:
-                log.error(f"Error in handler {handler.__name__}: {e}")
-                results.append({
-                    "handler": handler.__name__,
-                    "error": str(e)
-                })
-        
+
+        results = self._vroom_handlers.dispatch(event_name, scene_id, **details)
         return jsonify({
             "status": "ok",
             "event": event_name,
             "scene_id": scene_id,
             "results": results
         })
-    
+
+    def on_event(self, event_name: str, wait: Optional[float] = None):
+        """
+        Decorator for registering event handlers.
+
+        Handlers are called with the scene ID and keyword arguments for the event details, in a
+        worker thread. By default the response to HereSphere does not wait for them.
+
+        .. code-block:: python
+
+            @app.on_event('play', wait=0.5)
+            def on_play(scene_id, **details):
+                print(f'Play scene {scene_id} at {details["time"]}s')
+
+        :param event_name: Name of the event to handle: ``"open"``, ``"play"``, ``"pause"``, or ``"close"``
+        :param wait: Seconds the response may wait for the handler, or ``None`` to fire and forget
+        :return: Decorator function
+        """
+
+        if not event_name or event_name[0] == '_':
+            raise ValueError(f"Invalid event name: {event_name}")
+
+        def decorator(func: Callable[..., Any]):
+            self._vroom_handlers.register(event_name, func, wait=wait)
+            return func
+        return decorator
+
+    def add_shortcut(self, shortcut_id: str, *directions: str, description: Optional[str] = None):
+        """
+        Show a D-Pad shortcut in the HereSphere legend banner, which is rendered again to include it.
+
+        .. code-block:: python
+
+            app.add_shortcut('screenshot', 'left', 'left', 'right', 'right', description='Screenshot')
+
+        :param shortcut_id: A unique ID for the shortcut
+        :param directions: D-Pad directions: ``"up"``, ``"down"``, ``"left"``, or ``"right"``
+        :param description: Text shown in the legend; default: the ID
+        :raises ValueError: If the ID or a direction is invalid, or the ID or the directions are already registered
+        """
+        if not shortcut_id or not isinstance(shortcut_id, str):
+            raise ValueError(f'Invalid shortcut ID: {shortcut_id!r}')
+        if not directions:
+            raise ValueError(f'Shortcut {shortcut_id} needs at least one direction')
+        for direction in directions:
+            if direction not in ('up', 'down', 'left', 'right'):
+                raise ValueError(f'Invalid direction: {direction!r}')
+
+        dirs = ','.join(directions)
+        with self._vroom_lock:
+            for existing_id, existing_dirs, _description in self._vroom_shortcuts:
+                if existing_id == shortcut_id or existing_dirs == dirs:
+                    raise ValueError(f'Shortcut {dirs} already registered as {existing_id}')
+            # A new list, so the legend's cache key changes with it.
+            self._vroom_shortcuts = self._vroom_shortcuts + [ (shortcut_id, dirs, description or shortcut_id) ]
+        log.debug(f'Registered shortcut {shortcut_id}: {dirs}')
+
+    def get_handler_stats(self) -> Dict[str, List[dict]]:
+        """
+        Return the call, error, timeout, and latency counters of every event handler.
+
+        :return: event_name -> list of counter dicts, one per handler
+        """
+        return self._vroom_handlers.get_stats()
+
+    def get_memory_report(self, limit=20, group_by='lineno') -> Dict[str, Any]:
+        """
+        Report what uses memory: the top allocation sites, and the estimated bytes retained
+        by each filter, by each part of the scenes, and by each cache.
+
+        A filter retains its list of scene IDs, plus its ``exclusive_bytes``: the scenes in no other filter.
+        Sizes are estimates from ``sys.getsizeof``, and walking every scene takes a while for large libraries.
+
+        :param limit: How many allocation sites
+        :param group_by: Group allocation sites by ``lineno``, ``filename``, or ``traceback``
+        """
+        with self._vroom_lock:
+            scenes_by_id = dict(self._vroom_scenes_by_id)
+            scene_refs = dict(self._vroom_scene_refs)
+            filters = { K: list(V) for K, V in self._vroom_scenes_by_filter.items() }
+            caches = dict(self._vroom_cache)
+
+        report = {}
+        if self._vroom_memory and self._vroom_memory.is_tracing():
+            report.update(self._vroom_memory.get_totals())
+            report['top'] = self._vroom_memory.get_top(limit=limit, group_by=group_by)
+            report['snapshots'] = self._vroom_memory.get_snapshot_names()
+
+        report['filters'] = {}
+        for filter_name, scene_ids in filters.items():
+            scenes = [ scenes_by_id[X] for X in scene_ids if X in scenes_by_id ]
+            seen, exclusive_seen = set(), set()
+            report['filters'][filter_name] = {
+                'scenes': len(scene_ids),
+                'ids_bytes': memory.get_deep_size(scene_ids),
+                'scene_bytes': sum(memory.get_deep_size(X, seen) for X in scenes),
+                'exclusive_bytes': sum(memory.get_deep_size(X, exclusive_seen) for X in scenes if scene_refs.get(X['id']) == 1),
+            }
+        report['scenes'] = {'count': len(scenes_by_id), 'bytes': memory.get_deep_size(scenes_by_id),
+                            'parts': memory.get_scene_breakdown(scenes_by_id.values())}
+        report['caches'] = { K: memory.get_deep_size(V) for K, V in caches.items() }
+        return report
+
+    def _get_memory_response(self, get_body) -> Response:
+        if not self._vroom_memory:
+            return Response('Memory profiling is off; set VROOM_TRACEMALLOC to a number of stack frames', status=404, mimetype='text/plain')
+        try:
+            return jsonify(get_body())
+        except KeyError as e:
+            return Response(f'Unknown snapshot or missing parameter: {e}', status=400, mimetype='text/plain')
+        except ValueError as e:
+            return Response(str(e), status=400, mimetype='text/plain')
+
     # def on_doubleclick(self):
     #     return self._on('doubleclick')
     
@@ -385,24 +1445,83 @@ class HereSphere(Flask):
     #         return func
     #     return decorator
 
-    # def _on(self, event_name: str):
-    #     """
-    #     Decorator for registering event handlers.
-        
-    #     :param event_name: Name of the event to handle (e.g., "delete", "favorite", "play")
-    #     :return: Decorator function
-    #     """
+    def _get_hs_shortcuts(self) -> List[tuple]:
+        """
+        Return the D-Pad shortcuts shown in the HereSphere legend banner.
 
-    #     if not event_name or event_name[0] == '_':
-    #         raise ValueError(f"Invalid event name: {event_name}")
+        :return: A list of ``(id, directions, description)`` tuples, where directions is comma-separated, e.g. ``"up,up,down"``
+        """
+        with self._vroom_lock:
+            return list(self._vroom_shortcuts)
 
-    #     def decorator(func: Callable[[str], Any]):
-    #         if event_name not in self._vroom_handlers:
-    #             self._vroom_handlers[event_name] = []
-    #         self._vroom_handlers[event_name].append(func)
-    #         log.debug(f"Registered handler for event {event_name}: {func.__name__}")
-    #         return func
-    #     return decorator
+    def _get_legend_png(self):
+        """
+        Return the legend banner image, rendering it only when the shortcuts change.
+
+        :return: A tuple of the ETag and the PNG bytes
+        """
+        shortcuts = self._get_hs_shortcuts()
+        etag = hashlib.sha1(jsoncodec.dumps(shortcuts)).hexdigest()
+
+        cached = self._cache_get('legend')
+        self._count_cache('legend', cached and cached[0] == etag)
+        if cached and cached[0] == etag:
+            return cached
+
+        png = self._render_legend(shortcuts)
+        return self._cache_set('legend', (etag, png))
+
+    def _render_legend(self, shortcuts) -> bytes:
+        img_width, img_height = (1920, 200)
+
+        #num_cols = 3
+        #num_rows = math.ceil(len(shortcuts) / num_cols) # Buggy
+        num_rows = 7
+        num_cols = max(1, math.ceil(len(shortcuts) / num_rows))
+        log.debug(f'Legend content size: {len(shortcuts)} shortcuts as {num_cols} cols x {num_rows} rows')
+
+        img = PIL.Image.new("RGB", (img_width, img_height), color="white")
+        draw = PIL.ImageDraw.Draw(img)
+
+        font = get_font('VeraMono.ttf', 24)
+
+        cell_width = img_width / num_cols
+        cell_height = img_height / num_rows
+
+        padding_x = 10
+        padding_y = 1
+
+        actions = []
+        for _id, dirs, description in shortcuts:
+            dirs = util.split_comma(dirs)
+            dirs = [ X[0] for X in dirs ]
+            while len(dirs) < 6:
+                dirs.insert(0, ' ')
+            dirs = ' '.join(dirs)
+            actions.append({'dirs':dirs, 'description':description})
+
+        for i, action in enumerate(actions):
+            dirs = action['dirs']
+            description = action['description']
+
+            # Row-oriented
+            #col = i % num_cols
+            #row = i // num_cols
+
+            # Column-oriented
+            row = i % num_rows
+            col = i // num_rows
+
+            # Top-left corner of this "cell"
+            x = col * cell_width + padding_x
+            y = row * cell_height + padding_y
+
+            text = f'{dirs} | {description}'
+            draw.text((x, y), text, font=font, fill="black")
+
+        img_bytes = io.BytesIO()
+        img.save(img_bytes, format="PNG")
+        return img_bytes.getvalue()
 
     def _get_hs_url(self, path):
         path = re.sub(r'^/', '', path)
@@ -0,0 +1,198 @@
+# Copyright 2025 Zyquo Onrel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module listens to Stash's job status subscription over a websocket, so VRoom
+learns when a scan, identify, generate, or auto-tag job finishes without polling.
+
+Subscriptions need the optional ``websockets`` package, from the ``jobs`` extra. Without it,
+the watcher logs a warning and stops, and callers keep relying on periodic refreshes.
+"""
+
+import re
+import time
+import random
+import asyncio
+import logging
+import threading
+import urllib.parse
+
+from typing import Callable, Optional
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+from .stash_client.async_base_client import AsyncBaseClient
+
+log = logging.getLogger(__name__)
+
+JOBS_SUBSCRIPTION = """
+subscription JobsSubscribe {
+  jobsSubscribe {
+    type
+    job { id status description progress error }
+  }
+}
+"""
+
+# Jobs whose completion may change which scenes match a filter, matched against the job description.
+LIBRARY_JOB_RE = re.compile(r'scan|identif|generat|auto.?tag|clean|import|merg', re.IGNORECASE)
+
+def get_ws_url(url):
+    """
+    Return the websocket URL for a Stash GraphQL URL.
+
+    >>> from stash_vroom.jobs import get_ws_url
+    >>> get_ws_url('https://stash.local:9999/graphql')
+    'wss://stash.local:9999/graphql'
+    """
+    parsed = urllib.parse.urlparse(url)
+    scheme = {'http':'ws', 'https':'wss'}.get(parsed.scheme, parsed.scheme)
+    return urllib.parse.urlunparse(parsed._replace(scheme=scheme))
+
+class JobWatcher:
+    """
+    Watch Stash jobs in a background thread and call back when a library job finishes.
+
+    The subscription reconnects automatically, with jittered exponential backoff after each failure.
+    A connection which drops soon after it was made counts as a failure too.
+    """
+
+    def __init__(self, url, headers=None, on_finished: Optional[Callable[[dict], None]] = None,
+                 on_connected: Optional[Callable[[bool], None]] = None, min_backoff=1.0, max_backoff=300.0, stable_after=60.0):
+        """
+        :param url: The Stash GraphQL URL, e.g. ``http://127.0.0.1:9999/graphql``
+        :param headers: HTTP headers for the connection, e.g. ``{'ApiKey': ...}``
+        :param on_finished: Function called with the job dict when a library job finishes
+        :param on_connected: Function called with ``True`` once subscribed, and ``False`` when the connection drops
+        :param min_backoff: Seconds to wait after the first failed connection, doubling for each further failure
+        :param max_backoff: Maximum seconds to wait between connection attempts
+        :param stable_after: Seconds a connection must stay up for the backoff to start over
+        """
+        self.url = get_ws_url(url)
+        self.headers = headers or {}
+        self.on_finished = on_finished
+        self.on_connected = on_connected
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+
+        self.connected = False
+        self._connected_at = None # time.monotonic() when the current connection subscribed
+        self._job_status = {} # job_id -> last known status
+        self._thread = None
+        self._loop = None
+        self._task = None
+
+    def start(self):
+        """Start watching in a background thread."""
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._run, name='vroom-jobs', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop watching and close the connection."""
+        thread, loop, task = self._thread, self._loop, self._task
+        self._thread = None
+        if loop and task:
+            loop.call_soon_threadsafe(task.cancel)
+        if thread:
+            thread.join(timeout)
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._task = self._loop.create_task(self._watch())
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+            self._loop = self._task = None
+
+    async def _watch(self):
+        if websockets is None:
+            log.warning('Cannot watch Stash jobs without the websockets package, from the jobs extra: pip install "Stash-VRoom[jobs]"')
+            return
+
+        failures = 0
+        while True:
+            client = _JobsClient(ws_url=self.url, ws_headers=self.headers, on_subscribed=self._on_subscribed)
+            self._connected_at = None
+            try:
+                async for data in client.execute_ws(JOBS_SUBSCRIPTION, operation_name='JobsSubscribe'):
+                    self._on_update(data['jobsSubscribe'])
+                log.debug(f'Stash job subscription ended: {self.url}')
+            except NotImplementedError as e:
+                log.warning(f'Cannot watch Stash jobs: {e}')
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.debug(f'Stash job subscription failed: {e}')
+            finally:
+                self._set_connected(False)
+
+            # Only a connection which stayed up a while starts the backoff over, so a flapping one still backs off.
+            if self._connected_at is not None and time.monotonic() - self._connected_at >= self.stable_after:
+                failures = 0
+            failures += 1
+            delay = min(self.min_backoff * 2 ** (failures - 1), self.max_backoff)
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    def _on_subscribed(self):
+        log.debug(f'Watching Stash jobs: {self.url}')
+        self._connected_at = time.monotonic()
+        self._set_connected(True)
+
+    def _set_connected(self, connected):
+        if connected == self.connected:
+            return
+        self.connected = connected
+        if self.on_connected:
+            self.on_connected(connected)
+
+    def _on_update(self, update):
+        # Call back once per job, on its first FINISHED update.
+        job = update['job']
+        job_id = job['id']
+        previous = self._job_status.get(job_id)
+        if update['type'] == 'REMOVE':
+            self._job_status.pop(job_id, None)
+        else:
+            self._job_status[job_id] = job['status']
+
+        if job['status'] != 'FINISHED' or previous == 'FINISHED':
+            return
+        if not LIBRARY_JOB_RE.search(job.get('description') or ''):
+            log.debug(f'Ignore finished job {job_id}: {job.get("description")!r}')
+            return
+
+        log.debug(f'Library job {job_id} finished: {job.get("description")!r}')
+        if self.on_finished:
+            self.on_finished(job)
+
+class _JobsClient(AsyncBaseClient):
+    # Report when the server accepted the connection and the subscription is sent.
+    def __init__(self, *args, on_subscribed=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_subscribed = on_subscribed
+
+    async def _send_subscribe(self, websocket, *args, **kwargs):
+        await super()._send_subscribe(websocket, *args, **kwargs)
+        if self.on_subscribed:
+            self.on_subscribed()
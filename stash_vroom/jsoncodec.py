@@ -0,0 +1,157 @@
+# Copyright 2025 Zyquo Onrel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module encodes and decodes JSON for all of VRoom: Stash API requests and replies,
+HereSphere responses, snapshots, and CLI output.
+
+It uses ``orjson`` or ``msgspec`` when installed, which are several times faster than the
+standard library, and falls back to the standard library otherwise. Every codec writes
+compact UTF-8, so the output is the same whichever is used, apart from number formatting.
+Set ``VROOM_JSON`` to ``orjson``, ``msgspec`` or ``json`` to choose one; if that one is not
+installed, the standard library is used.
+"""
+
+import os
+import json
+import logging
+
+from typing import Any, Callable, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+log = logging.getLogger(__name__)
+
+# The codec to use, or 'auto' for the fastest installed.
+JSON_CODEC = os.environ.get('VROOM_JSON', 'auto')
+
+class JSONCodec:
+    """
+    The standard library codec, and the interface of the others.
+
+    >>> from stash_vroom.jsoncodec import JSONCodec
+    >>> JSONCodec().dumps({'name': 'Café', 'ids': [1, 2]})
+    b'{"name":"Caf\\xc3\\xa9","ids":[1,2]}'
+    """
+
+    name = 'json'
+
+    def dumps(self, obj, indent=False, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        """
+        Encode an object as UTF-8 JSON.
+
+        :param indent: Whether to indent by two spaces, for people to read; otherwise compact
+        :param default: Function called with any object the codec cannot encode, returning one it can
+        :raises TypeError: If an object cannot be encoded
+        """
+        if indent:
+            return json.dumps(obj, indent=2, ensure_ascii=False, default=default).encode('utf-8')
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=default).encode('utf-8')
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        """
+        Decode JSON.
+
+        :raises ValueError: If the data is not valid JSON
+        """
+        if isinstance(data, memoryview):
+            data = bytes(data)
+        return json.loads(data)
+
+class OrjsonCodec(JSONCodec):
+    name = 'orjson'
+
+    def dumps(self, obj, indent=False, default=None) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option)
+
+    def loads(self, data) -> Any:
+        return orjson.loads(data)
+
+class MsgspecCodec(JSONCodec):
+    name = 'msgspec'
+
+    def __init__(self):
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+
+    def dumps(self, obj, indent=False, default=None) -> bytes:
+        try:
+            result = msgspec.json.encode(obj, enc_hook=default) if default else self._encoder.encode(obj)
+        except (msgspec.EncodeError, NotImplementedError) as e:
+            raise TypeError(str(e)) from e
+        return msgspec.json.format(result, indent=2) if indent else result
+
+    def loads(self, data) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+# Fastest first.
+CODECS = {
+    'orjson': (OrjsonCodec, lambda: orjson is not None),
+    'msgspec': (MsgspecCodec, lambda: msgspec is not None),
+    'json': (JSONCodec, lambda: True),
+}
+
+def get_available() -> List[str]:
+    """Return the names of the installed codecs, fastest first."""
+    return [ K for K, (_, is_installed) in CODECS.items() if is_installed() ]
+
+def get_codec(name=None) -> JSONCodec:
+    """
+    Return a codec.
+
+    :param name: A name from ``CODECS``, or ``auto`` for the fastest installed; ``None`` for ``JSON_CODEC``
+    :raises ValueError: If the codec is unknown or not installed
+    """
+    name = name or JSON_CODEC
+    if name == 'auto':
+        name = get_available()[0]
+    if name not in CODECS:
+        raise ValueError(f'Unknown JSON codec {name!r}, use one of: auto, {", ".join(CODECS)}')
+    cls, is_installed = CODECS[name]
+    if not is_installed():
+        raise ValueError(f'JSON codec {name!r} is not installed')
+    return cls()
+
+def get_default_codec() -> JSONCodec:
+    """Return the codec ``JSON_CODEC`` names, or the standard library one with a warning if it is unknown or not installed."""
+    try:
+        return get_codec()
+    except ValueError as e:
+        log.warning(f'{e}, so use the standard library JSON codec')
+        return JSONCodec()
+
+codec = get_default_codec()
+log.debug(f'JSON codec: {codec.name}')
+
+def dumps(obj, indent=False, default=None) -> bytes:
+    """Encode an object as UTF-8 JSON with the default codec. See :meth:`JSONCodec.dumps`."""
+    return codec.dumps(obj, indent=indent, default=default)
+
+def loads(data) -> Any:
+    """Decode JSON with the default codec. See :meth:`JSONCodec.loads`."""
+    return codec.loads(data)
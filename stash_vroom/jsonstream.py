@@ -0,0 +1,164 @@
+# Copyright 2025 Zyquo Onrel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module decodes one big array within a JSON document incrementally, item by item.
+
+A reply such as ``{"data": {"findScenes": {"scenes": [...]}}}`` can be decoded from its
+byte stream one scene at a time, so neither the whole body nor the whole object tree is
+ever held at once. Everything outside that array is small, and decoded as usual.
+"""
+
+import re
+import json
+import codecs
+
+from typing import Any, Iterable, Iterator, Optional, Sequence, Union
+
+_WHITESPACE = ' \t\r\n'
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.S)
+_DECODER = json.JSONDecoder()
+
+def iter_items(chunks: Iterable[Union[bytes, str]], path: Sequence[str], envelope: Optional[dict] = None) -> Iterator[Any]:
+    """
+    Yield the items of the array at ``path`` as they are decoded from a stream of chunks.
+
+    >>> from stash_vroom.jsonstream import iter_items
+    >>> envelope = {}
+    >>> list(iter_items([b'{"data": {"count": 2, "items": [{"id"', b': 1}, {"id": 2}]}}'], ['data', 'items'], envelope))
+    [{'id': 1}, {'id': 2}]
+    >>> envelope
+    {'data': {'count': 2, 'items': []}}
+
+    :param chunks: The document as UTF-8 bytes or text, in pieces of any size
+    :param path: Object keys leading to the array
+    :param envelope: Optional dict, updated once the stream ends with the rest of the document,
+                     in which the array is empty
+    :raises ValueError: If the document is not valid JSON
+    """
+    reader = _Reader(chunks)
+    path = list(path)
+    outside = [] # The text of the document outside the array
+    stack = [] # [kind, key] of each open container, the key being that of the current value in objects
+    expect_key = False
+
+    while True:
+        char = reader.peek()
+        if char is None:
+            break
+        if char == '"':
+            text = reader.read_string()
+            outside.append(text)
+            if expect_key:
+                stack[-1][1] = json.loads(text)
+                expect_key = False
+            continue
+
+        reader.pos += 1
+        outside.append(char)
+        if char == '{':
+            stack.append(['{', None])
+            expect_key = True
+        elif char == '[':
+            if [ X[1] for X in stack ] == path and all(X[0] == '{' for X in stack):
+                outside.append(']')
+                yield from reader.read_items()
+                continue
+            stack.append(['[', None])
+        elif char in '}]':
+            if not stack:
+                raise ValueError(f'Unexpected {char!r} in JSON')
+            stack.pop()
+        elif char == ',':
+            expect_key = bool(stack) and stack[-1][0] == '{'
+
+    if stack:
+        raise ValueError('Truncated JSON')
+    if envelope is not None:
+        envelope.update(json.loads(''.join(outside)))
+
+class _Reader:
+    # A text buffer, refilled from the chunks as needed.
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        # Read one more chunk, and return whether there was one.
+        if self.eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.eof = True
+            text = self._decoder.decode(b'', final=True)
+        else:
+            text = chunk if isinstance(chunk, str) else self._decoder.decode(chunk)
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self) -> Optional[str]:
+        # Skip whitespace, and return the next character without consuming it, or None at the end.
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return None
+
+    def read_string(self) -> str:
+        while True:
+            match = _STRING.match(self.buf, self.pos)
+            if match:
+                self.pos = match.end()
+                return match.group()
+            if not self.fill():
+                raise ValueError('Truncated JSON string')
+
+    def read_items(self) -> Iterator[Any]:
+        # Yield array items, starting just after the '[', and consume the ']'.
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            item = self._read_item()
+            yield item
+            char = self.peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f'Expected "," or "]" in JSON array, not {char!r}')
+
+    def _read_item(self):
+        # An item is complete once something follows it, e.g. so "12" is not taken for the start of "123".
+        if self.peek() is None:
+            raise ValueError('Truncated JSON array')
+        while True:
+            try:
+                item, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            while end < len(self.buf) and self.buf[end] in _WHITESPACE:
+                end += 1
+            if end < len(self.buf) or not self.fill():
+                self.pos = end
+                return item
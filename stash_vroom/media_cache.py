@@ -0,0 +1,199 @@
+# Copyright 2025 Zyquo Onrel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module keeps a size-bounded, least-recently-used cache of media files on disk,
+such as scene screenshots and previews fetched from Stash.
+
+Each entry is one file named by the hash of its key, with an extension for its content type,
+so the cache survives restarts without any separate index.
+"""
+
+import os
+import hashlib
+import logging
+import mimetypes
+import threading
+import collections
+
+from typing import Callable, Iterator, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+class MediaCache:
+    """
+    Cache media files on disk, evicting the least recently used files beyond a total size.
+
+    Concurrent requests for the same missing key fetch it only once.
+    """
+
+    def __init__(self, root, max_bytes=2 * 1024**3):
+        """
+        :param root: Directory for the cached files; created on first use
+        :param max_bytes: Maximum total size of the cached files
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries = None # digest -> (path, size), least recently used first. Loaded on first use.
+        self._total = 0
+        self._fetching = {} # digest -> threading.Lock held while fetching it
+
+    @staticmethod
+    def get_digest(key) -> str:
+        """Return the hex digest naming a key on disk, also usable as a strong ETag."""
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def get(self, key) -> Optional[Tuple[str, str, str]]:
+        """
+        Return a cached file.
+
+        :param key: The cache key, e.g. the upstream URL and version
+        :return: A tuple of the file path, content type, and digest; or ``None`` if not cached
+        """
+        digest = self.get_digest(key)
+        with self._lock:
+            self._load()
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            self._entries.move_to_end(digest)
+        path = entry[0]
+        return path, mimetypes.guess_type(path)[0] or 'application/octet-stream', digest
+
+    def get_or_fetch(self, key, fetch: Callable[[], Tuple[str, Iterator[bytes]]]) -> Tuple[str, str, str]:
+        """
+        Return a cached file, fetching and storing it first if needed.
+
+        :param key: The cache key
+        :param fetch: Function returning the content type and an iterator of byte chunks; exceptions propagate
+        :return: A tuple of the file path, content type, and digest
+        """
+        digest = self.get_digest(key)
+        with self._lock:
+            fetching = self._fetching.setdefault(digest, threading.Lock())
+
+        with fetching:
+            try:
+                found = self.get(key)
+                if found:
+                    return found
+                content_type, chunks = fetch()
+                return self.put(key, content_type, chunks)
+            finally:
+                with self._lock:
+                    self._fetching.pop(digest, None)
+
+    def put(self, key, content_type, chunks) -> Tuple[str, str, str]:
+        """
+        Store a file in the cache.
+
+        :param key: The cache key
+        :param content_type: The MIME type, e.g. ``image/jpeg``
+        :param chunks: The content, as bytes or an iterator of byte chunks
+        :return: A tuple of the file path, content type, and digest
+        """
+        if isinstance(chunks, bytes):
+            chunks = [chunks]
+
+        digest = self.get_digest(key)
+        ext = mimetypes.guess_extension((content_type or '').split(';')[0].strip()) or ''
+        path = os.path.join(self.root, digest[:2], digest + ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        size = 0
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._load()
+            old = self._entries.pop(digest, None)
+            if old:
+                self._total -= old[1]
+                if old[0] != path:
+                    self._remove_file(old[0])
+            self._entries[digest] = (path, size)
+            self._total += size
+            self._evict()
+        return path, mimetypes.guess_type(path)[0] or 'application/octet-stream', digest
+
+    def discard_missing(self, key) -> bool:
+        """
+        Forget a cached file if it is gone from disk, e.g. deleted behind the cache's back.
+
+        :param key: The cache key
+        :return: ``True`` if the entry was forgotten
+        """
+        digest = self.get_digest(key)
+        with self._lock:
+            self._load()
+            entry = self._entries.get(digest)
+            if entry is None or os.path.exists(entry[0]):
+                return False
+            del self._entries[digest]
+            self._total -= entry[1]
+        return True
+
+    def get_size(self) -> int:
+        """Return the total size of the cached files."""
+        with self._lock:
+            self._load()
+            return self._total
+
+    def _load(self):
+        # Call with the lock held. Index existing files, oldest access first.
+        if self._entries is not None:
+            return
+        found = []
+        if os.path.isdir(self.root):
+            for dirpath, _dirnames, filenames in os.walk(self.root):
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    if filename.endswith('.tmp'):
+                        self._remove_file(path)
+                        continue
+                    stat = os.stat(path)
+                    found.append((stat.st_atime, filename.split('.')[0], path, stat.st_size))
+        found.sort()
+
+        self._entries = collections.OrderedDict()
+        self._total = 0
+        for _atime, digest, path, size in found:
+            self._entries[digest] = (path, size)
+            self._total += size
+        log.debug(f'Media cache {self.root}: {len(self._entries)} files, {self._total} bytes')
+        self._evict()
+
+    def _evict(self):
+        # Call with the lock held.
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            digest, (path, size) = self._entries.popitem(last=False)
+            self._total -= size
+            self._remove_file(path)
+
+    def _remove_file(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
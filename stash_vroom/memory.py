@@ -0,0 +1,204 @@
+# Copyright 2025 Zyquo Onrel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module finds out what uses memory in VRoom.
+
+:class:`MemoryProfiler` wraps ``tracemalloc``: top allocation sites and named snapshots to compare.
+:func:`get_deep_size` and :func:`get_scene_breakdown` estimate how many bytes a structure retains,
+such as the scenes of a filter, or the markers and tag parent chains within scenes.
+"""
+
+import sys
+import logging
+import threading
+import tracemalloc
+import collections
+
+from typing import Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+GROUP_BY = ('lineno', 'filename', 'traceback')
+
+# Allocations by the profiler itself are noise.
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+class MemoryProfiler:
+    """
+    Trace memory allocations, and keep a few named snapshots to compare.
+
+    >>> from stash_vroom.memory import MemoryProfiler
+    >>> profiler = MemoryProfiler(frames=1)
+    >>> profiler.start()
+    >>> _ = profiler.take_snapshot('before')
+    >>> data = [ str(X) * 10 for X in range(1000) ]
+    >>> profiler.compare('before')[0]['size_diff'] > 0
+    True
+    >>> profiler.stop()
+    """
+
+    def __init__(self, frames=1, max_snapshots=8):
+        """
+        :param frames: Stack frames kept per allocation; more show callers, but cost more memory
+        :param max_snapshots: Snapshots kept; the oldest is dropped first
+        """
+        self.frames = frames
+        self.max_snapshots = max_snapshots
+        self._lock = threading.Lock()
+        self._snapshots = collections.OrderedDict() # name -> tracemalloc.Snapshot, oldest first
+        self._started = False
+
+    def start(self):
+        """Start tracing allocations, unless something else already does."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started = True
+            log.info(f'Tracing memory allocations, {self.frames} frames each')
+
+    def stop(self):
+        """Stop tracing, if :meth:`start` started it, and drop the snapshots."""
+        with self._lock:
+            self._snapshots.clear()
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def is_tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def get_totals(self) -> dict:
+        """Return the ``traced_bytes`` now and the ``peak_bytes`` since tracing started."""
+        current, peak = tracemalloc.get_traced_memory()
+        return {'traced_bytes': current, 'peak_bytes': peak}
+
+    def get_top(self, limit=20, group_by='lineno') -> List[dict]:
+        """
+        Return the allocation sites holding the most memory now.
+
+        :param limit: How many sites
+        :param group_by: One of ``GROUP_BY``
+        :return: Dicts with ``where``, ``size`` in bytes, and ``count`` of blocks, largest first
+        """
+        stats = self._take_snapshot().statistics(_check_group_by(group_by))
+        return [ {'where': _format_where(X.traceback, group_by), 'size': X.size, 'count': X.count} for X in stats[:limit] ]
+
+    def take_snapshot(self, name) -> dict:
+        """
+        Take a named snapshot to compare later, replacing any snapshot of the same name.
+
+        :return: The snapshot ``name``, with its ``traced_bytes`` and ``blocks``
+        """
+        snapshot = self._take_snapshot()
+        with self._lock:
+            self._snapshots.pop(name, None)
+            self._snapshots[name] = snapshot
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        stats = snapshot.statistics('filename')
+        return {'name': name, 'traced_bytes': sum(X.size for X in stats), 'blocks': sum(X.count for X in stats)}
+
+    def get_snapshot_names(self) -> List[str]:
+        with self._lock:
+            return list(self._snapshots)
+
+    def compare(self, old_name, new_name=None, limit=20, group_by='lineno') -> List[dict]:
+        """
+        Return the allocation sites which grew or shrank the most between two snapshots.
+
+        :param old_name: The earlier snapshot
+        :param new_name: The later snapshot, or ``None`` for now
+        :return: Dicts with ``where``, ``size_diff``, ``count_diff``, ``size`` and ``count``
+        :raises KeyError: If a snapshot name is unknown
+        """
+        with self._lock:
+            old = self._snapshots[old_name]
+            new = self._snapshots[new_name] if new_name is not None else None
+        if new is None:
+            new = self._take_snapshot()
+
+        stats = new.compare_to(old, _check_group_by(group_by))
+        return [ {'where': _format_where(X.traceback, group_by), 'size_diff': X.size_diff, 'count_diff': X.count_diff,
+                  'size': X.size, 'count': X.count} for X in stats[:limit] ]
+
+    def _take_snapshot(self):
+        if not tracemalloc.is_tracing():
+            raise RuntimeError('Memory allocations are not traced')
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+def get_deep_size(obj, seen: Optional[set] = None) -> int:
+    """
+    Estimate the bytes retained by an object and everything in it, counting shared objects once.
+
+    Only dicts, lists, tuples and sets are followed, which covers JSON-like data from Stash.
+
+    :param obj: The object to measure
+    :param seen: IDs of objects already counted, to share across calls
+    """
+    seen = set() if seen is None else seen
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return size
+
+def get_scene_breakdown(scenes) -> Dict[str, int]:
+    """
+    Estimate the bytes retained by each part of some scenes.
+
+    :param scenes: Scene dicts, as from the Stash API
+    :return: Bytes per scene key, plus ``tag_parents`` for the parent chains of scene and marker tags,
+             which is part of ``tags`` and ``scene_markers``
+    """
+    seen = set()
+    parents_seen = set()
+    result = collections.Counter()
+    for scene in scenes:
+        result['_dict'] += sys.getsizeof(scene)
+        for key, value in scene.items():
+            result[key] += get_deep_size(value, seen)
+
+        tags = list(scene.get('tags') or [])
+        for marker in scene.get('scene_markers') or []:
+            tags.extend(marker.get('tags') or [])
+        for tag in tags:
+            if tag.get('parents'):
+                result['tag_parents'] += get_deep_size(tag['parents'], parents_seen)
+    return dict(result.most_common())
+
+def _check_group_by(group_by):
+    if group_by not in GROUP_BY:
+        raise ValueError(f'Unknown grouping {group_by!r}, use one of: {", ".join(GROUP_BY)}')
+    return group_by
+
+def _format_where(traceback, group_by):
+    if group_by == 'filename':
+        return traceback[0].filename
+    if group_by == 'traceback':
+        return [ f'{X.filename}:{X.lineno}' for X in traceback ]
+    return f'{traceback[0].filename}:{traceback[0].lineno}'
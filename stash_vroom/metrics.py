@@ -0,0 +1,210 @@
+# Copyright 2025 Zyquo Onrel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module keeps counters, gauges and histograms, and renders them in the Prometheus text format.
+
+It has no dependencies, and only what VRoom needs: metrics with labels, and gauges whose
+values come from a callback when the metrics are rendered.
+"""
+
+import bisect
+import logging
+import threading
+import time
+
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# Default histogram buckets, in seconds.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+class Registry:
+    """
+    A set of metrics, rendered together by :meth:`render`.
+
+    >>> from stash_vroom.metrics import Registry
+    >>> registry = Registry()
+    >>> requests = registry.counter('vroom_requests_total', 'Requests', ['route'])
+    >>> requests.inc(route='/heresphere')
+    >>> print(registry.render(), end='')
+    # HELP vroom_requests_total Requests
+    # TYPE vroom_requests_total counter
+    vroom_requests_total{route="/heresphere"} 1
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {} # name -> metric, in registration order
+
+    def counter(self, name, help, labels=()) -> 'Counter':
+        return self._add(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS) -> 'Histogram':
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name, help, labels=(), callback: Optional[Callable[[], Iterable[Tuple[dict, float]]]] = None) -> 'Gauge':
+        """
+        :param callback: Optional function returning ``(labels, value)`` pairs each time the metrics render
+        """
+        return self._add(Gauge(name, help, labels, callback))
+
+    def get(self, name):
+        with self._lock:
+            return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                log.error(f'Cannot render metric {metric.name}: {e}')
+        return '\n'.join(lines) + '\n'
+
+    def _add(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'Metric already registered: {metric.name}')
+            self._metrics[metric.name] = metric
+        return metric
+
+class _Metric:
+    type = 'untyped'
+
+    def __init__(self, name, help, labels):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[tuple, object] = {}
+
+    def _get_key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f'Metric {self.name} needs labels {self.labels}, got {tuple(labels)}')
+        return tuple(str(labels[X]) for X in self.labels)
+
+    def _format_labels(self, key, extra=''):
+        pairs = [ f'{K}="{_escape(V)}"' for K, V in zip(self.labels, key) ]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._get_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        with self._lock:
+            return self._values.get(self._get_key(labels), 0)
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return [ f'{self.name}{self._format_labels(K)} {_format_value(V)}' for K, V in values ]
+
+class Gauge(_Metric):
+    type = 'gauge'
+
+    def __init__(self, name, help, labels, callback=None):
+        super().__init__(name, help, labels)
+        self.callback = callback
+
+    def set(self, value, **labels):
+        key = self._get_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self):
+        if self.callback:
+            values = sorted((self._get_key(L), V) for L, V in self.callback())
+        else:
+            with self._lock:
+                values = sorted(self._values.items())
+        return [ f'{self.name}{self._format_labels(K)} {_format_value(V)}' for K, V in values ]
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name, help, labels, buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._get_key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def time(self, **labels):
+        """Return a context manager observing the seconds spent inside it."""
+        return _Timer(self, labels)
+
+    def get_count(self, **labels):
+        with self._lock:
+            counts, _total = self._values.get(self._get_key(labels)) or ([0], 0.0)
+            return sum(counts)
+
+    def render(self):
+        with self._lock:
+            values = sorted((K, (list(C), T)) for K, (C, T) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else _format_value(bound)
+                labels = self._format_labels(key, f'le="{le}"')
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            lines.append(f'{self.name}_sum{self._format_labels(key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{self._format_labels(key)} {cumulative}')
+        return lines
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started_at, **self.labels)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
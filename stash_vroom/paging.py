@@ -0,0 +1,160 @@
+# Copyright 2025 Zyquo Onrel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module fetches large result sets from Stash in pages, several at once.
+
+One huge reply makes Stash build, and VRoom hold, the whole result at once. Pages keep
+every reply small, and fetching a few concurrently overlaps Stash's work with VRoom's.
+Callers fetching several result sets at once can share a semaphore, bounding their
+requests to Stash in total.
+"""
+
+import math
+import time
+import logging
+import threading
+import contextlib
+import concurrent.futures
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import util
+
+log = logging.getLogger(__name__)
+
+class ChunkSizer:
+    """
+    Choose how many items to request at once, so each request takes about the target time.
+
+    Sizes start at the maximum and shrink while Stash is slow, learning its seconds per item.
+
+    >>> sizer = ChunkSizer(max_size=500, min_size=50, target_seconds=2.0)
+    >>> sizer.get_size()
+    500
+    >>> sizer.add_sample(500, 10.0)
+    >>> sizer.get_size()
+    100
+    """
+
+    def __init__(self, max_size=500, min_size=50, target_seconds=2.0, smoothing=0.5):
+        """
+        :param max_size: Most items per request, which bounds the memory of one reply
+        :param min_size: Fewest items per request
+        :param target_seconds: Seconds one request should take
+        :param smoothing: Weight of each new sample in the running average, from 0 to 1
+        """
+        self.max_size = max_size
+        self.min_size = min(min_size, max_size)
+        self.target_seconds = target_seconds
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._seconds_per_item = None
+
+    def get_size(self) -> int:
+        with self._lock:
+            if not self._seconds_per_item:
+                return self.max_size
+            size = int(self.target_seconds / self._seconds_per_item)
+        return max(self.min_size, min(self.max_size, size))
+
+    def add_sample(self, count, seconds):
+        """Learn from a request for ``count`` items which took ``seconds``."""
+        if count <= 0:
+            return
+        with self._lock:
+            rate = seconds / count
+            if self._seconds_per_item is None:
+                self._seconds_per_item = rate
+            else:
+                self._seconds_per_item += self.smoothing * (rate - self._seconds_per_item)
+
+def fetch_scene_ids(client, find_filter: dict, scene_filter: dict, page_size=5000, workers=4,
+                    slots: Optional[threading.Semaphore] = None) -> Tuple[int, List[dict]]:
+    """
+    Return the count and the ``SceneIds`` items of a filter, fetching pages concurrently.
+
+    The first page tells the count, then the other pages are fetched at most ``workers`` at once.
+    If the result set changes between pages, so items are duplicated or missing, it is fetched
+    again in one query.
+
+    :param client: The Stash GraphQL client
+    :param find_filter: The find filter; its ``page`` and ``per_page`` are ignored
+    :param scene_filter: The scene filter
+    :param page_size: Items per page
+    :param workers: Most pages fetched at once
+    :param slots: Optional semaphore held during each request, shared to bound requests across calls
+    """
+    def get_page(page, per_page=page_size):
+        with slots or contextlib.nullcontext():
+            res = client.scene_ids(find_filter=dict(find_filter, page=page, per_page=per_page), scene_filter=scene_filter)
+        res = util.to_dict(res)['findScenes']
+        return res['count'], res['scenes']
+
+    count, items = get_page(1)
+    pages = math.ceil(count / page_size) if page_size > 0 else 1
+    if pages > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(workers, pages - 1), thread_name_prefix='vroom-page') as pool:
+            replies = list(pool.map(get_page, range(2, pages + 1)))
+        counts = {count} | { X[0] for X in replies }
+        items = items + [ X for R in replies for X in R[1] ]
+        if len(counts) > 1 or len(items) != count or len({ X['id'] for X in items }) != count:
+            log.debug(f'Scene IDs changed while paging ({sorted(counts)}), so fetch them at once')
+            count, items = get_page(1, -1)
+    return count, items
+
+def fetch_scenes_by_ids(client, ids: List[str], on_chunk: Callable[[List[Dict[str, Any]]], Any], sizer: Optional[ChunkSizer] = None, workers=4,
+                        stream=False, slots: Optional[threading.Semaphore] = None):
+    """
+    Fetch full scenes in chunks, at most ``workers`` at once, and pass each chunk on as it arrives.
+
+    Chunks arrive in any order. ``on_chunk`` runs in the calling thread, one chunk at a time,
+    so a reply can be released before the rest arrive.
+
+    :param client: The Stash GraphQL client
+    :param ids: Scene IDs to fetch
+    :param on_chunk: Function called with the scenes of each chunk
+    :param sizer: A :class:`ChunkSizer`, which may be shared to keep learning across calls
+    :param workers: Most requests at once
+    :param stream: Whether to decode replies scene by scene, never holding a whole reply body
+    :param slots: Optional semaphore held during each request, shared to bound requests across calls
+    """
+    sizer = sizer or ChunkSizer()
+
+    def get_chunk(chunk):
+        with slots or contextlib.nullcontext():
+            started_at = time.monotonic() # Not counting the wait for a slot
+            if stream:
+                scenes = []
+                res = util.to_dict(client.scenes_by_ids(ids=chunk, stream_path='findScenes.scenes', on_item=scenes.append))
+                scenes += res['findScenes']['scenes'] # Empty, unless the client cannot stream
+            else:
+                scenes = util.to_dict(client.scenes_by_ids(ids=chunk))['findScenes']['scenes']
+            sizer.add_sample(len(chunk), time.monotonic() - started_at)
+        return scenes
+
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='vroom-chunk')
+    pending = set()
+    i = 0
+    try:
+        while i < len(ids) or pending:
+            while i < len(ids) and len(pending) < workers:
+                size = sizer.get_size()
+                pending.add(pool.submit(get_chunk, ids[i:i+size]))
+                i += size
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                on_chunk(future.result())
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,216 @@
+# Copyright 2025 Zyquo Onrel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module runs periodic background work, such as refreshing saved filters from Stash,
+without ever blocking the web requests from HereSphere.
+"""
+
+import time
+import random
+import logging
+import threading
+
+from typing import Any, Callable, Dict, Hashable, Optional
+
+log = logging.getLogger(__name__)
+
+class RefreshScheduler:
+    """
+    Call a refresh function for each registered key on its own interval, in a background thread.
+
+    Each due time has random jitter so many keys do not refresh together. A key whose refresh
+    raises is retried with exponential backoff. When several keys are due, those with the
+    highest priority (by default, the most recently touched) refresh first.
+    """
+
+    def __init__(self, refresh: Callable[[Hashable], Any], interval=600.0, jitter=0.1,
+                 min_backoff=15.0, max_backoff=3600.0, priority: Optional[Callable] = None, clock=time.monotonic):
+        """
+        :param refresh: Function called with a key to refresh it
+        :param interval: Default seconds between refreshes of a key
+        :param jitter: Random fraction added to or subtracted from each interval, e.g. ``0.1`` for ±10%
+        :param min_backoff: Seconds to wait after the first failure of a key, doubling for each further failure
+        :param max_backoff: Maximum seconds to wait after failures
+        :param priority: Optional function called with a key, returning a number; higher refreshes first
+        :param clock: Function returning the current time in seconds
+        """
+        self.refresh = refresh
+        self.interval = interval
+        self.jitter = jitter
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.priority = priority or self._get_touched_at
+        self.clock = clock
+
+        self._lock = threading.Condition()
+        self._entries: Dict[Hashable, dict] = {} # key -> {'interval', 'due', 'failures', 'touched_at', 'refreshed_at'}
+        self._thread = None
+        self._stopping = False
+
+    def add(self, key, interval=None, due=None):
+        """
+        Register a key to refresh.
+
+        :param key: The key passed to the refresh function
+        :param interval: Seconds between refreshes, or ``None`` for the default
+        :param due: Seconds from now until the first refresh, default is one (jittered) interval
+        """
+        with self._lock:
+            entry = {'interval': interval, 'failures': 0, 'touched_at': None, 'refreshed_at': None, 'triggered': False}
+            self._entries[key] = entry
+            entry['due'] = self.clock() + (due if due is not None else self._get_delay(entry))
+            self._lock.notify()
+
+    def remove(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def set_interval(self, key, interval):
+        """
+        Set the refresh interval of a key.
+
+        :param key: A registered key
+        :param interval: Seconds between refreshes; ``None`` restores the default, and ``0`` or less disables refresh
+        """
+        with self._lock:
+            entry = self._entries[key]
+            entry['interval'] = interval
+            entry['due'] = self.clock() + self._get_delay(entry)
+            self._lock.notify()
+
+    def touch(self, key):
+        """Note that a key was just used, so it refreshes before idle keys."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                entry['touched_at'] = self.clock()
+
+    def trigger(self, key, delay=0.0):
+        """
+        Refresh a key soon, regardless of its interval.
+
+        :param key: A registered key
+        :param delay: Seconds from now; an earlier due time is kept
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return
+            entry['due'] = min(entry['due'], self.clock() + delay)
+            entry['triggered'] = True # In case a refresh is running now and finishes with older data.
+            self._lock.notify()
+
+    def get_status(self, key) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            return dict(entry) if entry else None
+
+    def start(self):
+        """Start the background thread."""
+        with self._lock:
+            if self._thread:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='vroom-refresh', daemon=True)
+            self._thread.start()
+        log.debug(f'Refresh scheduler started for {len(self._entries)} keys')
+
+    def stop(self, timeout=None):
+        """Stop the background thread, after any refresh in progress."""
+        with self._lock:
+            thread = self._thread
+            self._stopping = True
+            self._thread = None
+            self._lock.notify()
+        if thread:
+            thread.join(timeout)
+
+    def run_pending(self) -> int:
+        """
+        Refresh every key which is due now, in priority order.
+
+        :return: The number of keys refreshed, including failures
+        """
+        with self._lock:
+            now = self.clock()
+            keys = [ K for K, E in self._entries.items() if E['due'] <= now ]
+        keys.sort(key=lambda K: self.priority(K) or 0, reverse=True)
+
+        for key in keys:
+            self._refresh(key)
+        return len(keys)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._stopping:
+                    wait = self._get_next_due() - self.clock()
+                    if wait <= 0:
+                        break
+                    self._lock.wait(timeout=min(wait, 60.0))
+                if self._stopping:
+                    return
+            self.run_pending()
+
+    def _refresh(self, key):
+        started_at = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return
+            entry['triggered'] = False
+
+        try:
+            self.refresh(key)
+        except Exception as e:
+            with self._lock:
+                entry = self._entries.get(key)
+                if not entry:
+                    return
+                entry['failures'] += 1
+                delay = self._get_delay(entry)
+                entry['due'] = self.clock() + delay
+            log.error(f'Refresh {key!r} failed {entry["failures"]} times, retry in {delay:.0f}s: {e}')
+            return
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return
+            entry['failures'] = 0
+            entry['refreshed_at'] = self.clock()
+            if not entry['triggered']:
+                entry['due'] = entry['refreshed_at'] + self._get_delay(entry)
+        log.debug(f'Refreshed {key!r} in {self.clock() - started_at:.2f}s')
+
+    def _get_delay(self, entry):
+        # Call with the lock held.
+        interval = entry['interval'] if entry['interval'] is not None else self.interval
+        if entry['failures']:
+            delay = min(self.min_backoff * 2 ** (entry['failures'] - 1), self.max_backoff)
+        elif interval is None or interval <= 0:
+            return float('inf')
+        else:
+            delay = interval
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _get_next_due(self):
+        # Call with the lock held.
+        return min([ X['due'] for X in self._entries.values() ], default=float('inf'))
+
+    def _get_touched_at(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry['touched_at'] if entry else None
@@ -0,0 +1,73 @@
+# Copyright 2025 Zyquo Onrel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module saves and loads a compressed snapshot of VRoom's state, such as saved filters
+and scenes, so a restart can serve HereSphere at once while it revalidates with Stash.
+"""
+
+import os
+import gzip
+import logging
+import threading
+
+from typing import Optional
+
+from . import jsoncodec
+
+log = logging.getLogger(__name__)
+
+# Increment when the snapshot content changes incompatibly; older snapshots are ignored.
+SNAPSHOT_VERSION = 1
+
+def save_snapshot(path, data: dict):
+    """
+    Write a snapshot atomically, so a crash never leaves a partial file.
+
+    :param path: The snapshot file path, conventionally ending in ``.json.gz``
+    :param data: JSON-serializable content
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.{threading.get_ident()}.tmp'
+    body = jsoncodec.dumps({'version': SNAPSHOT_VERSION, 'data': data})
+    try:
+        with gzip.open(tmp_path, 'wb', compresslevel=5) as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    log.debug(f'Saved snapshot {path}: {len(body)} bytes uncompressed')
+
+def load_snapshot(path) -> Optional[dict]:
+    """
+    Read a snapshot written by :func:`save_snapshot`.
+
+    :param path: The snapshot file path
+    :return: The snapshot content, or ``None`` if it is missing, unreadable, or from another version
+    """
+    try:
+        with gzip.open(path, 'rb') as f:
+            snapshot = jsoncodec.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        log.warning(f'Ignore unreadable snapshot {path}: {e}')
+        return None
+
+    if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+        log.info(f'Ignore snapshot {path} from another version')
+        return None
+    return snapshot['data']
@@ -38,6 +38,9 @@ STASH_IP = None
 STASH_HOME = os.environ.get('STASH_HOME', os.path.expanduser('~/.stash'))
 STASH_API_KEY = None
 
+# Return Stash API results as plain dicts, skipping their pydantic models, which is faster for large replies.
+STASH_RAW = bool(int(os.environ.get('VROOM_STASH_RAW') or 0))
+
 API = None
 
 def get_api_key(default=None):
@@ -140,12 +143,12 @@ def init(stash_url='http://127.0.0.1:9999/graphql', stash_headers=None, validate
         api_key = get_api_key()
         stash_headers = {'ApiKey': api_key}
 
-    stashapi = stash_client.Stash(stash_url, headers=stash_headers)
+    stashapi = stash_client.Stash(stash_url, headers=stash_headers, raw=STASH_RAW)
 
     if validate:
         try:
             res = stashapi.version()
-            res = res.model_dump()
+            res = util.to_dict(res)
         except stash_client.exceptions.GraphQLClientHttpError as e:
             log.error(f'ERROR: Cannot connect to Stash API at {origin()}: {e}')
             raise e
@@ -158,7 +161,7 @@ def init(stash_url='http://127.0.0.1:9999/graphql', stash_headers=None, validate
 
         try:
             res = stashapi.configuration()
-            res = res.model_dump()
+            res = util.to_dict(res)
         except stash_client.exceptions.GraphQLClientHttpError as e:
             log.error(f'ERROR: Cannot connect to Stash API at {origin()}: {e}')
             raise e
@@ -44,6 +44,11 @@ from .exceptions import (
     GraphQLClientInvalidResponseError,
 )
 from .fragments import (
+    GraphStudio,
+    GraphStudioParentStudio,
+    GraphStudioTags,
+    GraphTag,
+    GraphTagParents,
     Img,
     ImgPaths,
     ImgTags,
@@ -61,18 +66,8 @@ from .fragments import (
     SceneSceneMarkers,
     SceneSceneMarkersPrimaryTag,
     SceneSceneMarkersTags,
-    SceneSceneMarkersTagsParents,
-    SceneSceneMarkersTagsParentsParents,
-    SceneSceneMarkersTagsParentsParentsParents,
     SceneStudio,
-    SceneStudioParentStudio,
-    SceneStudioParentStudioParentStudio,
-    SceneStudioParentStudioParentStudioParentStudio,
-    SceneStudioTags,
     SceneTags,
-    SceneTagsParents,
-    SceneTagsParentsParents,
-    SceneTagsParentsParentsParents,
 )
 from .images_by_ids import (
     ImagesByIds,
@@ -242,6 +237,27 @@ from .save_config import SaveConfig
 from .saved_filters import SavedFilters, SavedFiltersFindSavedFilters
 from .scene_ids import SceneIds, SceneIdsFindScenes, SceneIdsFindScenesScenes
 from .scenes import Scenes, ScenesFindScenes, ScenesFindScenesScenes
+from .scenes_by_ids import (
+    ScenesByIds,
+    ScenesByIdsFindScenes,
+    ScenesByIdsFindScenesScenes,
+)
+from .tags_and_studios import (
+    TagsAndStudios,
+    TagsAndStudiosFindStudios,
+    TagsAndStudiosFindStudiosStudios,
+    TagsAndStudiosFindTags,
+    TagsAndStudiosFindTagsTags,
+)
+from .tags_and_studios_since import (
+    TagsAndStudiosSince,
+    TagsAndStudiosSinceFindStudios,
+    TagsAndStudiosSinceFindStudiosStudios,
+    TagsAndStudiosSinceFindTags,
+    TagsAndStudiosSinceFindTagsTags,
+    TagsAndStudiosSinceStudioCount,
+    TagsAndStudiosSinceTagCount,
+)
 from .tags_by_regex import TagsByRegex, TagsByRegexFindTags, TagsByRegexFindTagsTags
 from .version import Version, VersionVersion
 
@@ -314,6 +330,11 @@ __all__ = [
     "GraphQLClientGraphQLMultiError",
     "GraphQLClientHttpError",
     "GraphQLClientInvalidResponseError",
+    "GraphStudio",
+    "GraphStudioParentStudio",
+    "GraphStudioTags",
+    "GraphTag",
+    "GraphTagParents",
     "GroupCreateInput",
     "GroupDescriptionInput",
     "GroupDestroyInput",
@@ -415,20 +436,13 @@ __all__ = [
     "SceneSceneMarkers",
     "SceneSceneMarkersPrimaryTag",
     "SceneSceneMarkersTags",
-    "SceneSceneMarkersTagsParents",
-    "SceneSceneMarkersTagsParentsParents",
-    "SceneSceneMarkersTagsParentsParentsParents",
     "SceneStudio",
-    "SceneStudioParentStudio",
-    "SceneStudioParentStudioParentStudio",
-    "SceneStudioParentStudioParentStudioParentStudio",
-    "SceneStudioTags",
     "SceneTags",
-    "SceneTagsParents",
-    "SceneTagsParentsParents",
-    "SceneTagsParentsParentsParents",
     "SceneUpdateInput",
     "Scenes",
+    "ScenesByIds",
+    "ScenesByIdsFindScenes",
+    "ScenesByIdsFindScenesScenes",
     "ScenesDestroyInput",
     "ScenesFindScenes",
     "ScenesFindScenesScenes",
@@ -475,6 +489,18 @@ __all__ = [
     "TagDestroyInput",
     "TagFilterType",
     "TagUpdateInput",
+    "TagsAndStudios",
+    "TagsAndStudiosFindStudios",
+    "TagsAndStudiosFindStudiosStudios",
+    "TagsAndStudiosFindTags",
+    "TagsAndStudiosFindTagsTags",
+    "TagsAndStudiosSince",
+    "TagsAndStudiosSinceFindStudios",
+    "TagsAndStudiosSinceFindStudiosStudios",
+    "TagsAndStudiosSinceFindTags",
+    "TagsAndStudiosSinceFindTagsTags",
+    "TagsAndStudiosSinceStudioCount",
+    "TagsAndStudiosSinceTagCount",
     "TagsByRegex",
     "TagsByRegexFindTags",
     "TagsByRegexFindTagsTags",
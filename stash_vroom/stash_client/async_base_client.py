@@ -1,7 +1,9 @@
 # Generated by ariadne-codegen
 
+# Copied into stash_vroom/stash_client by ariadne-codegen (see files_to_include in pyproject.toml).
+# Edit this file, not the copy.
+
 import enum
-import json
 from typing import IO, Any, AsyncIterator, Dict, List, Optional, Tuple, TypeVar, cast
 from uuid import uuid4
 
@@ -9,6 +11,7 @@ import httpx
 from pydantic import BaseModel
 from pydantic_core import to_jsonable_python
 
+from .. import jsoncodec
 from .base_model import UNSET, Upload
 from .exceptions import (
     GraphQLClientGraphQLMultiError,
@@ -125,7 +128,7 @@ class AsyncBaseClient:
             )
 
         try:
-            response_json = response.json()
+            response_json = jsoncodec.loads(response.content)
         except ValueError as exc:
             raise GraphQLClientInvalidResponseError(response=response) from exc
 
@@ -263,7 +266,7 @@ class AsyncBaseClient:
         **kwargs: Any,
     ) -> httpx.Response:
         data = {
-            "operations": json.dumps(
+            "operations": jsoncodec.dumps(
                 {
                     "query": query,
                     "operationName": operation_name,
@@ -271,7 +274,7 @@ class AsyncBaseClient:
                 },
                 default=to_jsonable_python,
             ),
-            "map": json.dumps(files_map, default=to_jsonable_python),
+            "map": jsoncodec.dumps(files_map, default=to_jsonable_python),
         }
 
         return await self.http_client.post(
@@ -293,7 +296,7 @@ class AsyncBaseClient:
 
         return await self.http_client.post(
             url=self.url,
-            content=json.dumps(
+            content=jsoncodec.dumps(
                 {
                     "query": query,
                     "operationName": operation_name,
@@ -310,7 +313,7 @@ class AsyncBaseClient:
         }
         if self.ws_connection_init_payload:
             payload["payload"] = self.ws_connection_init_payload
-        await websocket.send(json.dumps(payload))
+        await websocket.send(jsoncodec.dumps(payload).decode("utf-8"))
 
     async def _send_subscribe(
         self,
@@ -329,7 +332,7 @@ class AsyncBaseClient:
             payload["payload"]["variables"] = self._convert_dict_to_json_serializable(
                 variables
             )
-        await websocket.send(json.dumps(payload))
+        await websocket.send(jsoncodec.dumps(payload).decode("utf-8"))
 
     async def _handle_ws_message(
         self,
@@ -338,8 +341,8 @@ class AsyncBaseClient:
         expected_type: Optional[GraphQLTransportWSMessageType] = None,
     ) -> Optional[Dict[str, Any]]:
         try:
-            message_dict = json.loads(message)
-        except json.JSONDecodeError as exc:
+            message_dict = jsoncodec.loads(message)
+        except ValueError as exc:
             raise GraphQLClientInvalidMessageFormat(message=message) from exc
 
         type_ = message_dict.get("type")
@@ -362,7 +365,9 @@ class AsyncBaseClient:
             await websocket.close()
         elif type_ == GraphQLTransportWSMessageType.PING:
             await websocket.send(
-                json.dumps({"type": GraphQLTransportWSMessageType.PONG.value})
+                jsoncodec.dumps(
+                    {"type": GraphQLTransportWSMessageType.PONG.value}
+                ).decode("utf-8")
             )
         elif type_ == GraphQLTransportWSMessageType.ERROR:
             raise GraphQLClientGraphQLMultiError.from_errors_dicts(
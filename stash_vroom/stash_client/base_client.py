@@ -1,12 +1,29 @@
 # Generated by ariadne-codegen
 
-import json
-from typing import IO, Any, Dict, List, Optional, Tuple, TypeVar, cast
+# Copied into stash_vroom/stash_client by ariadne-codegen (see base_client_file_path in pyproject.toml).
+# Edit this file, not the copy.
+
+import typing
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
 import httpx
 from pydantic import BaseModel
 from pydantic_core import to_jsonable_python
 
+from .. import jsoncodec, jsonstream
 from .base_model import UNSET, Upload
 from .exceptions import (
     GraphQLClientGraphQLMultiError,
@@ -15,6 +32,7 @@ from .exceptions import (
 )
 
 Self = TypeVar("Self", bound="BaseClient")
+Model = TypeVar("Model", bound=BaseModel)
 
 
 class BaseClient:
@@ -23,9 +41,11 @@ class BaseClient:
         url: str = "",
         headers: Optional[Dict[str, str]] = None,
         http_client: Optional[httpx.Client] = None,
+        raw: bool = False,
     ) -> None:
         self.url = url
         self.headers = headers
+        self.raw = raw
 
         self.http_client = http_client if http_client else httpx.Client(headers=headers)
 
@@ -47,8 +67,28 @@ class BaseClient:
         variables: Optional[Dict[str, Any]] = None,
         **kwargs: Any,
     ) -> httpx.Response:
+        """
+        Send a query, and return the response.
+
+        To stream a large list instead of holding it all, pass ``on_item``, a function
+        called with each item as it is decoded, and ``stream_path``, the dotted path of
+        the list within the data, e.g. ``"findScenes.scenes"``. The items are always
+        plain dicts. The returned response then has that list empty.
+        """
+        on_item = kwargs.pop("on_item", None)
+        stream_path = kwargs.pop("stream_path", None)
         processed_variables, files, files_map = self._process_variables(variables)
 
+        if on_item is not None and stream_path:
+            return self._execute_stream(
+                query=query,
+                operation_name=operation_name,
+                variables=processed_variables,
+                path=["data", *stream_path.split(".")],
+                on_item=on_item,
+                **kwargs,
+            )
+
         if files and files_map:
             return self._execute_multipart(
                 query=query,
@@ -73,7 +113,7 @@ class BaseClient:
             )
 
         try:
-            response_json = response.json()
+            response_json = jsoncodec.loads(response.content)
         except ValueError as exc:
             raise GraphQLClientInvalidResponseError(response=response) from exc
 
@@ -92,6 +132,27 @@ class BaseClient:
 
         return cast(Dict[str, Any], data)
 
+    def get_result(
+        self,
+        model: Type[Model],
+        data: Dict[str, Any],
+        response: httpx.Response,
+        raw: Optional[bool] = None,
+    ) -> Union[Model, Dict[str, Any]]:
+        """
+        Validate response data into its model, or in raw mode, return the data as is.
+
+        Raw mode skips parsing into nested models, most of the cost of large responses.
+        It only checks that required fields are present, following the first list items.
+
+        :param raw: Raw mode for this call; ``None`` uses the client's
+        """
+        if not (self.raw if raw is None else raw):
+            return model.model_validate(data)
+        if not _is_shaped_like(model, data):
+            raise GraphQLClientInvalidResponseError(response=response)
+        return data
+
     def _process_variables(
         self, variables: Optional[Dict[str, Any]]
     ) -> Tuple[
@@ -171,7 +232,7 @@ class BaseClient:
         **kwargs: Any,
     ) -> httpx.Response:
         data = {
-            "operations": json.dumps(
+            "operations": jsoncodec.dumps(
                 {
                     "query": query,
                     "operationName": operation_name,
@@ -179,7 +240,7 @@ class BaseClient:
                 },
                 default=to_jsonable_python,
             ),
-            "map": json.dumps(files_map, default=to_jsonable_python),
+            "map": jsoncodec.dumps(files_map, default=to_jsonable_python),
         }
 
         return self.http_client.post(url=self.url, data=data, files=files, **kwargs)
@@ -199,7 +260,7 @@ class BaseClient:
 
         return self.http_client.post(
             url=self.url,
-            content=json.dumps(
+            content=jsoncodec.dumps(
                 {
                     "query": query,
                     "operationName": operation_name,
@@ -209,3 +270,90 @@ class BaseClient:
             ),
             **merged_kwargs,
         )
+
+
+    def _execute_stream(
+        self,
+        query: str,
+        operation_name: Optional[str],
+        variables: Dict[str, Any],
+        path: List[str],
+        on_item: Callable[[Any], Any],
+        **kwargs: Any,
+    ) -> httpx.Response:
+        headers: Dict[str, str] = {"Content-Type": "application/json"}
+        headers.update(kwargs.get("headers", {}))
+
+        merged_kwargs: Dict[str, Any] = kwargs.copy()
+        merged_kwargs["headers"] = headers
+
+        content = jsoncodec.dumps(
+            {
+                "query": query,
+                "operationName": operation_name,
+                "variables": variables,
+            },
+            default=to_jsonable_python,
+        )
+        with self.http_client.stream(
+            "POST", url=self.url, content=content, **merged_kwargs
+        ) as response:
+            if not response.is_success:
+                response.read()
+                return response
+
+            envelope: Dict[str, Any] = {}
+            streamed_bytes = 0
+
+            def chunks() -> Iterator[bytes]:
+                nonlocal streamed_bytes
+                for chunk in response.iter_bytes():
+                    streamed_bytes += len(chunk)
+                    yield chunk
+
+            try:
+                items = jsonstream.iter_items(chunks(), path, envelope)
+                for item in items:
+                    on_item(item)
+            except ValueError as exc:
+                raise GraphQLClientInvalidResponseError(response=response) from exc
+
+        # The body is gone, so keep its size for anyone measuring replies.
+        return httpx.Response(
+            response.status_code,
+            json=envelope,
+            request=response.request,
+            extensions={"streamed_bytes": streamed_bytes},
+        )
+
+def _is_shaped_like(model: Type[BaseModel], data: Any) -> bool:
+    if not isinstance(data, dict):
+        return False
+    for name, field in model.model_fields.items():
+        key = field.alias or name
+        if key not in data:
+            if field.is_required():
+                return False
+            continue
+        value = data[key]
+        while isinstance(value, list):
+            if not value:
+                break
+            value = value[0]
+        else:
+            sub_model = _get_model(field.annotation)
+            if sub_model and value is not None:
+                if not _is_shaped_like(sub_model, value):
+                    return False
+    return True
+
+
+def _get_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    # The model within an annotation such as Optional[List["Model"]], if any.
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in typing.get_args(annotation):
+        sub_model = _get_model(arg)
+        if sub_model:
+            return sub_model
+    return None
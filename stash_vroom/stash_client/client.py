@@ -15,6 +15,9 @@ from .save_config import SaveConfig
 from .saved_filters import SavedFilters
 from .scene_ids import SceneIds
 from .scenes import Scenes
+from .scenes_by_ids import ScenesByIds
+from .tags_and_studios import TagsAndStudios
+from .tags_and_studios_since import TagsAndStudiosSince
 from .tags_by_regex import TagsByRegex
 from .version import Version
 
@@ -24,7 +27,9 @@ def gql(q: str) -> str:
 
 
 class Stash(BaseClient):
-    def version(self, **kwargs: Any) -> Version:
+    def version(
+        self, raw: Optional[bool] = None, **kwargs: Any
+    ) -> Union[Version, Dict[str, Any]]:
         query = gql(
             """
             query Version {
@@ -41,9 +46,11 @@ class Stash(BaseClient):
             query=query, operation_name="Version", variables=variables, **kwargs
         )
         data = self.get_data(response)
-        return Version.model_validate(data)
+        return self.get_result(Version, data, response, raw)
 
-    def configuration(self, **kwargs: Any) -> Configuration:
+    def configuration(
+        self, raw: Optional[bool] = None, **kwargs: Any
+    ) -> Union[Configuration, Dict[str, Any]]:
         query = gql(
             """
             query Configuration {
@@ -68,9 +75,11 @@ class Stash(BaseClient):
             query=query, operation_name="Configuration", variables=variables, **kwargs
         )
         data = self.get_data(response)
-        return Configuration.model_validate(data)
+        return self.get_result(Configuration, data, response, raw)
 
-    def save_config(self, plugin_id: str, input: Any, **kwargs: Any) -> SaveConfig:
+    def save_config(
+        self, plugin_id: str, input: Any, raw: Optional[bool] = None, **kwargs: Any
+    ) -> Union[SaveConfig, Dict[str, Any]]:
         query = gql(
             """
             mutation SaveConfig($plugin_id: ID!, $input: Map!) {
@@ -83,9 +92,11 @@ class Stash(BaseClient):
             query=query, operation_name="SaveConfig", variables=variables, **kwargs
         )
         data = self.get_data(response)
-        return SaveConfig.model_validate(data)
+        return self.get_result(SaveConfig, data, response, raw)
 
-    def saved_filters(self, mode: FilterMode, **kwargs: Any) -> SavedFilters:
+    def saved_filters(
+        self, mode: FilterMode, raw: Optional[bool] = None, **kwargs: Any
+    ) -> Union[SavedFilters, Dict[str, Any]]:
         query = gql(
             """
             query SavedFilters($mode: FilterMode!) {
@@ -115,11 +126,15 @@ class Stash(BaseClient):
             query=query, operation_name="SavedFilters", variables=variables, **kwargs
         )
         data = self.get_data(response)
-        return SavedFilters.model_validate(data)
+        return self.get_result(SavedFilters, data, response, raw)
 
     def scenes(
-        self, find_filter: FindFilterType, scene_filter: SceneFilterType, **kwargs: Any
-    ) -> Scenes:
+        self,
+        find_filter: FindFilterType,
+        scene_filter: SceneFilterType,
+        raw: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> Union[Scenes, Dict[str, Any]]:
         query = gql(
             """
             query Scenes($find_filter: FindFilterType!, $scene_filter: SceneFilterType!) {
@@ -141,23 +156,11 @@ class Stash(BaseClient):
               rating100
               date
               created_at
+              updated_at
               o_counter
               play_count
               studio {
-                name
-                tags {
-                  id
-                  name
-                }
-                parent_studio {
-                  name
-                  parent_studio {
-                    name
-                    parent_studio {
-                      name
-                    }
-                  }
-                }
+                id
               }
               paths {
                 stream
@@ -167,6 +170,7 @@ class Stash(BaseClient):
               files {
                 format
                 basename
+                path
                 size
                 width
                 height
@@ -184,6 +188,8 @@ class Stash(BaseClient):
                 favorite
                 ethnicity
                 fake_tits
+                image_path
+                updated_at
                 tags {
                   name
                 }
@@ -192,40 +198,14 @@ class Stash(BaseClient):
                 id
                 seconds
                 primary_tag {
-                  name
+                  id
                 }
                 tags {
                   id
-                  name
-                  parents {
-                    id
-                    name
-                    parents {
-                      id
-                      name
-                      parents {
-                        id
-                        name
-                      }
-                    }
-                  }
                 }
               }
               tags {
                 id
-                name
-                parents {
-                  id
-                  name
-                  parents {
-                    id
-                    name
-                    parents {
-                      id
-                      name
-                    }
-                  }
-                }
               }
             }
             """
@@ -238,11 +218,15 @@ class Stash(BaseClient):
             query=query, operation_name="Scenes", variables=variables, **kwargs
         )
         data = self.get_data(response)
-        return Scenes.model_validate(data)
+        return self.get_result(Scenes, data, response, raw)
 
     def scene_ids(
-        self, find_filter: FindFilterType, scene_filter: SceneFilterType, **kwargs: Any
-    ) -> SceneIds:
+        self,
+        find_filter: FindFilterType,
+        scene_filter: SceneFilterType,
+        raw: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> Union[SceneIds, Dict[str, Any]]:
         query = gql(
             """
             query SceneIds($find_filter: FindFilterType!, $scene_filter: SceneFilterType!) {
@@ -252,6 +236,7 @@ class Stash(BaseClient):
                 filesize
                 scenes {
                   id
+                  updated_at
                 }
               }
             }
@@ -265,11 +250,100 @@ class Stash(BaseClient):
             query=query, operation_name="SceneIds", variables=variables, **kwargs
         )
         data = self.get_data(response)
-        return SceneIds.model_validate(data)
+        return self.get_result(SceneIds, data, response, raw)
+
+    def scenes_by_ids(
+        self,
+        ids: Union[Optional[List[str]], UnsetType] = UNSET,
+        raw: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> Union[ScenesByIds, Dict[str, Any]]:
+        query = gql(
+            """
+            query ScenesByIds($ids: [ID!]) {
+              findScenes(ids: $ids, filter: {per_page: -1}) {
+                count
+                scenes {
+                  ...Scene
+                }
+              }
+            }
+
+            fragment Scene on Scene {
+              id
+              urls
+              title
+              details
+              rating100
+              date
+              created_at
+              updated_at
+              o_counter
+              play_count
+              studio {
+                id
+              }
+              paths {
+                stream
+                screenshot
+                preview
+              }
+              files {
+                format
+                basename
+                path
+                size
+                width
+                height
+                duration
+                fingerprints {
+                  type
+                  value
+                }
+              }
+              performers {
+                id
+                name
+                gender
+                country
+                favorite
+                ethnicity
+                fake_tits
+                image_path
+                updated_at
+                tags {
+                  name
+                }
+              }
+              scene_markers {
+                id
+                seconds
+                primary_tag {
+                  id
+                }
+                tags {
+                  id
+                }
+              }
+              tags {
+                id
+              }
+            }
+            """
+        )
+        variables: Dict[str, object] = {"ids": ids}
+        response = self.execute(
+            query=query, operation_name="ScenesByIds", variables=variables, **kwargs
+        )
+        data = self.get_data(response)
+        return self.get_result(ScenesByIds, data, response, raw)
 
     def images_by_ids(
-        self, ids: Union[Optional[List[str]], UnsetType] = UNSET, **kwargs: Any
-    ) -> ImagesByIds:
+        self,
+        ids: Union[Optional[List[str]], UnsetType] = UNSET,
+        raw: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> Union[ImagesByIds, Dict[str, Any]]:
         query = gql(
             """
             query ImagesByIds($ids: [ID!]) {
@@ -315,9 +389,11 @@ class Stash(BaseClient):
             query=query, operation_name="ImagesByIds", variables=variables, **kwargs
         )
         data = self.get_data(response)
-        return ImagesByIds.model_validate(data)
+        return self.get_result(ImagesByIds, data, response, raw)
 
-    def images_by_search(self, q: str, **kwargs: Any) -> ImagesBySearch:
+    def images_by_search(
+        self, q: str, raw: Optional[bool] = None, **kwargs: Any
+    ) -> Union[ImagesBySearch, Dict[str, Any]]:
         query = gql(
             """
             query ImagesBySearch($q: String!) {
@@ -363,11 +439,14 @@ class Stash(BaseClient):
             query=query, operation_name="ImagesBySearch", variables=variables, **kwargs
         )
         data = self.get_data(response)
-        return ImagesBySearch.model_validate(data)
+        return self.get_result(ImagesBySearch, data, response, raw)
 
     def images_by_tag_ids(
-        self, ids: Union[Optional[List[str]], UnsetType] = UNSET, **kwargs: Any
-    ) -> ImagesByTagIds:
+        self,
+        ids: Union[Optional[List[str]], UnsetType] = UNSET,
+        raw: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> Union[ImagesByTagIds, Dict[str, Any]]:
         query = gql(
             """
             query ImagesByTagIds($ids: [ID!]) {
@@ -413,9 +492,11 @@ class Stash(BaseClient):
             query=query, operation_name="ImagesByTagIds", variables=variables, **kwargs
         )
         data = self.get_data(response)
-        return ImagesByTagIds.model_validate(data)
+        return self.get_result(ImagesByTagIds, data, response, raw)
 
-    def tags_by_regex(self, regex: str, **kwargs: Any) -> TagsByRegex:
+    def tags_by_regex(
+        self, regex: str, raw: Optional[bool] = None, **kwargs: Any
+    ) -> Union[TagsByRegex, Dict[str, Any]]:
         query = gql(
             """
             query TagsByRegex($regex: String!) {
@@ -436,4 +517,117 @@ class Stash(BaseClient):
             query=query, operation_name="TagsByRegex", variables=variables, **kwargs
         )
         data = self.get_data(response)
-        return TagsByRegex.model_validate(data)
+        return self.get_result(TagsByRegex, data, response, raw)
+
+    def tags_and_studios(
+        self, raw: Optional[bool] = None, **kwargs: Any
+    ) -> Union[TagsAndStudios, Dict[str, Any]]:
+        query = gql(
+            """
+            query TagsAndStudios {
+              findTags(filter: {per_page: -1}) {
+                count
+                tags {
+                  ...GraphTag
+                }
+              }
+              findStudios(filter: {per_page: -1}) {
+                count
+                studios {
+                  ...GraphStudio
+                }
+              }
+            }
+
+            fragment GraphStudio on Studio {
+              id
+              name
+              updated_at
+              parent_studio {
+                id
+              }
+              tags {
+                id
+              }
+            }
+
+            fragment GraphTag on Tag {
+              id
+              name
+              updated_at
+              parents {
+                id
+              }
+            }
+            """
+        )
+        variables: Dict[str, object] = {}
+        response = self.execute(
+            query=query, operation_name="TagsAndStudios", variables=variables, **kwargs
+        )
+        data = self.get_data(response)
+        return self.get_result(TagsAndStudios, data, response, raw)
+
+    def tags_and_studios_since(
+        self, since: str, raw: Optional[bool] = None, **kwargs: Any
+    ) -> Union[TagsAndStudiosSince, Dict[str, Any]]:
+        query = gql(
+            """
+            query TagsAndStudiosSince($since: String!) {
+              findTags(
+                tag_filter: {updated_at: {value: $since, modifier: GREATER_THAN}}
+                filter: {per_page: -1}
+              ) {
+                count
+                tags {
+                  ...GraphTag
+                }
+              }
+              tagCount: findTags {
+                count
+              }
+              findStudios(
+                studio_filter: {updated_at: {value: $since, modifier: GREATER_THAN}}
+                filter: {per_page: -1}
+              ) {
+                count
+                studios {
+                  ...GraphStudio
+                }
+              }
+              studioCount: findStudios {
+                count
+              }
+            }
+
+            fragment GraphStudio on Studio {
+              id
+              name
+              updated_at
+              parent_studio {
+                id
+              }
+              tags {
+                id
+              }
+            }
+
+            fragment GraphTag on Tag {
+              id
+              name
+              updated_at
+              parents {
+                id
+              }
+            }
+            """
+        )
+        variables: Dict[str, object] = {"since": since}
+        response = self.execute(
+            query=query,
+            operation_name="TagsAndStudiosSince",
+            variables=variables,
+            **kwargs
+        )
+        data = self.get_data(response)
+        return self.get_result(TagsAndStudiosSince, data, response, raw)
@@ -9,6 +9,33 @@ from .base_model import BaseModel
 from .enums import FilterMode, GenderEnum, SortDirectionEnum
 
 
+class GraphStudio(BaseModel):
+    id: str
+    name: str
+    updated_at: Any
+    parent_studio: Optional["GraphStudioParentStudio"]
+    tags: List["GraphStudioTags"]
+
+
+class GraphStudioParentStudio(BaseModel):
+    id: str
+
+
+class GraphStudioTags(BaseModel):
+    id: str
+
+
+class GraphTag(BaseModel):
+    id: str
+    name: str
+    updated_at: Any
+    parents: List["GraphTagParents"]
+
+
+class GraphTagParents(BaseModel):
+    id: str
+
+
 class Img(BaseModel):
     id: str
     urls: List[str]
@@ -78,6 +105,7 @@ class Scene(BaseModel):
     rating100: Optional[int]
     date: Optional[str]
     created_at: Any
+    updated_at: Any
     o_counter: Optional[int]
     play_count: Optional[int]
     studio: Optional["SceneStudio"]
@@ -89,28 +117,7 @@ class Scene(BaseModel):
 
 
 class SceneStudio(BaseModel):
-    name: str
-    tags: List["SceneStudioTags"]
-    parent_studio: Optional["SceneStudioParentStudio"]
-
-
-class SceneStudioTags(BaseModel):
     id: str
-    name: str
-
-
-class SceneStudioParentStudio(BaseModel):
-    name: str
-    parent_studio: Optional["SceneStudioParentStudioParentStudio"]
-
-
-class SceneStudioParentStudioParentStudio(BaseModel):
-    name: str
-    parent_studio: Optional["SceneStudioParentStudioParentStudioParentStudio"]
-
-
-class SceneStudioParentStudioParentStudioParentStudio(BaseModel):
-    name: str
 
 
 class ScenePaths(BaseModel):
@@ -122,6 +129,7 @@ class ScenePaths(BaseModel):
 class SceneFiles(BaseModel):
     format: str
     basename: str
+    path: str
     size: Any
     width: int
     height: int
@@ -142,6 +150,8 @@ class ScenePerformers(BaseModel):
     favorite: bool
     ethnicity: Optional[str]
     fake_tits: Optional[str]
+    image_path: Optional[str]
+    updated_at: Any
     tags: List["ScenePerformersTags"]
 
 
@@ -157,55 +167,19 @@ class SceneSceneMarkers(BaseModel):
 
 
 class SceneSceneMarkersPrimaryTag(BaseModel):
-    name: str
-
-
-class SceneSceneMarkersTags(BaseModel):
     id: str
-    name: str
-    parents: List["SceneSceneMarkersTagsParents"]
 
 
-class SceneSceneMarkersTagsParents(BaseModel):
-    id: str
-    name: str
-    parents: List["SceneSceneMarkersTagsParentsParents"]
-
-
-class SceneSceneMarkersTagsParentsParents(BaseModel):
+class SceneSceneMarkersTags(BaseModel):
     id: str
-    name: str
-    parents: List["SceneSceneMarkersTagsParentsParentsParents"]
-
-
-class SceneSceneMarkersTagsParentsParentsParents(BaseModel):
-    id: str
-    name: str
 
 
 class SceneTags(BaseModel):
     id: str
-    name: str
-    parents: List["SceneTagsParents"]
-
-
-class SceneTagsParents(BaseModel):
-    id: str
-    name: str
-    parents: List["SceneTagsParentsParents"]
-
-
-class SceneTagsParentsParents(BaseModel):
-    id: str
-    name: str
-    parents: List["SceneTagsParentsParentsParents"]
-
-
-class SceneTagsParentsParentsParents(BaseModel):
-    id: str
-    name: str
 
 
+GraphStudio.model_rebuild()
+GraphTag.model_rebuild()
 Img.model_rebuild()
 SavedFilterData.model_rebuild()
 Scene.model_rebuild()
@@ -1,7 +1,7 @@
 # Generated by ariadne-codegen
 # Source: stash_vroom/queries.graphql
 
-from typing import List
+from typing import Any, List
 
 from .base_model import BaseModel
 
@@ -19,6 +19,7 @@ class SceneIdsFindScenes(BaseModel):
 
 class SceneIdsFindScenesScenes(BaseModel):
     id: str
+    updated_at: Any
 
 
 SceneIds.model_rebuild()
@@ -0,0 +1,24 @@
+# Generated by ariadne-codegen
+# Source: stash_vroom/queries.graphql
+
+from typing import List
+
+from .base_model import BaseModel
+from .fragments import Scene
+
+
+class ScenesByIds(BaseModel):
+    findScenes: "ScenesByIdsFindScenes"
+
+
+class ScenesByIdsFindScenes(BaseModel):
+    count: int
+    scenes: List["ScenesByIdsFindScenesScenes"]
+
+
+class ScenesByIdsFindScenesScenes(Scene):
+    pass
+
+
+ScenesByIds.model_rebuild()
+ScenesByIdsFindScenes.model_rebuild()
@@ -0,0 +1,35 @@
+# Generated by ariadne-codegen
+# Source: stash_vroom/queries.graphql
+
+from typing import List
+
+from .base_model import BaseModel
+from .fragments import GraphStudio, GraphTag
+
+
+class TagsAndStudios(BaseModel):
+    findTags: "TagsAndStudiosFindTags"
+    findStudios: "TagsAndStudiosFindStudios"
+
+
+class TagsAndStudiosFindTags(BaseModel):
+    count: int
+    tags: List["TagsAndStudiosFindTagsTags"]
+
+
+class TagsAndStudiosFindTagsTags(GraphTag):
+    pass
+
+
+class TagsAndStudiosFindStudios(BaseModel):
+    count: int
+    studios: List["TagsAndStudiosFindStudiosStudios"]
+
+
+class TagsAndStudiosFindStudiosStudios(GraphStudio):
+    pass
+
+
+TagsAndStudios.model_rebuild()
+TagsAndStudiosFindTags.model_rebuild()
+TagsAndStudiosFindStudios.model_rebuild()
@@ -0,0 +1,45 @@
+# Generated by ariadne-codegen
+# Source: stash_vroom/queries.graphql
+
+from typing import List
+
+from .base_model import BaseModel
+from .fragments import GraphStudio, GraphTag
+
+
+class TagsAndStudiosSince(BaseModel):
+    findTags: "TagsAndStudiosSinceFindTags"
+    tagCount: "TagsAndStudiosSinceTagCount"
+    findStudios: "TagsAndStudiosSinceFindStudios"
+    studioCount: "TagsAndStudiosSinceStudioCount"
+
+
+class TagsAndStudiosSinceFindTags(BaseModel):
+    count: int
+    tags: List["TagsAndStudiosSinceFindTagsTags"]
+
+
+class TagsAndStudiosSinceFindTagsTags(GraphTag):
+    pass
+
+
+class TagsAndStudiosSinceTagCount(BaseModel):
+    count: int
+
+
+class TagsAndStudiosSinceFindStudios(BaseModel):
+    count: int
+    studios: List["TagsAndStudiosSinceFindStudiosStudios"]
+
+
+class TagsAndStudiosSinceFindStudiosStudios(GraphStudio):
+    pass
+
+
+class TagsAndStudiosSinceStudioCount(BaseModel):
+    count: int
+
+
+TagsAndStudiosSince.model_rebuild()
+TagsAndStudiosSinceFindTags.model_rebuild()
+TagsAndStudiosSinceFindStudios.model_rebuild()
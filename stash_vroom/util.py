@@ -51,6 +51,27 @@ def get_vid_re(extensions=('mp4', 'm4v', 'mkv', 'avi', 'webm', 'flv', 'wmv', 'mo
     extensions = '|'.join(extensions)
     return r'\.(' + extensions + r')$'
 
+def split_comma(value):
+    """
+    Split a comma-separated string into a list of its stripped, non-empty parts.
+
+    :param value: A string such as ``"up, up,down"``, or a list which is returned as-is
+    :return: A list of strings, e.g. ``['up', 'up', 'down']``
+    :rtype: list
+    """
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [ X.strip() for X in (value or '').split(',') if X.strip() ]
+
+def to_dict(res):
+    """
+    Return a Stash client result as a dict, whether the client returned it raw or as a model.
+
+    :param res: A result of a :class:`~stash_vroom.stash_client.Stash` method
+    :rtype: dict
+    """
+    return res if isinstance(res, dict) else res.model_dump()
+
 def get_ffmpeg_wrapper_path():
     # Return the path to the ffmpeg-vroom CLI script which is defined in pyproject.toml. This function can import any packages it needs to ascertain the script location.
     raise NotImplementedError(f'Getting the path to the entrypoint turned out to be hard') # TODO I think just the sys.executable switched to ffmpeg-vroom should be OK
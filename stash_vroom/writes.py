@@ -0,0 +1,308 @@
+# Copyright 2025 Zyquo Onrel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module queues scene edits from HereSphere and writes them to Stash in batches.
+
+Edits to the same scene within a short window coalesce: the last value of each field wins,
+and O-count additions accumulate. Each flush sends one GraphQL request with an aliased
+mutation per scene. Stash applies each mutation on its own, so the result of each is checked:
+those which failed for a while are retried, and those Stash rejects for their scene ID are dropped.
+Pending edits are kept in a small journal file, so a restart loses nothing;
+the background thread writes it, so queueing an edit never waits for the disk.
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import datetime
+import threading
+
+from typing import Dict, Optional, Tuple
+
+from .stash_client.exceptions import GraphQLClientGraphQLMultiError
+
+log = logging.getLogger(__name__)
+
+# Error messages from Stash meaning a scene ID is invalid or gone, so retrying cannot succeed.
+REJECTED_ID_ERRORS = ('not found', 'converting id', 'foreign key constraint')
+
+class WriteQueue:
+    """
+    Coalesce scene edits and write them to Stash behind the caller, in a background thread.
+    """
+
+    def __init__(self, client=None, delay=2.0, journal_path=None, max_backoff=300.0, clock=time.monotonic, on_written=None):
+        """
+        :param client: The Stash GraphQL client, with ``execute()`` and ``get_data()``; may be set later
+        :param delay: Seconds after the first edit of a scene before it is written, to coalesce later edits
+        :param journal_path: Optional JSON file keeping pending edits across restarts
+        :param max_backoff: Maximum seconds between retries after failed writes
+        :param clock: Function returning the current time in seconds
+        :param on_written: Optional function called with each batch written, a dict of scene ID to its ``fields`` and ``o_times``
+        """
+        self.client = client
+        self.delay = delay
+        self.journal_path = journal_path
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.on_written = on_written
+
+        self._lock = threading.Condition()
+        self._journal_lock = threading.Lock() # Held while writing the journal file, taken before _lock
+        self._journal_dirty = False
+        self._pending: Dict[str, dict] = {} # scene_id -> {'fields': {...}, 'o_times': [...], 'due': ...}
+        self._writing: Dict[str, dict] = {} # The batch being written, kept in the journal until it succeeds
+        self._failures = 0
+        self._thread = None
+        self._stopping = False
+        self._load_journal()
+
+    def update(self, scene_id, **fields):
+        """
+        Queue new field values for a scene, e.g. ``rating100=80``. The last value of each field wins.
+
+        :param scene_id: The Stash scene ID
+        :param fields: ``SceneUpdateInput`` fields
+        """
+        with self._lock:
+            self._get_entry(scene_id)['fields'].update(fields)
+            self._journal_dirty = True
+            self._lock.notify()
+
+    def add_o(self, scene_id, times=1):
+        """
+        Queue O-count additions for a scene, stamped now. Additions accumulate.
+
+        :param scene_id: The Stash scene ID
+        :param times: How many to add
+        """
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+        with self._lock:
+            self._get_entry(scene_id)['o_times'].extend([now] * times)
+            self._journal_dirty = True
+            self._lock.notify()
+
+    def get_pending(self, scene_id) -> Optional[dict]:
+        """
+        Return the edits not yet written for a scene, including any being written now.
+
+        :return: A dict with ``fields`` and ``o_times``, or ``None``
+        """
+        scene_id = str(scene_id)
+        result = None
+        with self._lock:
+            for entries in (self._writing, self._pending):
+                entry = entries.get(scene_id)
+                if entry:
+                    result = result or {'fields': {}, 'o_times': []}
+                    result['fields'].update(entry['fields'])
+                    result['o_times'].extend(entry['o_times'])
+        return result
+
+    def start(self):
+        """Start the background thread."""
+        with self._lock:
+            if self._thread:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='vroom-writes', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the background thread, first writing every pending edit if possible."""
+        with self._lock:
+            thread = self._thread
+            self._stopping = True
+            self._thread = None
+            self._lock.notify()
+        if thread:
+            thread.join(timeout)
+
+    def flush(self, force=False) -> int:
+        """
+        Write the pending edits which are due, or all of them if ``force``.
+
+        :return: The number of scenes written
+        :raises Exception: If the write fails, or only partly succeeds; the edits not written stay queued
+        """
+        self._save_journal()
+        with self._lock:
+            now = self.clock()
+            batch = { K: V for K, V in self._pending.items() if force or V['due'] <= now }
+            for scene_id in batch:
+                del self._pending[scene_id]
+            self._writing = batch
+        if not batch:
+            return 0
+
+        try:
+            written, failed = self._write(batch)
+        except Exception:
+            with self._lock:
+                self._writing = {}
+                self._requeue(batch)
+            raise
+
+        with self._lock:
+            self._writing = {}
+            self._requeue(failed)
+            self._journal_dirty = True
+        self._save_journal()
+        log.debug(f'Wrote edits for {len(written)} scenes to Stash')
+        if self.on_written and written:
+            try:
+                self.on_written(written)
+            except Exception as e:
+                log.error(f'Error after writing edits to Stash: {e}')
+        if failed:
+            raise RuntimeError(f'Stash did not write edits for {len(failed)} scenes: {", ".join(sorted(failed))}')
+        return len(written)
+
+    def _requeue(self, entries):
+        # Call with the lock held. Edits queued meanwhile are newer, so they win over the failed ones.
+        for scene_id, entry in entries.items():
+            newer = self._pending.get(scene_id)
+            if newer:
+                entry['fields'].update(newer['fields'])
+                entry['o_times'].extend(newer['o_times'])
+            self._pending[scene_id] = entry
+
+    def _get_entry(self, scene_id):
+        # Call with the lock held.
+        scene_id = str(scene_id)
+        entry = self._pending.get(scene_id)
+        if entry is None:
+            entry = {'fields': {}, 'o_times': [], 'due': self.clock() + self.delay}
+            self._pending[scene_id] = entry
+        return entry
+
+    def _write(self, batch) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+        # One request, with aliased mutations for every scene in the batch.
+        # Return the edits written and those to retry, by scene ID; those rejected are dropped.
+        params = []
+        mutations = []
+        variables = {}
+        aliases = {} # alias -> (scene_id, the key of its edits)
+        for i, (scene_id, entry) in enumerate(sorted(batch.items())):
+            if entry['fields']:
+                params.append(f'$u{i}: SceneUpdateInput!')
+                mutations.append(f'u{i}: sceneUpdate(input: $u{i}) {{ id }}')
+                variables[f'u{i}'] = dict(entry['fields'], id=scene_id)
+                aliases[f'u{i}'] = (scene_id, 'fields')
+            if entry['o_times']:
+                params.append(f'$o{i}: ID!, $t{i}: [Timestamp!]')
+                mutations.append(f'o{i}: sceneAddO(id: $o{i}, times: $t{i}) {{ count }}')
+                variables[f'o{i}'] = scene_id
+                variables[f't{i}'] = entry['o_times']
+                aliases[f'o{i}'] = (scene_id, 'o_times')
+        if not mutations:
+            return batch, {}
+
+        query = f'mutation VroomWrites({", ".join(params)}) {{\n  ' + '\n  '.join(mutations) + '\n}'
+        response = self.client.execute(query=query, operation_name='VroomWrites', variables=variables)
+        try:
+            self.client.get_data(response)
+            errors = {}
+        except GraphQLClientGraphQLMultiError as e:
+            # Each mutation succeeds or fails on its own. With no data, none ran.
+            if not e.data:
+                raise
+            errors = { X.path[0]: X.message for X in e.errors if X.path and X.path[0] in aliases }
+            if len(errors) < len(e.errors):
+                raise
+
+        written = {}
+        failed = {}
+        for alias, (scene_id, key) in aliases.items():
+            message = errors.get(alias)
+            if message is None:
+                result = written
+            elif any(X in message.lower() for X in REJECTED_ID_ERRORS):
+                log.error(f'Stash rejected edits for scene {scene_id}, so drop them: {message}')
+                continue
+            else:
+                result = failed
+            edits = result.setdefault(scene_id, {'fields': {}, 'o_times': [], 'due': batch[scene_id]['due']})
+            edits[key] = batch[scene_id][key]
+        return written, failed
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._stopping:
+                    wait = min([ X['due'] for X in self._pending.values() ], default=float('inf')) - self.clock()
+                    if wait <= 0 or self._journal_dirty:
+                        break
+                    self._lock.wait(timeout=min(wait, 60.0))
+                stopping = self._stopping
+
+            try:
+                if self.flush(force=stopping):
+                    self._failures = 0
+            except Exception as e:
+                self._failures += 1
+                delay = min(2 ** self._failures, self.max_backoff) * random.uniform(0.5, 1.0)
+                log.error(f'Cannot write edits to Stash, retry in {delay:.0f}s: {e}')
+                if stopping:
+                    return
+                with self._lock:
+                    for entry in self._pending.values():
+                        entry['due'] = max(entry['due'], self.clock() + delay)
+            if stopping:
+                return
+
+    def _load_journal(self):
+        if not self.journal_path or not os.path.exists(self.journal_path):
+            return
+        try:
+            with open(self.journal_path, 'r') as f:
+                journal = json.load(f)
+        except (OSError, ValueError) as e:
+            log.error(f'Cannot read write journal {self.journal_path}: {e}')
+            return
+
+        for scene_id, entry in journal.items():
+            self._pending[scene_id] = {'fields': entry.get('fields', {}), 'o_times': entry.get('o_times', []), 'due': self.clock()}
+        if self._pending:
+            log.info(f'Resume edits for {len(self._pending)} scenes from {self.journal_path}')
+
+    def _save_journal(self):
+        # Write the journal if edits changed since it was last written. Call without the lock held.
+        with self._journal_lock:
+            with self._lock:
+                if not self._journal_dirty:
+                    return
+                self._journal_dirty = False
+                if not self.journal_path:
+                    return
+                journal = {}
+                for entries in (self._writing, self._pending):
+                    for scene_id, entry in entries.items():
+                        saved = journal.setdefault(scene_id, {'fields': {}, 'o_times': []})
+                        saved['fields'].update(entry['fields'])
+                        saved['o_times'].extend(entry['o_times'])
+            self._write_journal(journal)
+
+    def _write_journal(self, journal):
+        tmp_path = f'{self.journal_path}.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.journal_path) or '.', exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump(journal, f)
+            os.replace(tmp_path, self.journal_path)
+        except OSError as e:
+            log.error(f'Cannot write journal {self.journal_path}: {e}')
@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def write_journal(tmp_path, monkeypatch):
+    # Keep every app's pending edits in the test's own directory, never the user's cache.
+    path = tmp_path / 'writes.json'
+    monkeypatch.setattr('stash_vroom.heresphere.WRITE_JOURNAL', str(path))
+    return path
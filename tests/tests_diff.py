@@ -0,0 +1,53 @@
+import random
+
+import psygnal.containers
+
+from stash_vroom.diff import get_list_diff, apply_list_diff
+
+def _items(*ids, **fields):
+    return [ dict({'id': str(X)}, **fields) for X in ids ]
+
+def test_no_changes():
+    assert get_list_diff(_items(1, 2, 3), _items(1, 2, 3)) == []
+
+def test_remove_and_insert():
+    edits = get_list_diff(_items(1, 2, 3), _items(1, 3, 4))
+    assert edits == [('remove', 1), ('insert', 2, {'id': '4'})]
+
+def test_single_move():
+    assert get_list_diff(_items(1, 2, 3, 4), _items(2, 3, 4, 1)) == [('move', 0, 3)]
+    assert get_list_diff(_items(1, 2, 3, 4), _items(4, 1, 2, 3)) == [('move', 3, 0)]
+
+def test_update_by_updated_at():
+    old = _items(1, 2, updated_at='a')
+    new = _items(1, updated_at='a') + _items(2, updated_at='b')
+    assert get_list_diff(old, new) == [('update', 1, new[1])]
+
+def test_update_without_updated_at():
+    old = [{'id': '1', 'title': 'A'}]
+    new = [{'id': '1', 'title': 'B'}]
+    assert get_list_diff(old, new) == [('update', 0, new[0])]
+
+def test_random_lists():
+    """
+    Applying the edits always produces the new list, for plain and evented lists.
+    """
+    rand = random.Random(1234)
+    for _ in range(500):
+        old = _items(*rand.sample(range(40), rand.randint(0, 30)))
+        new = [ {'id': str(X), 'v': rand.random() < 0.2} for X in rand.sample(range(40), rand.randint(0, 30)) ]
+        for items in (list(old), psygnal.containers.EventedList(old)):
+            apply_list_diff(items, get_list_diff(list(items), new))
+            assert list(items) == new
+
+def test_evented_list_signals():
+    items = psygnal.containers.EventedList(_items(1, 2, 3, 4, 5))
+    emitted = []
+    for name in ('inserted', 'removed', 'moved', 'changed'):
+        getattr(items.events, name).connect(lambda *args, name=name: emitted.append(name))
+
+    apply_list_diff(items, get_list_diff(list(items), _items(2, 3, 4, 5, 1)))
+    assert emitted == ['moved']
+
+def test_plain_ids():
+    assert get_list_diff(['1', '2', '3'], ['3', '1', '4'], key=None) == [('remove', 1), ('move', 0, 1), ('insert', 2, '4')]
@@ -0,0 +1,67 @@
+import threading
+import time
+
+from stash_vroom.dispatch import HandlerPool
+
+
+def test_fire_and_forget_does_not_wait():
+    pool = HandlerPool()
+    release = threading.Event()
+    calls = []
+
+    def slow(scene_id):
+        release.wait(5)
+        calls.append(scene_id)
+
+    pool.register('play', slow)
+    started = time.monotonic()
+    assert pool.dispatch('play', '12') == [{'handler': 'slow', 'status': 'queued'}]
+    assert time.monotonic() - started < 0.5
+
+    release.set()
+    pool.shutdown()
+    assert calls == ['12']
+    assert pool.get_stats()['play'][0]['calls'] == 1
+
+
+def test_wait_with_timeout_and_errors():
+    pool = HandlerPool()
+    release = threading.Event()
+
+    def fast(scene_id, time=0):
+        return f'{scene_id}@{time}'
+
+    def slow(scene_id, time=0):
+        release.wait(5)
+
+    def broken(scene_id, time=0):
+        raise RuntimeError('Stash is down')
+
+    pool.register('play', fast, wait=1)
+    pool.register('play', slow, wait=0.05)
+    pool.register('play', broken, wait=1)
+    results = pool.dispatch('play', '12', time=3.5)
+    assert results == [
+        {'handler': 'fast', 'status': 'ok', 'result': '12@3.5'},
+        {'handler': 'slow', 'status': 'timeout'},
+        {'handler': 'broken', 'status': 'error', 'error': 'Stash is down'},
+    ]
+
+    release.set()
+    pool.shutdown()
+    stats = { X['handler']: X for X in pool.get_stats()['play'] }
+    assert stats['slow']['timeouts'] == 1
+    assert stats['broken']['errors'] == 1
+    assert stats['fast']['errors'] == 0
+
+
+def test_full_queue_drops_events():
+    pool = HandlerPool(max_workers=1, max_queue=1)
+    release = threading.Event()
+    pool.register('play', lambda scene_id: release.wait(5))
+
+    assert pool.dispatch('play', '1')[0]['status'] == 'queued'
+    assert pool.dispatch('play', '2')[0]['status'] == 'dropped'
+    release.set()
+    pool.shutdown()
+    assert pool.get_stats()['play'][0]['dropped'] == 1
@@ -0,0 +1,100 @@
+import httpx
+import pytest
+
+from stash_vroom import util
+from stash_vroom.fake_stash import FakeStash
+from stash_vroom.heresphere import HereSphere
+from stash_vroom.stash_client.exceptions import GraphQLClientHttpError
+from stash_vroom.writes import WriteQueue
+
+
+def _get_ids(client, flt):
+    res = client.scene_ids(find_filter=util.saved_filter_to_find_filter(flt), scene_filter=util.saved_filter_to_scene_filter(flt))
+    return [ X.id for X in res.findScenes.scenes ]
+
+
+def test_same_seed_same_dataset():
+    one, two = FakeStash(scenes=50, seed=3).get_client(), FakeStash(scenes=50, seed=3).get_client()
+    ids = [ str(X) for X in range(1, 51) ]
+    assert one.scenes_by_ids(ids=ids).model_dump() == two.scenes_by_ids(ids=ids).model_dump()
+    assert one.scenes_by_ids(ids=ids).model_dump() != FakeStash(scenes=50, seed=4).get_client().scenes_by_ids(ids=ids).model_dump()
+
+
+def test_saved_filters_select_scenes():
+    fake = FakeStash(scenes=300, seed=1, filters=3)
+    client = fake.get_client()
+    filters = client.saved_filters(mode='SCENES').model_dump()['findSavedFilters']
+    assert [ X['name'] for X in filters ] == ['VR | Everything', 'VR | Fake 2', 'VR | Fake 3']
+
+    everything, tagged, rated = (_get_ids(client, X) for X in filters)
+    assert len(everything) == 300
+    assert 0 < len(tagged) < 300
+    assert 0 < len(rated) < 300
+
+    scenes = client.scenes_by_ids(ids=rated[:20]).findScenes.scenes
+    assert all(X.rating100 > 50 for X in scenes)
+    assert [ X.id for X in scenes ] == sorted(rated[:20], key=int)
+
+    page = client.scenes(find_filter={'page': 2, 'per_page': 10, 'sort': 'title'}, scene_filter={}).findScenes
+    assert page.count == 300
+    assert len(page.scenes) == 10
+
+
+def test_changes_reach_a_refresh():
+    fake = FakeStash(scenes=20, seed=1, filters=1)
+    app = HereSphere('Test')
+    app.stash_client = fake.get_client()
+    app.load_saved_filters()
+    assert len(app._vroom_scenes_by_filter['VR | Everything']) == 20
+    assert fake.calls['ScenesByIds'] == 1
+
+    fake.update_scene('5', title='Renamed')
+    fake.remove_scenes(['6'])
+    new_ids = fake.add_scenes(2)
+    app.query_scenes_by_filter(app.saved_scene_filters[0])
+
+    assert app._vroom_scenes_by_id['5']['title'] == 'Renamed'
+    assert '6' not in app._vroom_scenes_by_filter['VR | Everything']
+    assert set(new_ids) <= set(app._vroom_scenes_by_filter['VR | Everything'])
+    assert fake.calls['ScenesByIds'] == 2
+
+
+def test_injected_failures():
+    fake = FakeStash(scenes=5)
+    client = fake.get_client()
+    fake.fail(times=1, status=503)
+    with pytest.raises(GraphQLClientHttpError):
+        client.version()
+    assert client.version().version.version
+
+    fake.error_rate = 1.0
+    with pytest.raises(GraphQLClientHttpError):
+        client.version()
+
+
+def test_write_queue_edits():
+    fake = FakeStash(scenes=5)
+    client = fake.get_client()
+    before = client.scenes_by_ids(ids=['2']).findScenes.scenes[0]
+
+    writes = WriteQueue(client)
+    writes.update('2', rating100=100)
+    writes.add_o('2', times=2)
+    assert writes.flush(force=True) == 1
+
+    after = client.scenes_by_ids(ids=['2']).findScenes.scenes[0]
+    assert after.rating100 == 100
+    assert after.o_counter == before.o_counter + 2
+    assert after.updated_at > before.updated_at
+
+
+def test_serve_on_localhost():
+    fake = FakeStash(scenes=5)
+    url = fake.serve()
+    try:
+        response = httpx.post(url, json={'operationName': 'TagsByRegex', 'query': '', 'variables': {'regex': '^Tag 1$'}})
+        assert response.json()['data']['findTags']['tags'] == [{'id': '2', 'name': 'Tag 1'}]
+        screenshot = httpx.get(url.replace('/graphql', '/scene/1/screenshot'))
+        assert screenshot.headers['content-type'] == 'image/jpeg'
+    finally:
+        fake.shutdown()
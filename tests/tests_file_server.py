@@ -0,0 +1,111 @@
+import os
+
+import pytest
+from flask import Flask, request
+
+from stash_vroom.file_server import FilePool, PathMap, get_ranges, serve_file
+
+DATA = bytes(range(256)) * 4
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, None),
+    ('bytes=0-9', [(0, 10)]),
+    ('bytes=1000-', [(1000, 1024)]),
+    ('bytes=-24', [(1000, 1024)]),
+    ('bytes=0-2000', [(0, 1024)]),
+    ('bytes=10-19,0-9,100-', [(0, 20), (100, 1024)]),
+    ('bytes=2000-', []),
+    ('bytes=-0', []),
+    ('bytes=9-0', None),
+    ('bytes=abc', None),
+    ('items=0-9', None),
+])
+def test_get_ranges(header, expected):
+    assert get_ranges(header, len(DATA)) == expected
+
+
+def test_path_map():
+    paths = PathMap({'/data': '/mnt/nas', '/data/vr/': '/srv/vr'})
+    assert paths.get_local_path('/data/vr/a.mp4') == '/srv/vr/a.mp4'
+    assert paths.get_local_path('/data/b.mp4') == '/mnt/nas/b.mp4'
+    assert paths.get_local_path('/database/b.mp4') is None
+    assert paths.get_local_path('/data/../etc/passwd') is None
+
+
+@pytest.fixture
+def client(tmp_path):
+    path = tmp_path / 'scene.mp4'
+    path.write_bytes(DATA)
+    pool = FilePool(max_open=2)
+
+    app = Flask('test')
+    @app.route('/file')
+    def file():
+        return serve_file(request, str(path), pool, buffer_size=100)
+
+    client = app.test_client()
+    client.pool = pool
+    return client
+
+
+def test_whole_file_and_single_range(client):
+    res = client.get('/file')
+    assert res.status_code == 200
+    assert res.data == DATA
+    assert res.headers['Accept-Ranges'] == 'bytes'
+    assert res.mimetype == 'video/mp4'
+
+    res = client.get('/file', headers={'Range': 'bytes=10-19'})
+    assert res.status_code == 206
+    assert res.data == DATA[10:20]
+    assert res.headers['Content-Range'] == 'bytes 10-19/1024'
+    res.close()
+    assert client.pool._count == 1
+
+
+def test_multiple_ranges(client):
+    res = client.get('/file', headers={'Range': 'bytes=0-1,-2'})
+    assert res.status_code == 206
+    assert res.mimetype == 'multipart/byteranges'
+    assert int(res.headers['Content-Length']) == len(res.data)
+    boundary = res.mimetype_params['boundary']
+    parts = res.data.split(f'--{boundary}'.encode())
+    assert parts[1].endswith(b'\r\n\r\n' + DATA[0:2] + b'\r\n')
+    assert b'Content-Range: bytes 1022-1023/1024' in parts[2]
+    assert parts[3] == b'--\r\n'
+
+
+def test_conditional_requests(client):
+    etag = client.get('/file').headers['ETag']
+    assert client.get('/file', headers={'If-None-Match': etag}).status_code == 304
+
+    res = client.get('/file', headers={'Range': 'bytes=0-9', 'If-Range': etag})
+    assert res.status_code == 206
+    res = client.get('/file', headers={'Range': 'bytes=0-9', 'If-Range': '"old"'})
+    assert res.status_code == 200
+
+    res = client.get('/file', headers={'Range': 'bytes=5000-'})
+    assert res.status_code == 416
+    assert res.headers['Content-Range'] == 'bytes */1024'
+
+
+def test_sendfile_after_multiple_ranges(tmp_path):
+    path = tmp_path / 'scene.mp4'
+    path.write_bytes(DATA)
+    pool = FilePool(max_open=1)
+    app = Flask('test')
+
+    def get(header):
+        # A file wrapper passing the body through, as sendfile servers read it by fileno().
+        environ = {'wsgi.file_wrapper': lambda file, buffer_size: file}
+        with app.test_request_context('/file', headers={'Range': header}, environ_base=environ):
+            return serve_file(request, str(path), pool, buffer_size=100)
+
+    res = get('bytes=0-9,500-599')
+    b''.join(res.response)
+    res.close()
+
+    res = get('bytes=100-199')
+    assert os.read(res.response.fileno(), 100) == DATA[100:200]
+    res.close()
@@ -0,0 +1,118 @@
+import pytest
+
+from stash_vroom.fake_stash import FakeStash
+from stash_vroom.graph import StashGraph
+from stash_vroom.heresphere import HereSphere
+
+
+def _tag(id, name, *parents, updated_at='2025-01-01T00:00:00Z'):
+    return {'id': id, 'name': name, 'updated_at': updated_at, 'parents': [ {'id': X} for X in parents ]}
+
+
+def _graph(*tags, studios=()):
+    graph = StashGraph()
+    graph.apply({'findTags': {'count': len(tags), 'tags': list(tags)}, 'findStudios': {'count': len(studios), 'studios': list(studios)}}, full=True)
+    return graph
+
+
+def test_ancestors_at_any_depth():
+    graph = _graph(_tag('1', 'A'), _tag('2', 'B', '1'), _tag('3', 'C', '2'), _tag('4', 'D', '3', '1'), _tag('5', 'E', '4'),
+                   _tag('6', 'Loop', '7'), _tag('7', 'Pool', '6'))
+    assert [ X['name'] for X in graph.get_tag_ancestors('5') ] == ['D', 'C', 'A', 'B']
+    assert graph.has_tag('5', '1')
+    assert not graph.has_tag('1', '5')
+    assert [ X['name'] for X in graph.get_tag_ancestors('6') ] == ['Pool']
+
+
+def test_studio_ancestors():
+    studios = [
+        {'id': '1', 'name': 'Network', 'updated_at': None, 'parent_studio': None, 'tags': [{'id': '1'}]},
+        {'id': '2', 'name': 'Label', 'updated_at': None, 'parent_studio': {'id': '1'}, 'tags': []},
+        {'id': '3', 'name': 'Series', 'updated_at': None, 'parent_studio': {'id': '2'}, 'tags': []},
+    ]
+    graph = _graph(_tag('1', 'VR'), studios=studios)
+    assert [ X['name'] for X in graph.get_studio_ancestors('3') ] == ['Label', 'Network']
+    assert graph.get_studio('1')['tags'] == [{'id': '1', 'name': 'VR'}]
+
+
+def test_hydrate_shares_dicts_and_sees_renames():
+    graph = _graph(_tag('1', 'Old'))
+    one = graph.hydrate_scene({'id': '1', 'tags': [{'id': '1'}], 'scene_markers': [{'seconds': 1.0, 'primary_tag': {'id': '1'}, 'tags': []}]})
+    two = graph.hydrate_scene({'id': '2', 'tags': [{'id': '1'}, {'id': '9'}]})
+    assert one['tags'][0] is two['tags'][0] is one['scene_markers'][0]['primary_tag']
+    assert graph.get_missing([two]) == ({'9'}, set())
+
+    version = graph.version
+    assert graph.apply({'findTags': {'count': 1, 'tags': [_tag('1', 'New')]}, 'findStudios': {'count': 0, 'studios': []}})
+    assert graph.version == version + 1
+    assert one['tags'][0]['name'] == 'New'
+    assert not graph.apply({'findTags': {'count': 1, 'tags': [_tag('1', 'New')]}, 'findStudios': {'count': 0, 'studios': []}})
+
+
+def test_incremental_refresh():
+    fake = FakeStash(scenes=10, tags=30)
+    client = fake.get_client()
+    graph = StashGraph()
+    assert graph.refresh(client)
+    assert graph.get_tag('15')['name'] == 'Tag 14'
+    assert [ X['id'] for X in graph.get_tag_ancestors('25') ] == ['2']
+
+    fake.rename_tag('15', 'Renamed')
+    new_id = fake.add_tag('New', parent_id='25')
+    assert not graph.refresh(client, max_age=60) # Too soon
+    assert graph.refresh(client)
+    assert fake.calls['TagsAndStudios'] == 1
+    assert fake.calls['TagsAndStudiosSince'] == 1
+    assert graph.get_tag('15')['name'] == 'Renamed'
+    assert [ X['id'] for X in graph.get_tag_ancestors(new_id) ] == ['25', '2']
+
+    restored = StashGraph()
+    restored.load_dict(graph.to_dict())
+    assert not restored.refresh(client)
+    assert fake.calls['TagsAndStudios'] == 1
+    assert restored.get_tag(new_id) == {'id': new_id, 'name': 'New'}
+
+
+@pytest.mark.parametrize('raw', [False, True])
+def test_app_resolves_scene_tags(raw):
+    fake = FakeStash(scenes=20, filters=1)
+    app = HereSphere('Test')
+    app.stash_client = fake.get_client(raw=raw)
+    app.load_saved_filters()
+
+    scene = app._vroom_scenes_by_id['3']
+    assert all(X['name'] for X in scene['tags'])
+    assert scene['studio'] is None or scene['studio']['name'].startswith('Studio ')
+    tag_id = scene['tags'][0]['id']
+    assert scene['tags'][0] is app.stash_graph.get_tag(tag_id)
+
+    # A scene with a tag created since the last graph refresh.
+    new_id = fake.add_tag('Brand new')
+    fake.update_scene('3', tag_ids=[tag_id, new_id])
+    app.query_scenes_by_filter(app.saved_scene_filters[0])
+    names = [ X['name'] for X in app._vroom_scenes_by_id['3']['tags'] ]
+    assert 'Brand new' in names
+
+
+def test_app_survives_failed_graph_refresh(monkeypatch):
+    fake = FakeStash(scenes=20, filters=1)
+    app = HereSphere('Test')
+    app.stash_client = fake.get_client()
+    refresh = app.stash_graph.refresh
+    def fail(*args, **kwargs):
+        raise ConnectionError('Stash is down')
+    monkeypatch.setattr(app.stash_graph, 'refresh', fail)
+    app.load_saved_filters()
+
+    # Scenes are stored with bare tag IDs, which render as such.
+    scene = app._vroom_scenes_by_id['3']
+    tag_id = scene['tags'][0]['id']
+    assert 'name' not in scene['tags'][0]
+    assert {'name': f'Tag:{tag_id}'} in app._render_hs_tags(scene)
+
+    # Once the graph refreshes, the stored scenes get their names even though they did not change.
+    monkeypatch.setattr(app.stash_graph, 'refresh', refresh)
+    app._refresh_graph(max_age=None)
+    scene = app._vroom_scenes_by_id['3']
+    assert scene['tags'][0] is app.stash_graph.get_tag(tag_id)
+    assert {'name': f'Tag:{scene["tags"][0]["name"]}'} in app._render_hs_tags(scene)
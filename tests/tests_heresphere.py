@@ -0,0 +1,603 @@
+import os
+import json
+
+import httpx
+import pytest
+
+import stash_vroom.stash as stash
+from stash_vroom import stash_client
+from stash_vroom.heresphere import HereSphere
+from stash_vroom.media_cache import MediaCache
+from stash_vroom.writes import WriteQueue
+
+HS_HEADERS = {'HereSphere-JSON-Version': '1'}
+
+
+def _scene(id, title=None):
+    return {'id': str(id), 'title': title or f'Scene {id}'}
+
+
+def _saved_filter(id, name):
+    return {'id': str(id), 'mode': 'SCENES', 'name': name, 'find_filter': {}, 'object_filter': {}}
+
+
+@pytest.fixture(autouse=True)
+def stash_host(monkeypatch):
+    monkeypatch.setattr(stash, 'STASH_HOST', 'stash.local')
+    monkeypatch.setattr(stash, 'STASH_IP', '192.168.0.5')
+
+
+def _new_app():
+    app = HereSphere('Test')
+    app._add_saved_filter(_saved_filter(1, 'VR | Everything'))
+    app._apply_scenes_by_filter(app.saved_scene_filters[0], [_scene(10), _scene(11)])
+    return app
+
+
+@pytest.fixture
+def app():
+    return _new_app()
+
+
+def test_library_urls_use_request_host(app):
+    client = app.test_client()
+    res = client.post('/heresphere', headers=HS_HEADERS, base_url='http://10.0.0.1:5000')
+    assert res.headers['HereSphere-JSON-Version'] == '1'
+
+    body = res.get_json()
+    assert body['library'] == [{
+        'name': 'Everything',
+        'list': ['http://10.0.0.1:5000/heresphere/10', 'http://10.0.0.1:5000/heresphere/11'],
+    }]
+
+
+def test_library_is_cached_per_url_root(app):
+    a = app._get_library_json('http://a:5000/')
+    assert app._get_library_json('http://a:5000/') is a
+
+    b = app._get_library_json('http://b:5000/')
+    assert b is not a
+    assert b'http://b:5000/heresphere/10' in b
+    assert b'http://a:5000/' not in b
+
+
+def test_library_rebuilt_when_scenes_change(app):
+    before = app._get_library_json('http://a:5000/')
+    app._apply_scenes_by_filter(app.saved_scene_filters[0], [_scene(10), _scene(11), _scene(12)])
+
+    after = app._get_library_json('http://a:5000/')
+    assert after is not before
+    assert json.loads(after)['library'][0]['list'][-1] == 'http://a:5000/heresphere/12'
+
+
+def test_library_does_not_mutate_scenes(app):
+    app._get_library_json('http://a:5000/')
+    assert list(app._vroom_scenes_by_filter['VR | Everything']) == ['10', '11']
+    assert app._vroom_scenes_by_id['10'] == _scene(10)
+
+
+def test_scene_detail(app):
+    scene = _scene(12, 'Detailed')
+    scene.update({
+        'updated_at': '2025-01-01T00:00:00Z',
+        'rating100': 80,
+        'paths': {'stream': 'http://stash.local:9999/scene/12/stream', 'screenshot': None, 'preview': None},
+        'files': [{'basename': 'SLR_Studio_Title_Original_2880p_123_TB_360.mp4', 'duration': 60.0, 'width': 2880, 'height': 2880, 'size': 1000}],
+        'tags': [{'id': '1', 'name': 'Outdoors'}],
+        'performers': [{'id': '2', 'name': 'Alice'}],
+        'scene_markers': [
+            {'id': '4', 'seconds': 30.0, 'primary_tag': {'name': 'Second'}},
+            {'id': '3', 'seconds': 10.0, 'primary_tag': {'name': 'First'}},
+        ],
+    })
+    app._apply_scenes_by_filter(app.saved_scene_filters[0], [_scene(10), _scene(11), scene])
+
+    res = app.test_client().post('/heresphere/12', headers=HS_HEADERS)
+    body = res.get_json()
+    assert body['title'] == 'Detailed'
+    assert body['rating'] == 4
+    assert body['projection'] == 'equirectangular360'
+    assert body['stereo'] == 'tb'
+    assert body['media'][0]['sources'][0]['url'] == 'http://192.168.0.5:9999/scene/12/stream'
+    assert {'name': 'Tag:Outdoors'} in body['tags']
+    assert {'name': 'Performer:Alice'} in body['tags']
+    markers = [ X for X in body['tags'] if X['name'].startswith('Marker:') ]
+    assert markers == [
+        {'name': 'Marker:First', 'start': 10000.0, 'end': 30000.0, 'track': 0},
+        {'name': 'Marker:Second', 'start': 30000.0, 'end': 60000.0, 'track': 0},
+    ]
+
+
+def test_scene_detail_unknown(app):
+    res = app.test_client().post('/heresphere/999', headers=HS_HEADERS)
+    assert res.status_code == 404
+
+
+def test_scene_detail_cached_until_updated(app):
+    first = app._get_scene_json('10')
+    assert app._get_scene_json('10') is first
+
+    app._apply_scenes_by_filter(app.saved_scene_filters[0], [dict(_scene(10, 'Renamed'), updated_at='later'), _scene(11)])
+    assert json.loads(app._get_scene_json('10'))['title'] == 'Renamed'
+
+
+def test_hs_tags_translated_once_per_version(app, monkeypatch):
+    rendered = []
+    render = app._render_hs_tags
+    monkeypatch.setattr(app, '_render_hs_tags', lambda scene: rendered.append(scene['id']) or render(scene))
+    scene = dict(_scene(10), updated_at='v1', scene_markers=[{'id': '1', 'seconds': 5.0, 'primary_tag': {'name': 'Start'}}])
+    app._apply_scenes_by_filter(app.saved_scene_filters[0], [scene, _scene(11)])
+
+    app._get_scene_json('10')
+    b''.join(app._iter_scan_json('http://a:5000/'))
+    app.set_local_paths({'/data': '/mnt'}) # Drops the scene responses, but not the tags
+    app._get_scene_json('10')
+    assert rendered.count('10') == 1
+
+    changed = dict(scene, updated_at='v2', scene_markers=[])
+    app._apply_scenes_by_filter(app.saved_scene_filters[0], [changed, _scene(11)])
+    assert json.loads(app._get_scene_json('10'))['tags'] == []
+    assert rendered.count('10') == 2
+
+    app._apply_scenes_by_filter(app.saved_scene_filters[0], [_scene(11)])
+    assert '10' not in app._vroom_cache['tags']
+
+def test_scene_store_shared_by_filters(app):
+    app._add_saved_filter(_saved_filter(2, 'VR | Other'))
+    other = app.saved_scene_filters[1]
+    app._apply_scenes_by_filter(other, [_scene(10)])
+    app._apply_scenes_by_filter(app.saved_scene_filters[0], [_scene(11)])
+    assert '10' in app._vroom_scenes_by_id
+
+    app._apply_scenes_by_filter(other, [dict(_scene(11), title='New')])
+    assert '10' not in app._vroom_scenes_by_id
+    assert app._vroom_scenes_by_id['11']['title'] == 'New'
+
+
+def test_legend_rendered_once(app):
+    client = app.test_client()
+    res = client.get('/heresphere/legend')
+    assert res.status_code == 200
+    assert res.mimetype == 'image/png'
+    etag = res.headers['ETag']
+    png = app._cache_get('legend')
+
+    res = client.get('/heresphere/legend', headers={'If-None-Match': etag})
+    assert res.status_code == 304
+    assert app._cache_get('legend') is png
+
+
+def test_legend_rerendered_on_new_shortcuts(app):
+    client = app.test_client()
+    etag = client.get('/heresphere/legend').headers['ETag']
+    app.add_shortcut('screenshot', 'left', 'left', 'right', 'right', description='Screenshot')
+    assert app._get_hs_shortcuts() == [('screenshot', 'left,left,right,right', 'Screenshot')]
+
+    res = client.get('/heresphere/legend', headers={'If-None-Match': etag})
+    assert res.status_code == 200
+    assert res.headers['ETag'] != etag
+
+    with pytest.raises(ValueError):
+        app.add_shortcut('other', 'left', 'left', 'right', 'right')
+    with pytest.raises(ValueError):
+        app.add_shortcut('sideways', 'diagonal')
+
+
+class FakeStashClient:
+    def __init__(self, scenes, saved_filters=()):
+        self.scenes_reply = scenes
+        self.saved_filters_reply = list(saved_filters)
+        self.fetched_ids = []
+
+    def saved_filters(self, mode):
+        return FakeReply({'findSavedFilters': [ X for X in self.saved_filters_reply if X['mode'] == mode ]})
+
+    def scenes(self, find_filter, scene_filter):
+        return FakeReply({'findScenes': {'count': len(self.scenes_reply), 'scenes': self.scenes_reply}})
+
+    def scene_ids(self, find_filter, scene_filter):
+        scenes = [ {'id': X['id'], 'updated_at': X.get('updated_at')} for X in self.scenes_reply ]
+        return FakeReply({'findScenes': {'count': len(scenes), 'scenes': scenes}})
+
+    def scenes_by_ids(self, ids, **kwargs):
+        self.fetched_ids.append(list(ids))
+        scenes = [ X for X in self.scenes_reply if X['id'] in ids ]
+        return FakeReply({'findScenes': {'count': len(scenes), 'scenes': scenes}})
+
+class FakeReply:
+    def __init__(self, data):
+        self.data = data
+
+    def model_dump(self):
+        return self.data
+
+def test_query_scenes_by_filter_diff(app):
+    flt = app.saved_scene_filters[0]
+    scenes = app._vroom_scenes_by_filter['VR | Everything']
+    emitted = []
+    scenes.events.changed.connect(lambda *args: emitted.append('changed'))
+    scenes.events.removed.connect(lambda *args: emitted.append('removed'))
+
+    app.stash_client = FakeStashClient([_scene(11), _scene(12)])
+    app.query_scenes_by_filter(flt)
+    assert list(scenes) == ['11', '12']
+    assert emitted == ['removed']
+    assert '10' not in app._vroom_scenes_by_id
+
+
+def test_load_saved_filters_in_id_order():
+    app = HereSphere('Test')
+    app.stash_client = FakeStashClient([_scene(1)], saved_filters=[
+        _saved_filter(30, 'VR | Thirty'),
+        _saved_filter(4, 'Not active'),
+        _saved_filter(2, 'VR | Two'),
+        _saved_filter(10, 'HS | Ten'),
+        _saved_filter(2, 'VR | Two'),
+    ])
+    app.load_saved_filters()
+
+    assert [ X['id'] for X in app.saved_scene_filters ] == ['2', '10', '30']
+    for name in ('VR | Two', 'HS | Ten', 'VR | Thirty'):
+        assert list(app._vroom_scenes_by_filter[name]) == ['1']
+
+
+def test_query_scenes_fetches_only_changed(app, monkeypatch):
+    monkeypatch.setattr('stash_vroom.heresphere.SCENE_FETCH_CHUNK', 2)
+    monkeypatch.setattr('stash_vroom.heresphere.SCENE_FETCH_WORKERS', 1) # Chunks in order
+    flt = app.saved_scene_filters[0]
+    scenes = [ dict(_scene(X), updated_at='a') for X in range(1, 6) ]
+
+    app.stash_client = FakeStashClient(scenes)
+    app.query_scenes_by_filter(flt)
+    assert app.stash_client.fetched_ids == [['1', '2'], ['3', '4'], ['5']]
+
+    scenes[2] = dict(scenes[2], updated_at='b', title='Changed')
+    app.stash_client = FakeStashClient(scenes)
+    app.query_scenes_by_filter(flt)
+    assert app.stash_client.fetched_ids == [['3']]
+    assert app._vroom_scenes_by_id['3']['title'] == 'Changed'
+    assert list(app._vroom_scenes_by_filter['VR | Everything']) == ['1', '2', '3', '4', '5']
+
+
+def test_refresh_priority_follows_requests(app):
+    app._add_saved_filter(_saved_filter(2, 'VR | Other'))
+    app._apply_scenes_by_filter(app.saved_scene_filters[1], [_scene(20)])
+    assert app._get_filter_requested_at('VR | Other') == 0
+
+    app.test_client().post('/heresphere/20', headers=HS_HEADERS)
+    assert app._get_filter_requested_at('VR | Other') > app._get_filter_requested_at('VR | Everything')
+
+    app._refresh_filter('VR | Gone')
+    assert app._vroom_scheduler.get_status('VR | Other') is not None
+
+
+def test_job_finished_triggers_refresh(app):
+    status = app._vroom_scheduler.get_status('VR | Everything')
+    assert status['due'] - app._vroom_scheduler.clock() > 60
+
+    app._on_jobs_connected(True)
+    assert app._vroom_scheduler.interval == 3600
+
+    app._on_job_finished({'id': '1', 'status': 'FINISHED', 'description': 'Scanning...'})
+    status = app._vroom_scheduler.get_status('VR | Everything')
+    assert status['triggered']
+    assert status['due'] - 5 < app._vroom_scheduler.clock()
+
+
+class FakeMediaClient:
+    def __init__(self):
+        self.requests = []
+        self.http_client = httpx.Client(transport=httpx.MockTransport(self.handle))
+
+    def handle(self, request):
+        self.requests.append(str(request.url))
+        if request.url.path.endswith('/missing'):
+            return httpx.Response(404)
+        return httpx.Response(200, content=b'0123456789', headers={'content-type': 'image/jpeg'})
+
+
+@pytest.fixture
+def media_app(app, tmp_path):
+    app._vroom_media = MediaCache(str(tmp_path))
+    app.stash_client = FakeMediaClient()
+    scene = dict(_scene(12), updated_at='t1', paths={'screenshot': 'http://stash.local:9999/scene/12/screenshot', 'preview': 'http://stash.local:9999/scene/12/missing'})
+    app._apply_scenes_by_filter(app.saved_scene_filters[0], [scene])
+    return app
+
+
+def test_media_fetched_once_and_immutable(media_app):
+    url = json.loads(media_app._get_scene_json('12'))['thumbnailImage']
+    path = url.split(':5000', 1)[1]
+    client = media_app.test_client()
+
+    res = client.get(path)
+    assert res.status_code == 200
+    assert res.data == b'0123456789'
+    assert 'immutable' in res.headers['Cache-Control']
+    etag = res.headers['ETag']
+    assert not etag.startswith('W/')
+
+    assert client.get(path, headers={'If-None-Match': etag}).status_code == 304
+    res = client.get(path, headers={'Range': 'bytes=2-4'})
+    assert res.status_code == 206
+    assert res.data == b'234'
+    assert media_app.stash_client.requests == ['http://stash.local:9999/scene/12/screenshot']
+
+    res = client.get('/heresphere/media/12/screenshot/stale')
+    assert res.status_code == 200
+    assert res.headers['Cache-Control'] == 'no-cache'
+
+
+def test_media_refetched_when_evicted_before_serving(media_app):
+    client = media_app.test_client()
+    assert client.get('/heresphere/media/12/screenshot/x').status_code == 200
+    path, _, _ = media_app._vroom_media.get('http://stash.local:9999/scene/12/screenshot|t1')
+    os.remove(path)
+
+    res = client.get('/heresphere/media/12/screenshot/x')
+    assert res.status_code == 200
+    assert res.data == b'0123456789'
+    assert len(media_app.stash_client.requests) == 2
+
+
+def test_performer_image_proxied(media_app):
+    performer = {'id': '7', 'name': 'P', 'image_path': 'http://stash.local:9999/performer/7/image', 'updated_at': 'p1'}
+    scenes = [ dict(_scene(X), performers=[performer]) for X in (12, 13) ]
+    media_app._apply_scenes_by_filter(media_app.saved_scene_filters[0], scenes)
+    client = media_app.test_client()
+
+    url = json.loads(media_app._get_scene_json('12'))['performers'][0]['image']
+    assert '/heresphere/media/12/performer-7/' in url
+    res = client.get(url.split(':5000', 1)[1])
+    assert res.status_code == 200
+    assert 'immutable' in res.headers['Cache-Control']
+    assert client.get('/heresphere/media/13/performer-7/x').status_code == 200
+    assert media_app.stash_client.requests == ['http://stash.local:9999/performer/7/image']
+
+    # A changed performer is a new URL and a new fetch.
+    performer = dict(performer, updated_at='p2')
+    media_app._apply_scenes_by_filter(media_app.saved_scene_filters[0], [dict(_scene(12), updated_at='t2', performers=[performer])])
+    assert json.loads(media_app._get_scene_json('12'))['performers'][0]['image'] != url
+    assert client.get('/heresphere/media/12/performer-7/x').status_code == 200
+    assert len(media_app.stash_client.requests) == 2
+    assert client.get('/heresphere/media/12/performer-8/x').status_code == 404
+
+
+def test_media_errors(media_app):
+    client = media_app.test_client()
+    assert client.get('/heresphere/media/12/preview/x').status_code == 404
+    assert client.get('/heresphere/media/12/stream/x').status_code == 404
+    assert client.get('/heresphere/media/999/screenshot/x').status_code == 404
+
+
+def test_local_file_serving(app, tmp_path):
+    (tmp_path / 'vr').mkdir()
+    (tmp_path / 'vr' / 'a.mp4').write_bytes(b'video')
+    scene = dict(_scene(12), paths={'stream': 'http://stash.local:9999/scene/12/stream'},
+                 files=[{'basename': 'a.mp4', 'path': '/data/vr/a.mp4'}])
+    app._apply_scenes_by_filter(app.saved_scene_filters[0], [scene])
+    url = json.loads(app._get_scene_json('12'))['media'][0]['sources'][0]['url']
+    assert url == 'http://192.168.0.5:9999/scene/12/stream'
+
+    app.set_local_paths({'/data': str(tmp_path)})
+    url = json.loads(app._get_scene_json('12'))['media'][0]['sources'][0]['url']
+    assert url.endswith('/heresphere/file/12')
+
+    res = app.test_client().get('/heresphere/file/12', headers={'Range': 'bytes=1-'})
+    assert res.status_code == 206
+    assert res.data == b'ideo'
+    assert app.test_client().get('/heresphere/file/10').status_code == 404
+
+
+def test_event_server(app):
+    events = []
+
+    @app.on_event('play', wait=1)
+    def on_play(scene_id, **details):
+        events.append((scene_id, details['time']))
+        return 'played'
+
+    assert json.loads(app._get_scene_json('10'))['eventServer'].endswith('/heresphere/event')
+
+    client = app.test_client()
+    res = client.post('/heresphere/event', json={'id': 'http://10.0.0.1:5000/heresphere/10', 'event': 1, 'time': 1500})
+    assert res.get_json()['results'] == [{'handler': 'on_play', 'status': 'ok', 'result': 'played'}]
+    assert events == [('10', 1.5)]
+
+    res = client.post('/heresphere/event', json={'id': 'http://10.0.0.1:5000/heresphere/10', 'event': 2})
+    assert res.get_json()['status'] == 'no_handler'
+    assert client.post('/heresphere/event', json={'event': 9}).status_code == 400
+    assert app.get_handler_stats()['play'][0]['calls'] == 1
+
+
+class FakeWriteClient:
+    def execute(self, query, operation_name, variables):
+        return None
+
+    def get_data(self, response):
+        return {}
+
+
+@pytest.fixture
+def writes_app(app):
+    app._vroom_writes = WriteQueue(FakeWriteClient(), delay=60, on_written=app._on_edits_written)
+    return app
+
+
+def test_rating_written_behind(writes_app):
+    app = writes_app
+    client = app.test_client()
+    for rating in (1, 2.5, 4):
+        res = client.post('/heresphere/10', headers=HS_HEADERS, json={'rating': rating})
+    assert res.get_json()['rating'] == 4
+    assert app._vroom_writes.get_pending('10')['fields'] == {'rating100': 80}
+
+    # A refresh from Stash before the write keeps the edit.
+    app._apply_scenes_by_filter(app.saved_scene_filters[0], [dict(_scene(10), updated_at='later', rating100=20), _scene(11)])
+    assert json.loads(app._get_scene_json('10'))['rating'] == 4
+
+
+@pytest.mark.parametrize('scene_id, body, status', [
+    ('99', {'rating': 4}, 404),
+    ('10', {'rating': 'x'}, 400),
+    ('10', {'rating': 7}, 400),
+    ('10', [4], 400),
+])
+def test_invalid_rating_not_written(writes_app, scene_id, body, status):
+    res = writes_app.test_client().post(f'/heresphere/{scene_id}', headers=HS_HEADERS, json=body)
+    assert res.status_code == status
+    assert writes_app._vroom_writes.get_pending(scene_id) is None
+
+
+def test_o_count_edits_counted_once(writes_app):
+    app = writes_app
+    app._apply_scenes_by_filter(app.saved_scene_filters[0], [dict(_scene(10), o_counter=5), _scene(11)])
+    counts = []
+    for _ in range(3):
+        app.add_o('10')
+        counts.append(app._vroom_scenes_by_id['10']['o_counter'])
+    assert counts == [6, 7, 8]
+
+    # Once written, Stash has the edits, so later ones add to them.
+    assert app._vroom_writes.flush(force=True) == 1
+    app.add_o('10')
+    assert app._vroom_scenes_by_id['10']['o_counter'] == 9
+    assert app._vroom_stash_scenes['10']['o_counter'] == 8
+
+
+def test_scan_streams_all_scenes(app, monkeypatch):
+    monkeypatch.setattr('stash_vroom.heresphere.SCAN_CHUNK_BYTES', 1)
+    app._apply_scenes_by_filter(app.saved_scene_filters[0], [_scene(X) for X in range(10, 15)])
+
+    res = app.test_client().post('/heresphere/scan', headers=HS_HEADERS, base_url='http://10.0.0.1:5000', buffered=False)
+    assert res.is_streamed
+    chunks = list(res.response)
+    assert len(chunks) == 6
+
+    body = json.loads(b''.join(chunks))
+    assert [ X['link'] for X in body['scanData'] ] == [ f'http://10.0.0.1:5000/heresphere/{X}' for X in range(10, 15) ]
+    assert body['scanData'][0]['title'] == 'Scene 10'
+
+
+def test_scan_empty():
+    res = HereSphere('Test').test_client().post('/heresphere/scan', headers=HS_HEADERS)
+    assert res.get_json() == {'scanData': []}
+
+
+@pytest.fixture
+def snapshot_app(app, tmp_path, monkeypatch):
+    monkeypatch.setattr('stash_vroom.heresphere.SNAPSHOT_PATH', str(tmp_path / 'snapshot.json.gz'))
+    app._vroom_stash_url = 'http://stash.local:9999/graphql'
+    return app
+
+
+def test_snapshot_warm_start(snapshot_app):
+    app = snapshot_app
+    library = app._get_library_json('http://a:5000/')
+    app._save_snapshot()
+
+    warm = HereSphere('Test')
+    warm._vroom_stash_url = 'http://other:9999/graphql'
+    assert not warm._load_snapshot()
+
+    warm._vroom_stash_url = 'http://stash.local:9999/graphql'
+    assert warm._load_snapshot()
+    assert [ X['name'] for X in warm.saved_scene_filters ] == ['VR | Everything']
+    assert list(warm._vroom_scenes_by_filter['VR | Everything']) == ['10', '11']
+    assert warm._get_library_json('http://a:5000/') == library
+    assert json.loads(warm._get_scene_json('10'))['title'] == 'Scene 10'
+
+
+def test_revalidate_reconciles_filters(snapshot_app):
+    app = snapshot_app
+    app._add_saved_filter(_saved_filter(3, 'VR | Gone'))
+    app._apply_scenes_by_filter(app.saved_scene_filters[1], [_scene(12)])
+    app._save_snapshot()
+
+    warm = HereSphere('Test')
+    warm._vroom_stash_url = app._vroom_stash_url
+    assert warm._load_snapshot()
+    renamed = dict(_saved_filter(1, 'VR | Renamed'), find_filter={'sort': 'title'})
+    warm.stash_client = FakeStashClient([_scene(10), _scene(13)], saved_filters=[renamed, _saved_filter(2, 'VR | New')])
+    warm._revalidate()
+
+    assert list(warm.saved_scene_filters) == [renamed, _saved_filter(2, 'VR | New')]
+    assert sorted(warm._vroom_scenes_by_filter) == ['VR | New', 'VR | Renamed']
+    assert list(warm._vroom_scenes_by_filter['VR | Renamed']) == ['10', '13']
+    assert '12' not in warm._vroom_scenes_by_id
+
+
+def test_metrics_endpoint(app):
+    client = app.test_client()
+    client.post('/heresphere', headers=HS_HEADERS)
+    client.post('/heresphere', headers=HS_HEADERS)
+    client.post('/heresphere/10', headers=HS_HEADERS)
+
+    res = client.get('/metrics')
+    assert res.mimetype == 'text/plain'
+    text = res.get_data(as_text=True)
+    assert 'vroom_http_requests_total{route="/heresphere",status="200"} 2' in text
+    assert 'vroom_http_request_seconds_count{route="/heresphere/<scene_id>"} 1' in text
+    assert 'vroom_cache_requests_total{cache="library",result="hit"} 1' in text
+    assert 'vroom_filter_scenes{filter="VR | Everything"} 2' in text
+    assert 'vroom_list_mutations_total{list="filters",event="inserted"} 1' in text
+    assert 'vroom_list_mutations_total{list="scenes",event="inserted"} 2' in text
+
+
+def test_metrics_graphql(app):
+    class Client:
+        def execute(self, query, operation_name=None, variables=None):
+            return httpx.Response(200, content=b'{"data":{}}')
+
+    client = Client()
+    app._instrument_client(client)
+    app._instrument_client(client)
+    client.execute(query='query Version { version }', operation_name='Version')
+
+    text = app._vroom_metrics.render()
+    assert 'vroom_graphql_requests_total{operation="Version",status="200"} 1' in text
+    assert 'vroom_graphql_response_bytes_total{operation="Version"} 11' in text
+
+
+def test_metrics_graphql_streamed(app):
+    items = [{'id': '10', 'updated_at': 'now'}, {'id': '11', 'updated_at': 'now'}]
+    body = json.dumps({'data': {'findScenes': {'count': 2, 'duration': 0, 'filesize': 0, 'scenes': items}}}).encode()
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=iter([body[:20], body[20:]])))
+    client = stash_client.Stash('http://stash.local/graphql', http_client=httpx.Client(transport=transport), raw=True)
+    app._instrument_client(client)
+
+    scenes = []
+    client.scene_ids(find_filter={}, scene_filter={}, stream_path='findScenes.scenes', on_item=scenes.append)
+    assert [ X['id'] for X in scenes ] == ['10', '11']
+    text = app._vroom_metrics.render()
+    assert f'vroom_graphql_response_bytes_total{{operation="SceneIds"}} {len(body)}' in text
+
+
+def test_memory_endpoints(monkeypatch):
+    client = HereSphere('Test').test_client()
+    assert client.get('/admin/memory').status_code == 404
+
+    monkeypatch.setattr('stash_vroom.heresphere.MEMORY_PROFILE_FRAMES', 1)
+    app = _new_app()
+    try:
+        app._add_saved_filter(_saved_filter(2, 'VR | Some'))
+        app._apply_scenes_by_filter(app.saved_scene_filters[1], [_scene(11)])
+        client = app.test_client()
+
+        assert client.post('/admin/memory/snapshots/before').get_json()['name'] == 'before'
+        body = client.get('/admin/memory?limit=5').get_json()
+        assert len(body['top']) <= 5
+        assert body['snapshots'] == ['before']
+        assert body['scenes']['count'] == 2
+        assert body['filters']['VR | Everything']['exclusive_bytes'] > 0
+        assert body['filters']['VR | Some']['exclusive_bytes'] == 0
+
+        assert 'diff' in client.get('/admin/memory/diff?from=before').get_json()
+        assert client.get('/admin/memory/diff?from=nope').status_code == 400
+        assert client.get('/admin/memory?group=nope').status_code == 400
+    finally:
+        app._vroom_memory.stop()
+
+
+def test_write_journal_is_the_tests_own(app, write_journal):
+    assert app._vroom_writes.journal_path == str(write_journal)
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from stash_vroom import jobs
+from stash_vroom.jobs import JobWatcher, get_ws_url
+
+
+def _update(type, id, status, description='Scanning...'):
+    return {'type': type, 'job': {'id': str(id), 'status': status, 'description': description}}
+
+
+def test_ws_url():
+    assert get_ws_url('http://127.0.0.1:9999/graphql') == 'ws://127.0.0.1:9999/graphql'
+    assert get_ws_url('https://stash.local/graphql') == 'wss://stash.local/graphql'
+
+
+def test_finished_library_jobs_reported_once():
+    finished = []
+    watcher = JobWatcher('http://stash.local:9999/graphql', on_finished=finished.append)
+
+    watcher._on_update(_update('ADD', 1, 'READY'))
+    watcher._on_update(_update('UPDATE', 1, 'RUNNING'))
+    assert finished == []
+
+    watcher._on_update(_update('UPDATE', 1, 'FINISHED'))
+    watcher._on_update(_update('REMOVE', 1, 'FINISHED'))
+    assert [ X['id'] for X in finished ] == ['1']
+
+    watcher._on_update(_update('UPDATE', 2, 'FINISHED', description='Backing up database'))
+    watcher._on_update(_update('UPDATE', 3, 'CANCELLED'))
+    assert len(finished) == 1
+
+
+def test_connected_callback_on_change():
+    events = []
+    watcher = JobWatcher('http://stash.local:9999/graphql', on_connected=events.append)
+    watcher._set_connected(False)
+    watcher._on_subscribed()
+    watcher._on_subscribed()
+    watcher._set_connected(False)
+    assert events == [True, False]
+
+
+class FlappingClient:
+    # Subscribes, delivers one update, then drops.
+    def __init__(self, ws_url, ws_headers, on_subscribed):
+        self.on_subscribed = on_subscribed
+
+    async def execute_ws(self, query, operation_name):
+        self.on_subscribed()
+        yield {'jobsSubscribe': _update('UPDATE', 1, 'RUNNING')}
+        raise ConnectionError('Connection dropped')
+
+
+@pytest.mark.parametrize('stable_after, expected', [(60.0, [1, 2, 4, 8]), (0.0, [1, 1, 1, 1])])
+def test_flapping_connection_backs_off(monkeypatch, stable_after, expected):
+    delays = []
+    async def sleep(delay):
+        delays.append(delay)
+        if len(delays) == 4:
+            raise asyncio.CancelledError()
+    monkeypatch.setattr(jobs, 'websockets', object())
+    monkeypatch.setattr(jobs, '_JobsClient', FlappingClient)
+    monkeypatch.setattr(jobs.random, 'uniform', lambda a, b: 1.0)
+    monkeypatch.setattr(jobs.asyncio, 'sleep', sleep)
+
+    watcher = JobWatcher('http://stash.local:9999/graphql', min_backoff=1.0, stable_after=stable_after)
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(watcher._watch())
+    assert delays == expected
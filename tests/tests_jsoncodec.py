@@ -0,0 +1,76 @@
+import enum
+import json
+
+import pytest
+
+from stash_vroom import jsoncodec
+from stash_vroom.cli import codecbench
+from stash_vroom.heresphere import HereSphere
+
+
+class Mode(str, enum.Enum):
+    SCENES = 'SCENES'
+
+
+PAYLOAD = {'name': 'Café "quoted" \\ ☃', 'ids': [1, 2, 3], 'rating': 4.5, 'none': None, 'ok': True, 'mode': Mode.SCENES,
+           'nested': {'z': [], 'a': {}}}
+
+
+@pytest.fixture(params=jsoncodec.get_available())
+def codec(request):
+    return jsoncodec.get_codec(request.param)
+
+
+def test_same_output_as_stdlib(codec):
+    expected = json.dumps(PAYLOAD, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    assert codec.dumps(PAYLOAD) == expected
+    assert codec.loads(expected) == json.loads(expected)
+    assert codec.loads(expected.decode('utf-8')) == json.loads(expected)
+    assert json.loads(codec.dumps(PAYLOAD, indent=True)) == json.loads(expected)
+    assert b'\n  "ids"' in codec.dumps(PAYLOAD, indent=True)
+
+
+def test_errors(codec):
+    assert codec.dumps({'ids': {1}}, default=sorted) == b'{"ids":[1]}'
+    with pytest.raises(TypeError):
+        codec.dumps({'ids': {1}})
+    with pytest.raises(ValueError):
+        codec.loads(b'{"ids": [1,')
+
+
+def test_get_codec():
+    assert jsoncodec.get_available()[-1] == 'json'
+    assert jsoncodec.get_codec('auto').name == jsoncodec.get_available()[0]
+    with pytest.raises(ValueError):
+        jsoncodec.get_codec('yaml')
+
+
+def test_default_codec_falls_back(monkeypatch, caplog):
+    monkeypatch.setattr(jsoncodec, 'JSON_CODEC', 'msgspec')
+    monkeypatch.setitem(jsoncodec.CODECS, 'msgspec', (jsoncodec.MsgspecCodec, lambda: False))
+    with pytest.raises(ValueError):
+        jsoncodec.get_codec()
+    assert jsoncodec.get_default_codec().name == 'json'
+    assert 'not installed' in caplog.text
+
+
+def test_flask_json():
+    app = HereSphere('Test')
+
+    @app.route('/echo', methods=['POST'])
+    def echo():
+        from flask import jsonify, request
+        return jsonify(request.get_json())
+
+    response = app.test_client().post('/echo', json={'z': 1, 'a': 'Café'})
+    assert response.get_data() == '{"z":1,"a":"Café"}\n'.encode('utf-8')
+
+
+def test_bench(tmp_path):
+    output = tmp_path / 'report.json'
+    assert codecbench.main(['--scenes', '20', '--filters', '1', '-r', '1', '-o', str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert set(report['payloads']) == {'scenes', 'library', 'details'}
+    for payload in report['payloads'].values():
+        assert set(payload) == set(jsoncodec.get_available())
+        assert len({ X['bytes'] for X in payload.values() }) == 1
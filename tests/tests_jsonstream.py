@@ -0,0 +1,49 @@
+import json
+import random
+
+import pytest
+
+from stash_vroom.jsonstream import iter_items
+
+
+DOC = {
+    'errors': None,
+    'data': {'findScenes': {
+        'count': 30,
+        'other': [{'scenes': [1, 2]}], # Same key, but not on the path
+        'scenes': [ {'id': str(X), 'title': 'Ünïcode "quoted" \\ ' * X, 'rating100': X * 1.5 or None, 'organized': X % 2 == 0}
+                    for X in range(30) ],
+        'after': 'end',
+    }},
+}
+
+
+def _split(body, count, rng):
+    cuts = sorted(rng.sample(range(1, len(body)), count))
+    return [ body[A:B] for A, B in zip([0] + cuts, cuts + [len(body)]) ]
+
+
+def test_items_across_any_chunks():
+    body = json.dumps(DOC, ensure_ascii=False, indent=1).encode()
+    expected_envelope = json.loads(json.dumps(DOC))
+    expected_envelope['data']['findScenes']['scenes'] = []
+    rng = random.Random(0)
+    for count in (0, 1, 7, 100, len(body) - 1):
+        envelope = {}
+        items = list(iter_items(_split(body, count, rng), ['data', 'findScenes', 'scenes'], envelope))
+        assert items == DOC['data']['findScenes']['scenes']
+        assert envelope == expected_envelope
+
+
+def test_scalars_and_empty_arrays():
+    assert list(iter_items([b'{"a": [12', b'3, 4.5e1', b']}'], ['a'])) == [123, 45.0]
+    envelope = {}
+    assert list(iter_items(['{"a": []}'], ['a'], envelope)) == []
+    assert envelope == {'a': []}
+    assert list(iter_items(['{"errors": [{"message": "No"}], "data": null}'], ['data', 'a'])) == []
+
+
+@pytest.mark.parametrize('body', ['{"a": [1, 2', '{"a": [1 2]}', '{"a": [1]', '{"a": "b', '{"a": [{"b": 1]}'])
+def test_invalid(body):
+    with pytest.raises(ValueError):
+        list(iter_items([body], ['a']))
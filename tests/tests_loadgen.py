@@ -0,0 +1,38 @@
+import json
+import tempfile
+
+from stash_vroom.cli import loadgen
+
+
+def test_get_percentile():
+    values = list(range(1, 101))
+    assert loadgen.get_percentile(values, 50) == 50
+    assert loadgen.get_percentile(values, 95) == 95
+    assert loadgen.get_percentile(values, 99) == 99
+    assert loadgen.get_percentile([7], 99) == 7
+    assert loadgen.get_percentile([], 50) is None
+
+
+def test_summarize_counts_errors_by_endpoint():
+    samples = [('scene', 0.010, True), ('scene', 0.030, False), ('library', 0.020, True)]
+    result = loadgen.summarize(samples, elapsed=2.0)
+    assert result['requests'] == 3
+    assert result['errors'] == 1
+    assert result['throughput_rps'] == 1.5
+    assert result['endpoints']['scene']['error_rate'] == 0.5
+    assert result['endpoints']['library']['p99_ms'] == 20.0
+
+
+def test_local_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    output = tmp_path / 'report.json'
+    assert loadgen.main(['--local', '-c', '2', '-d', '0.5', '--think', '0', '--seed', '1',
+                         '--stub-scenes', '20', '-o', str(output)]) == 0
+
+    report = json.loads(output.read_text())
+    assert report['errors'] == 0
+    assert report['clients'] == 2
+    assert set(report['endpoints']) == {'library', 'legend', 'scene', 'thumbnail'}
+    for key in ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+        assert report[key] is not None
+    assert [ X.name for X in tmp_path.iterdir() ] == ['report.json'] # The media cache is gone.
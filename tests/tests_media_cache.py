@@ -0,0 +1,66 @@
+import os
+import threading
+
+from stash_vroom.media_cache import MediaCache
+
+
+def test_put_and_get(tmp_path):
+    cache = MediaCache(str(tmp_path))
+    assert cache.get('http://stash/a|1') is None
+
+    path, content_type, digest = cache.put('http://stash/a|1', 'image/jpeg', b'abc')
+    assert path.endswith('.jpg')
+    assert content_type == 'image/jpeg'
+    assert cache.get('http://stash/a|1') == (path, 'image/jpeg', digest)
+    assert cache.get('http://stash/a|2') is None
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = MediaCache(str(tmp_path), max_bytes=10)
+    cache.put('a', 'image/png', b'1234')
+    cache.put('b', 'image/png', b'1234')
+    cache.get('a')
+    cache.put('c', 'image/png', b'1234')
+
+    assert cache.get('b') is None
+    assert cache.get('a') and cache.get('c')
+    assert cache.get_size() == 8
+
+
+def test_discard_missing(tmp_path):
+    cache = MediaCache(str(tmp_path))
+    path, _, _ = cache.put('a', 'image/png', b'1234')
+    assert not cache.discard_missing('a')
+    os.remove(path)
+    assert cache.discard_missing('a')
+    assert cache.get('a') is None
+    assert cache.get_size() == 0
+
+
+def test_index_survives_restart(tmp_path):
+    MediaCache(str(tmp_path)).put('a', 'video/mp4', [b'12', b'34'])
+    cache = MediaCache(str(tmp_path))
+    path, content_type, _digest = cache.get('a')
+    assert content_type == 'video/mp4'
+    with open(path, 'rb') as f:
+        assert f.read() == b'1234'
+    assert not [ X for X in os.listdir(os.path.dirname(path)) if X.endswith('.tmp') ]
+
+
+def test_concurrent_misses_fetch_once(tmp_path):
+    cache = MediaCache(str(tmp_path))
+    fetches = []
+    started = threading.Event()
+
+    def fetch():
+        fetches.append(1)
+        started.wait(1)
+        return 'image/jpeg', [b'x']
+
+    threads = [ threading.Thread(target=cache.get_or_fetch, args=('a', fetch)) for _ in range(4) ]
+    for thread in threads:
+        thread.start()
+    started.set()
+    for thread in threads:
+        thread.join()
+    assert len(fetches) == 1
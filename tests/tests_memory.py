@@ -0,0 +1,46 @@
+import sys
+
+from stash_vroom.memory import MemoryProfiler, get_deep_size, get_scene_breakdown
+
+
+def test_deep_size_counts_shared_objects_once():
+    tag = {'id': '1', 'name': 'Tag', 'parents': [{'id': '2', 'name': 'Parent'}]}
+    one = get_deep_size([tag])
+    assert one > sys.getsizeof(tag)
+    assert get_deep_size([tag, tag]) == one + 8 # Only the second list slot
+
+    seen = set()
+    get_deep_size(tag, seen)
+    assert get_deep_size(tag, seen) == 0
+
+
+def test_scene_breakdown():
+    parent = {'id': '2', 'name': 'Parent', 'parents': []}
+    scene = {
+        'id': '1',
+        'tags': [{'id': '1', 'name': 'Tag', 'parents': [parent]}],
+        'scene_markers': [{'seconds': 1.0, 'tags': [{'id': '3', 'name': 'Other', 'parents': [parent]}]}],
+    }
+    parts = get_scene_breakdown([scene])
+    assert parts['tags'] > 0
+    assert parts['scene_markers'] > 0
+    assert 0 < parts['tag_parents'] < parts['tags'] + parts['scene_markers']
+
+
+def test_profiler_snapshots():
+    profiler = MemoryProfiler(frames=1, max_snapshots=2)
+    profiler.start()
+    try:
+        for name in ('a', 'b', 'c'):
+            profiler.take_snapshot(name)
+        assert profiler.get_snapshot_names() == ['b', 'c']
+
+        data = [ bytearray(1000) for X in range(100) ]
+        diff = profiler.compare('b', limit=3)
+        assert diff[0]['size_diff'] >= 100 * 1000
+        assert diff[0]['where'].startswith(__file__)
+        assert profiler.get_top(limit=1, group_by='filename')[0]['size'] > 0
+        del data
+    finally:
+        profiler.stop()
+    assert not profiler.is_tracing()
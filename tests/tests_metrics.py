@@ -0,0 +1,35 @@
+import pytest
+
+from stash_vroom.metrics import Registry
+
+
+def test_counter_and_gauge():
+    registry = Registry()
+    requests = registry.counter('vroom_requests_total', 'Requests', ['route', 'status'])
+    requests.inc(route='/heresphere', status=200)
+    requests.inc(2, route='/heresphere', status=200)
+    registry.gauge('vroom_scenes', 'Scenes "now"', ['filter'], callback=lambda: [({'filter': 'VR | "A"'}, 3)])
+
+    text = registry.render()
+    assert 'vroom_requests_total{route="/heresphere",status="200"} 3' in text
+    assert 'vroom_scenes{filter="VR | \\"A\\""} 3' in text
+    assert requests.get(route='/heresphere', status=200) == 3
+
+    with pytest.raises(ValueError):
+        requests.inc(route='/heresphere')
+    with pytest.raises(ValueError):
+        registry.counter('vroom_requests_total', 'Again')
+
+
+def test_histogram_buckets():
+    registry = Registry()
+    latency = registry.histogram('vroom_seconds', 'Latency', ['route'], buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 5):
+        latency.observe(value, route='/a')
+
+    lines = registry.render().splitlines()
+    assert 'vroom_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'vroom_seconds_bucket{route="/a",le="1"} 3' in lines
+    assert 'vroom_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'vroom_seconds_sum{route="/a"} 5.65' in lines
+    assert 'vroom_seconds_count{route="/a"} 4' in lines
@@ -0,0 +1,98 @@
+import threading
+import time
+
+from stash_vroom import paging
+from stash_vroom.fake_stash import FakeStash
+
+
+def test_chunk_sizer():
+    sizer = paging.ChunkSizer(max_size=500, min_size=50, target_seconds=2.0)
+    assert sizer.get_size() == 500
+    sizer.add_sample(500, 100.0)
+    assert sizer.get_size() == 50
+    for _ in range(20):
+        sizer.add_sample(500, 0.1)
+    assert sizer.get_size() == 500
+
+
+def test_fetch_scene_ids_in_pages():
+    fake = FakeStash(scenes=30)
+    client = fake.get_client(raw=True)
+    find_filter = {'sort': 'title', 'direction': 'ASC', 'page': 1, 'per_page': -1}
+    expected = client.scene_ids(find_filter=find_filter, scene_filter={})['findScenes']['scenes']
+    fake.calls.clear()
+
+    count, items = paging.fetch_scene_ids(client, find_filter, {}, page_size=7, workers=2)
+    assert count == 30
+    assert items == expected
+    assert fake.calls['SceneIds'] == 5
+
+
+class ShiftingClient:
+    # A scene is added after the first page, so later pages repeat one.
+    def __init__(self, fake):
+        self.fake = fake
+        self.client = fake.get_client(raw=True)
+
+    def scene_ids(self, find_filter, scene_filter):
+        res = self.client.scene_ids(find_filter=find_filter, scene_filter=scene_filter)
+        if self.fake.get_scene_count() == 10:
+            self.fake.add_scenes(1)
+        return res
+
+
+def test_fetch_scene_ids_changed_while_paging():
+    fake = FakeStash(scenes=10)
+    count, items = paging.fetch_scene_ids(ShiftingClient(fake), {'sort': 'created_at', 'direction': 'DESC'}, {}, page_size=4)
+    assert count == 11
+    assert len({ X['id'] for X in items }) == 11
+    assert fake.calls['SceneIds'] == 4
+
+
+class SlowClient:
+    def __init__(self, fake):
+        self.client = fake.get_client(raw=True)
+        self.lock = threading.Lock()
+        self.in_flight = self.most_in_flight = 0
+        self.chunks = []
+
+    def scenes_by_ids(self, ids):
+        with self.lock:
+            self.in_flight += 1
+            self.most_in_flight = max(self.most_in_flight, self.in_flight)
+            self.chunks.append(len(ids))
+        time.sleep(0.01)
+        try:
+            return self.client.scenes_by_ids(ids=ids)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def test_fetch_scenes_by_ids_streams_chunks():
+    fake = FakeStash(scenes=50)
+    client = SlowClient(fake)
+    ids = [ str(X) for X in range(1, 51) ]
+    received = []
+    paging.fetch_scenes_by_ids(client, ids, received.append, sizer=paging.ChunkSizer(max_size=8, min_size=2), workers=3)
+
+    assert sorted(X['id'] for C in received for X in C) == sorted(ids)
+    assert len(received) == len(client.chunks)
+    assert max(client.chunks) <= 8
+    assert client.most_in_flight <= 3
+
+
+def test_fetch_scenes_by_ids_shares_slots():
+    fake = FakeStash(scenes=60)
+    client = SlowClient(fake)
+    slots = threading.BoundedSemaphore(2)
+    def fetch(ids):
+        paging.fetch_scenes_by_ids(client, ids, lambda scenes: None, sizer=paging.ChunkSizer(max_size=5, min_size=5), workers=3, slots=slots)
+
+    threads = [ threading.Thread(target=fetch, args=([ str(X) for X in range(i, i + 20) ],)) for i in (1, 21, 41) ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(client.chunks) == 12
+    assert client.most_in_flight <= 2
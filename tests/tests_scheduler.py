@@ -0,0 +1,67 @@
+import pytest
+
+from stash_vroom.scheduler import RefreshScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_interval_has_jitter(clock):
+    sched = RefreshScheduler(lambda key: None, interval=100, jitter=0.1, clock=clock)
+    for key in range(50):
+        sched.add(key)
+    dues = [ sched.get_status(X)['due'] - clock.now for X in range(50) ]
+    assert all(90 <= X <= 110 for X in dues)
+    assert len(set(dues)) > 1
+
+
+def test_run_pending_in_priority_order(clock):
+    refreshed = []
+    sched = RefreshScheduler(refreshed.append, interval=100, clock=clock)
+    for key in ('a', 'b', 'c'):
+        sched.add(key, due=0)
+    sched.touch('b')
+
+    assert sched.run_pending() == 3
+    assert refreshed[0] == 'b'
+    assert sched.run_pending() == 0
+
+
+def test_failure_backs_off(clock):
+    def refresh(key):
+        raise RuntimeError('Stash is down')
+
+    sched = RefreshScheduler(refresh, interval=100, jitter=0, min_backoff=10, max_backoff=25, clock=clock)
+    sched.add('a', due=0)
+    waits = []
+    for _ in range(3):
+        sched.run_pending()
+        status = sched.get_status('a')
+        waits.append(status['due'] - clock.now)
+        clock.now = status['due']
+    assert waits == [10, 20, 25]
+    assert sched.get_status('a')['failures'] == 3
+
+
+def test_trigger_and_disable(clock):
+    refreshed = []
+    sched = RefreshScheduler(refreshed.append, interval=100, clock=clock)
+    sched.add('a')
+    sched.set_interval('a', 0)
+    clock.now += 10000
+    assert sched.run_pending() == 0
+
+    sched.trigger('a')
+    assert sched.run_pending() == 1
+    assert refreshed == ['a']
+    assert sched.get_status('a')['due'] == float('inf')
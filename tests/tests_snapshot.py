@@ -0,0 +1,24 @@
+import gzip
+import json
+
+from stash_vroom import snapshot
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'sub' / 'snapshot.json.gz')
+    snapshot.save_snapshot(path, {'scenes': [{'id': '1'}]})
+    assert snapshot.load_snapshot(path) == {'scenes': [{'id': '1'}]}
+    assert [ X.name for X in (tmp_path / 'sub').iterdir() ] == ['snapshot.json.gz']
+
+
+def test_ignores_missing_corrupt_and_old(tmp_path):
+    path = str(tmp_path / 'snapshot.json.gz')
+    assert snapshot.load_snapshot(path) is None
+
+    with open(path, 'wb') as f:
+        f.write(b'not gzip')
+    assert snapshot.load_snapshot(path) is None
+
+    with gzip.open(path, 'wb') as f:
+        f.write(json.dumps({'version': snapshot.SNAPSHOT_VERSION - 1, 'data': {}}).encode('utf-8'))
+    assert snapshot.load_snapshot(path) is None
@@ -0,0 +1,108 @@
+import os
+import ast
+import json
+
+import httpx
+import pytest
+
+from stash_vroom import stash_client, util
+from stash_vroom.cli import clientbench
+from stash_vroom.fake_stash import FakeStash
+
+
+def _get_client(data, raw):
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={'data': data}))
+    return stash_client.Stash('http://stash.test/graphql', http_client=httpx.Client(transport=transport), raw=raw)
+
+
+def test_raw_matches_model_dump():
+    fake = FakeStash(scenes=30, filters=2)
+    raw = fake.get_client(raw=True)
+    model = fake.get_client()
+
+    res = raw.scenes(find_filter={'per_page': -1}, scene_filter={})
+    assert isinstance(res, dict)
+    assert res == model.scenes(find_filter={'per_page': -1}, scene_filter={}).model_dump()
+    assert raw.saved_filters(mode='SCENES') == model.saved_filters(mode='SCENES').model_dump()
+
+    # Per call, either way.
+    assert isinstance(raw.version(raw=False), stash_client.Version)
+    assert isinstance(model.version(raw=True), dict)
+
+
+def test_raw_spot_check():
+    version = {'version': {'hash': 'abc', 'version': 'v0.28.1', 'build_time': '2025-01-01'}}
+    assert _get_client(version, raw=True).version() == version
+
+    with pytest.raises(stash_client.GraphQLClientInvalidResponseError):
+        _get_client({'versions': {}}, raw=True).version()
+
+    scenes = {'findScenes': {'count': 1, 'duration': 1.0, 'filesize': 1.0, 'scenes': [{'id': '1'}]}}
+    with pytest.raises(stash_client.GraphQLClientInvalidResponseError):
+        _get_client(scenes, raw=True).scenes(find_filter={}, scene_filter={})
+
+    # Only the first scene is checked.
+    scenes = json.loads(json.dumps(FakeStash(scenes=2).get_client(raw=True).scenes(find_filter={'per_page': -1}, scene_filter={})))
+    scenes['findScenes']['scenes'][1] = {'id': '2'}
+    assert _get_client(scenes, raw=True).scenes(find_filter={}, scene_filter={}) == scenes
+
+
+@pytest.mark.parametrize('raw', [False, True])
+def test_stream(raw):
+    fake = FakeStash(scenes=30)
+    client = fake.get_client(raw=raw)
+    expected = fake.get_client(raw=True).scenes_by_ids(ids=['3', '1', '2'])['findScenes']['scenes']
+
+    scenes = []
+    res = client.scenes_by_ids(ids=['3', '1', '2'], stream_path='findScenes.scenes', on_item=scenes.append)
+    assert scenes == expected
+    assert util.to_dict(res) == {'findScenes': {'count': 3, 'scenes': []}}
+
+    fake.fail(1, status=502)
+    with pytest.raises(stash_client.GraphQLClientHttpError):
+        client.scenes_by_ids(ids=['1'], stream_path='findScenes.scenes', on_item=scenes.append)
+
+
+def test_stream_graphql_errors():
+    body = {'errors': [{'message': 'Boom'}], 'data': None}
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=body))
+    client = stash_client.Stash('http://stash.test/graphql', http_client=httpx.Client(transport=transport), raw=True)
+    with pytest.raises(stash_client.GraphQLClientGraphQLMultiError):
+        client.scenes_by_ids(ids=['1'], stream_path='findScenes.scenes', on_item=print)
+
+
+def test_bench(tmp_path):
+    output = tmp_path / 'report.json'
+    assert clientbench.main(['--scenes', '20', '-r', '1', '-o', str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert report['scenes'] == 20
+    assert report['model']['best_ms'] > 0
+    assert report['raw']['best_ms'] > 0
+    assert report['stream']['peak_bytes'] < report['raw']['peak_bytes']
+
+
+@pytest.mark.parametrize('name', ['base_client.py', 'async_base_client.py'])
+def test_base_client_is_the_codegen_copy(name):
+    with open(os.path.join(os.path.dirname(stash_client.__file__), '..', 'codegen', name)) as f:
+        source = f.read()
+    with open(os.path.join(os.path.dirname(stash_client.__file__), name)) as f:
+        assert f.read() == f'# Generated by ariadne-codegen\n\n{source}'
+
+
+def test_raw_mode_plugin():
+    pytest.importorskip('ariadne_codegen')
+    from stash_vroom.codegen import RawModePlugin
+
+    method = ast.parse(
+        'def version(self, **kwargs: Any) -> Version:\n'
+        "    response = self.execute(query=query, operation_name='Version', variables=variables, **kwargs)\n"
+        '    data = self.get_data(response)\n'
+        '    return Version.model_validate(data)\n'
+    ).body[0]
+    method = RawModePlugin(None, {}).generate_client_method(method, None)
+    assert ast.unparse(ast.fix_missing_locations(method)) == (
+        'def version(self, raw: Optional[bool]=None, **kwargs: Any) -> Union[Version, Dict[str, Any]]:\n'
+        "    response = self.execute(query=query, operation_name='Version', variables=variables, **kwargs)\n"
+        '    data = self.get_data(response)\n'
+        '    return self.get_result(Version, data, response, raw)'
+    )
@@ -45,3 +45,12 @@ def test_get_vid_re_empty_extensions():
     assert not regex.search("example.mp4")
     assert not regex.search("example.mkv")
     assert not regex.search("example.mov")
+
+def test_split_comma():
+    """
+    Test split_comma with strings, blanks, None, and lists.
+    """
+    assert util.split_comma('up, up,down') == ['up', 'up', 'down']
+    assert util.split_comma(' , ') == []
+    assert util.split_comma(None) == []
+    assert util.split_comma(['left']) == ['left']
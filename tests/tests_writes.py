@@ -0,0 +1,134 @@
+import os
+import json
+
+import pytest
+
+from stash_vroom.stash_client.exceptions import GraphQLClientGraphQLMultiError
+from stash_vroom.writes import WriteQueue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeClient:
+    def __init__(self):
+        self.requests = []
+        self.fail = False
+
+    def execute(self, query, operation_name, variables):
+        if self.fail:
+            raise ConnectionError('Stash is down')
+        self.requests.append((query, variables))
+        return None
+
+    def get_data(self, response):
+        return {}
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_edits_coalesce_into_one_request(clock):
+    client = FakeClient()
+    queue = WriteQueue(client, delay=2, clock=clock)
+    for rating in (20, 40, 60, 80, 100):
+        queue.update('12', rating100=rating)
+    queue.add_o('12')
+    queue.add_o('12', times=2)
+    queue.update('13', title='Other')
+
+    assert queue.flush() == 0
+    clock.now += 2
+    assert queue.flush() == 2
+
+    assert len(client.requests) == 1
+    query, variables = client.requests[0]
+    assert query.count('sceneUpdate') == 2
+    assert query.count('sceneAddO') == 1
+    assert variables['u0'] == {'id': '12', 'rating100': 100}
+    assert len(variables['t0']) == 3
+    assert variables['u1'] == {'id': '13', 'title': 'Other'}
+    assert queue.get_pending('12') is None
+
+
+def test_failed_write_keeps_edits(clock):
+    client = FakeClient()
+    client.fail = True
+    queue = WriteQueue(client, clock=clock)
+    queue.update('12', rating100=40)
+
+    with pytest.raises(ConnectionError):
+        queue.flush(force=True)
+    queue.update('12', rating100=60)
+    assert queue.get_pending('12')['fields'] == {'rating100': 60}
+
+    client.fail = False
+    assert queue.flush(force=True) == 1
+    assert client.requests[0][1]['u0'] == {'id': '12', 'rating100': 60}
+
+
+def test_journal_survives_restart(tmp_path, clock):
+    journal = str(tmp_path / 'writes.json')
+    queue = WriteQueue(FakeClient(), journal_path=journal, clock=clock)
+    queue.update('12', rating100=80)
+    queue.add_o('12')
+    assert not os.path.exists(journal) # Written by the background thread, not the caller.
+    assert queue.flush() == 0
+    with open(journal) as f:
+        assert json.load(f)['12']['fields'] == {'rating100': 80}
+
+    client = FakeClient()
+    queue = WriteQueue(client, journal_path=journal, clock=clock)
+    assert queue.flush() == 1
+    assert client.requests[0][1]['u0'] == {'id': '12', 'rating100': 80}
+    with open(journal) as f:
+        assert json.load(f) == {}
+
+
+def test_written_batch_is_reported(clock):
+    written = []
+    queue = WriteQueue(FakeClient(), clock=clock, on_written=written.append)
+    queue.update('12', rating100=80)
+    queue.add_o('12')
+    assert queue.flush(force=True) == 1
+    assert written[0]['12']['fields'] == {'rating100': 80}
+    assert len(written[0]['12']['o_times']) == 1
+
+
+def test_partly_failed_write_retries_only_failures(clock):
+    class PartlyFailingClient(FakeClient):
+        def get_data(self, response):
+            if len(self.requests) > 1:
+                return {}
+            raise GraphQLClientGraphQLMultiError.from_errors_dicts(
+                errors_dicts=[
+                    {'message': 'database is locked', 'path': ['u0']},
+                    {'message': 'scene with id 13 not found', 'path': ['o1']},
+                ],
+                data={'u0': None, 'o0': {'count': 1}, 'o1': None},
+            )
+
+    client = PartlyFailingClient()
+    written = []
+    queue = WriteQueue(client, clock=clock, on_written=written.append)
+    queue.update('12', rating100=80)
+    queue.add_o('12')
+    queue.add_o('13')
+
+    with pytest.raises(RuntimeError):
+        queue.flush(force=True)
+    assert written[0]['12']['o_times'] and not written[0]['12']['fields']
+    assert queue.get_pending('12') == {'fields': {'rating100': 80}, 'o_times': []}
+    assert queue.get_pending('13') is None
+
+    assert queue.flush(force=True) == 1
+    query, variables = client.requests[1]
+    assert 'sceneAddO' not in query
+    assert variables['u0'] == {'id': '12', 'rating100': 80}